@@ -0,0 +1,591 @@
+# -*- coding: utf-8 -*-
+"""This module implements features for calibrating the control parameters
+of the models of a :class:`~hydpy.core.hydpytools.HydPy` project based on
+the simulated and observed series of its nodes.
+
+Class :class:`CalibParameter` relates a single calibration parameter to a
+control parameter of the models of an arbitrary group of elements (e.g.
+all elements sharing the same keyword).  Class :class:`Calibration`
+evaluates objective functions like :func:`~hydpy.auxs.statstools.nse`
+for given calibration parameter values and passes them to one of the
+optimizers :func:`dds`, :func:`nelder_mead`, and :func:`sce_ua`.
+"""
+# import...
+# ...from standard library
+from __future__ import division, print_function
+import copy
+import multiprocessing
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy import pub
+from hydpy.core import autodoctools
+from hydpy.core import devicetools
+from hydpy.core import hydpytools
+from hydpy.core import objecttools
+from hydpy.auxs import statstools
+
+
+class CalibParameter(object):
+    """A single calibration parameter, relating to the control parameter
+    with the given name of the models of the given elements.
+
+    Argument `elements` can be a single :class:`~hydpy.core.devicetools.Element`
+    object or an arbitrary :class:`~hydpy.core.devicetools.Elements` object,
+    e.g. all elements of a project with the keyword `land`, as returned by
+    `hp.elements.land`.  All models must already be initialized.  The
+    given `lower` and `upper` boundaries define the search space of the
+    optimizers.  By default, calibration values are passed to the control
+    parameters in the same way as in control files, meaning they relate to
+    the parameter step (see :func:`~hydpy.core.parametertools.parameterstep`).
+    For `relative` calibration parameters, the calibration values are
+    instead multiplied with the (possibly spatially distributed) original
+    values of the control parameters, which are memorized on initialization.
+    """
+
+    def __init__(self, name, elements, parametername, lower, upper,
+                 relative=False):
+        self.name = name
+        self.elements = devicetools.Elements(elements)
+        self.parametername = parametername
+        self.lower = float(lower)
+        self.upper = float(upper)
+        self.relative = relative
+        if not self.lower < self.upper:
+            raise ValueError(
+                'For calibration parameter `%s`, the lower boundary (%s) '
+                'is not smaller than the upper boundary (%s).'
+                % (name, objecttools.repr_(self.lower),
+                   objecttools.repr_(self.upper)))
+        if not len(self.elements):
+            raise ValueError(
+                'Calibration parameter `%s` does not relate to any element.'
+                % name)
+        self._originals = {}
+        for element in self.elements:
+            if element.model is None:
+                raise RuntimeError(
+                    'Calibration parameter `%s` relates to element `%s`, '
+                    'which does not handle a model so far.'
+                    % (name, element.name))
+            par = self._get_parameter(element)
+            self._originals[element.name] = copy.deepcopy(par.values)
+
+    def _get_parameter(self, element):
+        try:
+            return getattr(element.model.parameters.control,
+                           self.parametername)
+        except AttributeError:
+            raise AttributeError(
+                'The model of element `%s` does not handle a control '
+                'parameter named `%s`, as required by calibration '
+                'parameter `%s`.'
+                % (element.name, self.parametername, self.name))
+
+    def apply(self, value):
+        """Pass the given calibration value to the control parameters of
+        all relevant models.
+
+        Note that method :func:`apply` does not update the derived
+        parameters of the affected models.
+        """
+        for element in self.elements:
+            par = self._get_parameter(element)
+            if self.relative:
+                par.values = value*self._originals[element.name]
+                par.trim()
+            else:
+                par(value)
+
+    def reset(self):
+        """Restore the original values of all relevant control parameters."""
+        for element in self.elements:
+            self._get_parameter(element).values = \
+                copy.deepcopy(self._originals[element.name])
+
+    @property
+    def models(self):
+        """A list of the models of all relevant elements."""
+        return [element.model for element in self.elements]
+
+    def __repr__(self):
+        lines = ['CalibParameter(name=%s,' % repr(self.name),
+                 '               elements=%s,' % repr(self.elements.names),
+                 '               parametername=%s,' % repr(self.parametername),
+                 '               lower=%s,' % objecttools.repr_(self.lower),
+                 '               upper=%s,' % objecttools.repr_(self.upper),
+                 '               relative=%s)' % self.relative]
+        return '\n'.join(lines)
+
+
+class Calibration(object):
+    """Calibrate the given :class:`CalibParameter` objects so that the
+    `sim` series of the given nodes agree best with their `obs` series.
+
+    The given :class:`~hydpy.core.hydpytools.HydPy` object must be fully
+    prepared for simulation, including the loading of all required
+    input and observation series.  If no nodes are given, all nodes of
+    the project handling both a `sim` and an `obs` series are selected.
+    The criterion is calculated by the given `criterion` function for
+    each node separately and then averaged (the default
+    :func:`~hydpy.auxs.statstools.nse` is to be maximized, for criteria
+    like :func:`~hydpy.auxs.statstools.rmse` pass `maximize=False`).
+    The `criterion` function must accept two-dimensional arrays, with
+    nodes on the first and time on the second axis, as do all criteria
+    of module :mod:`~hydpy.auxs.statstools`.
+
+    Each evaluation of a set of calibration values assigns the values
+    to the control parameters, updates the derived parameters, restores
+    the initial conditions memorized on initialization, and performs a
+    complete simulation run by method :func:`~HydPy.doit`.
+
+    With more than one worker, method :func:`optimize` evaluates multiple
+    parameter sets concurrently in a process pool.  The worker processes
+    are forked from the main process and so start with copies of all
+    prepared models and of all series already loaded into RAM.  Hence,
+    no input file needs to be read again, neither per worker nor per
+    evaluation.  Consequently, the process pool is only available on
+    platforms supporting `fork` and requires all series to be handled
+    in RAM.
+    """
+
+    def __init__(self, hp, parameters, nodes=None,
+                 criterion=statstools.nse, maximize=True):
+        self.hp = hp
+        self.parameters = list(parameters)
+        names = [parameter.name for parameter in self.parameters]
+        if len(set(names)) < len(names):
+            raise ValueError(
+                'The names of the given calibration parameters are not '
+                'unique: %s.' % ', '.join(names))
+        if nodes is None:
+            nodes = devicetools.Nodes(
+                node for node in hp.nodes
+                if (hydpytools.hasmemory(node.sequences.sim) and
+                    hydpytools.hasmemory(node.sequences.obs)))
+        self.nodes = devicetools.Nodes(nodes)
+        if not len(self.nodes):
+            raise RuntimeError(
+                'There is no node available for calibration, meaning no '
+                'node with prepared `sim` and `obs` series.')
+        self.criterion = criterion
+        self.maximize = maximize
+        self.conditions = hydpytools.get_conditions(hp.elements)
+        self.history = []
+        self._pool = None
+
+    @property
+    def lower(self):
+        """The lower boundaries of all calibration parameters."""
+        return numpy.array([parameter.lower for parameter in self.parameters])
+
+    @property
+    def upper(self):
+        """The upper boundaries of all calibration parameters."""
+        return numpy.array([parameter.upper for parameter in self.parameters])
+
+    def apply(self, values):
+        """Assign the given calibration values to the control parameters
+        of all relevant models and update their derived parameters."""
+        values = numpy.array(values, dtype=float).flatten()
+        if len(values) != len(self.parameters):
+            raise ValueError(
+                'The number of given calibration values (%d) does not '
+                'agree with the number of calibration parameters (%d).'
+                % (len(values), len(self.parameters)))
+        models = []
+        for (parameter, value) in zip(self.parameters, values):
+            parameter.apply(value)
+            for model in parameter.models:
+                if model not in models:
+                    models.append(model)
+        for model in models:
+            model.parameters.update()
+
+    def reset(self):
+        """Restore the original control parameter values and the initial
+        conditions of all relevant models."""
+        models = []
+        for parameter in self.parameters:
+            parameter.reset()
+            for model in parameter.models:
+                if model not in models:
+                    models.append(model)
+        for model in models:
+            model.parameters.update()
+        hydpytools.set_conditions(self.hp.elements, self.conditions)
+
+    def calc_criterion(self):
+        """Return the criterion value averaged over all relevant nodes
+        based on their current `sim` and `obs` series."""
+        sims = numpy.array([node.sequences.sim.series
+                            for node in self.nodes])
+        obss = numpy.array([node.sequences.obs.series
+                            for node in self.nodes])
+        return float(numpy.mean(self.criterion(sims, obss)))
+
+    def evaluate(self, values):
+        """Simulate with the given calibration values and return the
+        resulting criterion value."""
+        self.apply(values)
+        hydpytools.set_conditions(self.hp.elements, self.conditions)
+        with pub.options.printprogress(False):
+            self.hp.doit()
+        return self.calc_criterion()
+
+    def evaluate_many(self, valuesets):
+        """Return the criterion values for all given sets of calibration
+        values (in parallel, if called during a process-based optimization
+        run)."""
+        valuesets = [tuple(values) for values in valuesets]
+        if self._pool is None:
+            results = [self.evaluate(values) for values in valuesets]
+        else:
+            results = self._pool.map(_evaluate, valuesets)
+        self.history.extend(zip(valuesets, results))
+        return numpy.array(results)
+
+    def optimize(self, method='dds', nmb_workers=1, **kwargs):
+        """Search for the best calibration values with the selected
+        optimizer and return them together with their criterion value.
+
+        Available methods are `dds` (see function :func:`dds`),
+        `nelder_mead` (see function :func:`nelder_mead`), and `sce_ua`
+        (see function :func:`sce_ua`).  All additional keyword arguments
+        (e.g. `maxevals` or `seed`) are passed to the selected optimizer.
+        With more than one worker, the parallelisable evaluations of the
+        optimizer are performed in a process pool.  Afterwards, the best
+        calibration values are applied and simulated once more in the
+        main process.  All evaluated parameter sets and their criterion
+        values are appended to the list :attr:`history`.
+        """
+        try:
+            optimizer = _OPTIMIZERS[method]
+        except KeyError:
+            raise ValueError(
+                'There is no optimization method named `%s` available.  '
+                'Please choose one of the following: %s.'
+                % (method, ', '.join(sorted(_OPTIMIZERS))))
+        sign = -1. if self.maximize else 1.
+
+        def function(valuesets):
+            return sign*self.evaluate_many(valuesets)
+
+        if nmb_workers is None:
+            nmb_workers = multiprocessing.cpu_count()
+        if nmb_workers > 1:
+            self._start_pool(nmb_workers)
+        try:
+            values, result = optimizer(
+                function, self.lower, self.upper, **kwargs)
+        finally:
+            self._stop_pool()
+        return values, self.evaluate(values)
+
+    def _start_pool(self, nmb_workers):
+        global _calibration
+        seriesflags = hydpytools.get_seriesflags(self.hp.nodes,
+                                                  self.hp.elements)
+        if not all(seriesflags.values()):
+            raise RuntimeError(
+                'Calibrating with multiple processes requires all series '
+                'to be handled in RAM, but at least one series is handled '
+                'on disk.')
+        try:
+            context = multiprocessing.get_context('fork')
+        except AttributeError:
+            context = multiprocessing
+        except ValueError:
+            raise RuntimeError(
+                'Calibrating with multiple processes requires the start '
+                'method `fork`, which is not available on this platform.')
+        _calibration = self
+        try:
+            self._pool = context.Pool(nmb_workers)
+        finally:
+            _calibration = None
+
+    def _stop_pool(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
+_calibration = None
+"""The :class:`Calibration` object inherited by the forked worker
+processes of method :func:`Calibration.optimize`."""
+
+
+def _evaluate(values):
+    """Evaluate the given calibration values within a worker process."""
+    return _calibration.evaluate(values)
+
+
+def dds(function, lower, upper, x0=None, maxevals=1000, r=.2,
+        batchsize=1, seed=None):
+    """Minimize the given function with the Dynamically Dimensioned Search
+    algorithm of Tolson and Shoemaker (2007).
+
+    Function `function` must accept a two-dimensional array, each row
+    containing one parameter set, and return a one-dimensional array
+    of the respective function values.  Arguments `lower` and `upper`
+    define the search space, `x0` is an optional initial parameter set
+    (by default, the initial parameter set is sampled randomly), and `r`
+    is the neighbourhood perturbation size relative to the parameter
+    ranges.  Each iteration evaluates `batchsize` candidates generated
+    from the actual best parameter set at once, which allows for
+    evaluating them in parallel.  The total number of function evaluations
+    is `maxevals`.  Function :func:`dds` returns the best parameter set
+    and its function value:
+
+    >>> from hydpy.auxs.calibtools import dds
+    >>> from hydpy.core.objecttools import round_
+    >>> def sphere(xs):
+    ...     return numpy.sum((xs-1.)**2, axis=1)
+    >>> x, f = dds(sphere, lower=[-5., -5.], upper=[5., 5.],
+    ...            maxevals=1000, seed=0)
+    >>> round_(x, decimals=1)
+    1.0, 1.0
+    >>> x, f = dds(sphere, lower=[-5., -5.], upper=[5., 5.],
+    ...            maxevals=1000, batchsize=4, seed=0)
+    >>> round_(x, decimals=1)
+    1.0, 1.0
+    """
+    lower, upper = _prepare_bounds(lower, upper)
+    rng = numpy.random.RandomState(seed)
+    nmb_pars = len(lower)
+    if x0 is None:
+        best = rng.uniform(size=nmb_pars)
+    else:
+        best = _scale(x0, lower, upper)
+    fbest = function(_unscale(best[numpy.newaxis], lower, upper))[0]
+    nmb_evals = 1
+    while nmb_evals < maxevals:
+        nmb_candidates = min(batchsize, maxevals-nmb_evals)
+        prob = 1.-numpy.log(nmb_evals)/numpy.log(maxevals)
+        candidates = numpy.empty((nmb_candidates, nmb_pars))
+        for candidate in candidates:
+            selected = rng.uniform(size=nmb_pars) < prob
+            if not numpy.any(selected):
+                selected[rng.randint(nmb_pars)] = True
+            candidate[:] = best
+            candidate[selected] += r*rng.normal(size=numpy.sum(selected))
+        candidates = numpy.where(candidates < 0., -candidates, candidates)
+        candidates = numpy.where(candidates > 1., 2.-candidates, candidates)
+        candidates = numpy.clip(candidates, 0., 1.)
+        results = function(_unscale(candidates, lower, upper))
+        nmb_evals += nmb_candidates
+        idx = numpy.argmin(results)
+        if results[idx] <= fbest:
+            best, fbest = candidates[idx], results[idx]
+    return _unscale(best, lower, upper), fbest
+
+
+def nelder_mead(function, lower, upper, x0=None, maxevals=1000,
+                tolerance=1e-6):
+    """Minimize the given function with the downhill simplex method of
+    Nelder and Mead (1965).
+
+    See function :func:`dds` for the meaning of arguments `function`,
+    `lower`, `upper`, `x0`, and `maxevals` (by default, the simplex
+    starts in the centre of the search space).  The search space is
+    respected by moving all vertices leaving it to its boundaries.
+    The search terminates when the function values of all vertices differ
+    less than the given `tolerance`.  Only the evaluations of the initial
+    simplex and of the shrinked simplexes can be performed in parallel:
+
+    >>> from hydpy.auxs.calibtools import nelder_mead
+    >>> from hydpy.core.objecttools import round_
+    >>> def sphere(xs):
+    ...     return numpy.sum((xs-1.)**2, axis=1)
+    >>> x, f = nelder_mead(sphere, lower=[-5., -5.], upper=[5., 5.])
+    >>> round_(x, decimals=2)
+    1.0, 1.0
+    """
+    lower, upper = _prepare_bounds(lower, upper)
+    nmb_pars = len(lower)
+
+    def evaluate(points):
+        return function(_unscale(points, lower, upper))
+
+    if x0 is None:
+        x0 = numpy.full(nmb_pars, .5)
+    else:
+        x0 = _scale(x0, lower, upper)
+    simplex = numpy.empty((nmb_pars+1, nmb_pars))
+    simplex[:] = x0
+    for idx in range(nmb_pars):
+        if x0[idx] < .75:
+            simplex[idx+1, idx] += .25
+        else:
+            simplex[idx+1, idx] -= .25
+    results = evaluate(simplex)
+    nmb_evals = nmb_pars+1
+    while nmb_evals < maxevals:
+        idxs = numpy.argsort(results)
+        simplex, results = simplex[idxs], results[idxs]
+        if results[-1]-results[0] < tolerance:
+            break
+        centroid = numpy.mean(simplex[:-1], axis=0)
+        reflected = numpy.clip(2.*centroid-simplex[-1], 0., 1.)
+        fref = evaluate(reflected[numpy.newaxis])[0]
+        nmb_evals += 1
+        if fref < results[0]:
+            expanded = numpy.clip(3.*centroid-2.*simplex[-1], 0., 1.)
+            fexp = evaluate(expanded[numpy.newaxis])[0]
+            nmb_evals += 1
+            if fexp < fref:
+                simplex[-1], results[-1] = expanded, fexp
+            else:
+                simplex[-1], results[-1] = reflected, fref
+        elif fref < results[-2]:
+            simplex[-1], results[-1] = reflected, fref
+        else:
+            if fref < results[-1]:
+                contracted = (centroid+reflected)/2.
+            else:
+                contracted = (centroid+simplex[-1])/2.
+            fcon = evaluate(contracted[numpy.newaxis])[0]
+            nmb_evals += 1
+            if fcon < min(fref, results[-1]):
+                simplex[-1], results[-1] = contracted, fcon
+            else:
+                simplex[1:] = (simplex[0]+simplex[1:])/2.
+                results[1:] = evaluate(simplex[1:])
+                nmb_evals += nmb_pars
+    idx = numpy.argmin(results)
+    return _unscale(simplex[idx], lower, upper), results[idx]
+
+
+def sce_ua(function, lower, upper, x0=None, maxevals=1000,
+           nmb_complexes=2, tolerance=1e-6, seed=None):
+    """Minimize the given function with the Shuffled Complex Evolution
+    algorithm of Duan et al. (1992).
+
+    See function :func:`dds` for the meaning of arguments `function`,
+    `lower`, `upper`, `x0` (which replaces one of the randomly sampled
+    points of the initial population), `maxevals`, and `seed`.  Each
+    complex consists of `2n+1` points, with `n` being the number of
+    parameters.  The search terminates when the function values of all
+    points differ less than the given `tolerance` or when the number of
+    function evaluations exceeds `maxevals`.  The evolution steps of all
+    `nmb_complexes` complexes are evaluated at once, which allows for
+    evaluating them in parallel:
+
+    >>> from hydpy.auxs.calibtools import sce_ua
+    >>> from hydpy.core.objecttools import round_
+    >>> def sphere(xs):
+    ...     return numpy.sum((xs-1.)**2, axis=1)
+    >>> x, f = sce_ua(sphere, lower=[-5., -5.], upper=[5., 5.],
+    ...               maxevals=2000, seed=0)
+    >>> round_(x, decimals=2)
+    1.0, 1.0
+    """
+    lower, upper = _prepare_bounds(lower, upper)
+    rng = numpy.random.RandomState(seed)
+    nmb_pars = len(lower)
+    nmb_points = 2*nmb_pars+1
+    nmb_simplex = nmb_pars+1
+
+    def evaluate(points):
+        return function(_unscale(points, lower, upper))
+
+    population = rng.uniform(size=(nmb_complexes*nmb_points, nmb_pars))
+    if x0 is not None:
+        population[0] = _scale(x0, lower, upper)
+    results = evaluate(population)
+    nmb_evals = len(population)
+    weights = 2.*(nmb_points-numpy.arange(nmb_points))
+    weights /= nmb_points*(nmb_points+1.)
+    while nmb_evals < maxevals:
+        idxs = numpy.argsort(results)
+        population, results = population[idxs], results[idxs]
+        if results[-1]-results[0] < tolerance:
+            break
+        complexes = [population[idx::nmb_complexes]
+                     for idx in range(nmb_complexes)]
+        cresults = [results[idx::nmb_complexes]
+                    for idx in range(nmb_complexes)]
+        for dummy in range(nmb_points):
+            if nmb_evals >= maxevals:
+                break
+            selections = [numpy.sort(rng.choice(nmb_points, nmb_simplex,
+                                                replace=False, p=weights))
+                          for dummy in range(nmb_complexes)]
+            centroids = numpy.array(
+                [numpy.mean(points[selection[:-1]], axis=0)
+                 for (points, selection) in zip(complexes, selections)])
+            worsts = numpy.array([points[selection[-1]] for
+                                  (points, selection)
+                                  in zip(complexes, selections)])
+            fworsts = numpy.array([values[selection[-1]] for
+                                   (values, selection)
+                                   in zip(cresults, selections)])
+            candidates = 2.*centroids-worsts
+            outside = numpy.any((candidates < 0.) | (candidates > 1.),
+                                axis=1)
+            candidates[outside] = _sample_complexes(
+                rng, [complexes[idx] for idx in numpy.where(outside)[0]],
+                nmb_pars)
+            fcandidates = evaluate(candidates)
+            nmb_evals += nmb_complexes
+            worse = fcandidates > fworsts
+            if numpy.any(worse):
+                idxs = numpy.where(worse)[0]
+                candidates[idxs] = (centroids[idxs]+worsts[idxs])/2.
+                fcandidates[idxs] = evaluate(candidates[idxs])
+                nmb_evals += len(idxs)
+                worse[idxs] = fcandidates[idxs] > fworsts[idxs]
+                if numpy.any(worse):
+                    idxs = numpy.where(worse)[0]
+                    candidates[idxs] = _sample_complexes(
+                        rng, [complexes[idx] for idx in idxs], nmb_pars)
+                    fcandidates[idxs] = evaluate(candidates[idxs])
+                    nmb_evals += len(idxs)
+            for (idx, selection) in enumerate(selections):
+                complexes[idx][selection[-1]] = candidates[idx]
+                cresults[idx][selection[-1]] = fcandidates[idx]
+                jdxs = numpy.argsort(cresults[idx])
+                complexes[idx] = complexes[idx][jdxs]
+                cresults[idx] = cresults[idx][jdxs]
+        population = numpy.concatenate(complexes)
+        results = numpy.concatenate(cresults)
+    idx = numpy.argmin(results)
+    return _unscale(population[idx], lower, upper), results[idx]
+
+
+_OPTIMIZERS = {'dds': dds,
+               'nelder_mead': nelder_mead,
+               'sce_ua': sce_ua}
+
+
+def _prepare_bounds(lower, upper):
+    lower = numpy.array(lower, dtype=float)
+    upper = numpy.array(upper, dtype=float)
+    if numpy.any(lower >= upper):
+        raise ValueError(
+            'At least one lower boundary is not smaller than the '
+            'respective upper boundary.')
+    return lower, upper
+
+
+def _scale(values, lower, upper):
+    return (numpy.array(values, dtype=float)-lower)/(upper-lower)
+
+
+def _unscale(values, lower, upper):
+    return lower+values*(upper-lower)
+
+
+def _sample_complexes(rng, complexes, nmb_pars):
+    """Sample one random point within the smallest hypercube containing
+    all points of each given complex."""
+    points = numpy.empty((len(complexes), nmb_pars))
+    for (point, complex_) in zip(points, complexes):
+        point[:] = rng.uniform(numpy.min(complex_, axis=0),
+                               numpy.max(complex_, axis=0))
+    return points
+
+
+autodoctools.autodoc_module()
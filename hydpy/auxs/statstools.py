@@ -107,4 +107,415 @@ def calc_mean_time_deviation(timepoints, weights, mean_time=None):
         objecttools.augmentexcmessage('While trying to calculate the weighted '
                                       'time deviation from mean time')
 
+def nse(sim, obs):
+    """Return the Nash-Sutcliffe efficiency of the given simulated and
+    observed values.
+
+    A perfect agreement results in an efficiency of one:
+
+    >>> from hydpy.auxs.statstools import nse
+    >>> nse(sim=[1., 2., 3.],
+    ...     obs=[1., 2., 3.])
+    1.0
+
+    Simulating the mean of the observed values results in an efficiency
+    of zero:
+
+    >>> nse(sim=[2., 2., 2.],
+    ...     obs=[1., 2., 3.])
+    0.0
+
+    Time steps with missing simulated or observed values, e.g. marking
+    measurement gaps or the gaps inserted by method
+    :func:`~hydpy.core.sequencetools.IOSequence.adjust_short_series`,
+    are ignored:
+
+    >>> nse(sim=[2., 5., 2., 2., numpy.nan],
+    ...     obs=[1., numpy.nan, 2., 3., 4.])
+    0.0
+
+    All functions of this module calculating efficiency criteria are
+    vectorized.  Pass two-dimensional arrays (e.g. nodes or ensemble
+    members on the first axis and time on the second axis) to calculate
+    all criterion values at once.  Alternatively, pass a one-dimensional
+    `obs` array, which is then compared with all rows of `sim`.  Each
+    row is masked individually:
+
+    >>> from hydpy.core.objecttools import round_
+    >>> round_(nse(sim=[[1., 2., 3.], [2., 2., 2.], [2., 2., numpy.nan]],
+    ...            obs=[1., 2., 3.]))
+    1.0, 0.0, -1.0
+
+    There will be some checks for input plausibility perfomed, e.g.:
+
+    >>> nse(sim=[1., 2.],
+    ...     obs=[1., 2., 3.])
+    Traceback (most recent call last):
+    ...
+    ValueError: While trying to calculate the Nash-Sutcliffe efficiency, the following error occured: The shapes of the following objects are not equal: obs (3,), sim (2,).
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        return _return(_nse(sim, obs, valid), onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the Nash-Sutcliffe efficiency')
+
+
+def nse_log(sim, obs):
+    """Return the Nash-Sutcliffe efficiency of the logarithms of the given
+    simulated and observed values.
+
+    Function :func:`nse_log` emphasises low values:
+
+    >>> from hydpy.auxs.statstools import nse_log
+    >>> from hydpy.core.objecttools import round_
+    >>> round_(nse_log(sim=[1., 10., 100.],
+    ...                obs=[1., 10., 100.]))
+    1.0
+    >>> round_(nse_log(sim=[2., 10., 100.],
+    ...                obs=[1., 10., 100.]))
+    0.95469
+    >>> round_(nse_log(sim=[1., 10., 200.],
+    ...                obs=[1., 10., 100.]))
+    0.95469
+
+    Logarithms require positive values:
+
+    >>> nse_log(sim=[0., 10., 100.],
+    ...         obs=[1., 10., 100.])
+    Traceback (most recent call last):
+    ...
+    ValueError: While trying to calculate the logarithmic Nash-Sutcliffe efficiency, the following error occured: For the following objects, at least one value is not positive: sim.
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        _test_positive(valid, sim=sim, obs=obs)
+        return _return(_nse(_log(sim, valid), _log(obs, valid), valid),
+                       onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the logarithmic '
+                'Nash-Sutcliffe efficiency')
+
+
+def kge(sim, obs):
+    """Return the Kling-Gupta efficiency of the given simulated and
+    observed values.
+
+    The Kling-Gupta efficiency (Gupta et al., 2009) combines the
+    correlation coefficient (`r`), the ratio of the standard deviations
+    (`alpha`), and the ratio of the mean values (`beta`):
+
+    >>> from hydpy.auxs.statstools import kge
+    >>> from hydpy.core.objecttools import round_
+    >>> round_(kge(sim=[1., 2., 3.],
+    ...            obs=[1., 2., 3.]))
+    1.0
+    >>> round_(kge(sim=[2., 4., 6.],
+    ...            obs=[1., 2., 3.]))
+    -0.414214
+    >>> round_(kge(sim=[[3., 2., 1.], [2., 3., 4.]],
+    ...            obs=[1., 2., 3.]))
+    -1.0, 0.5
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        meansim = _mean(sim, valid)
+        meanobs = _mean(obs, valid)
+        devsim = (sim-meansim[:, numpy.newaxis])*valid
+        devobs = (obs-meanobs[:, numpy.newaxis])*valid
+        stdsim = numpy.sqrt(_mean(devsim**2, valid))
+        stdobs = numpy.sqrt(_mean(devobs**2, valid))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            r = _mean(devsim*devobs, valid)/(stdsim*stdobs)
+            alpha = stdsim/stdobs
+            beta = meansim/meanobs
+        return _return(
+            1.-numpy.sqrt((r-1.)**2+(alpha-1.)**2+(beta-1.)**2), onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the Kling-Gupta efficiency')
+
+
+def rmse(sim, obs):
+    """Return the root mean squared error of the given simulated and
+    observed values.
+
+    >>> from hydpy.auxs.statstools import rmse
+    >>> from hydpy.core.objecttools import round_
+    >>> rmse(sim=[1., 2., 3.],
+    ...      obs=[1., 2., 3.])
+    0.0
+    >>> round_(rmse(sim=[2., 0., 6.],
+    ...             obs=[1., numpy.nan, 3.]))
+    2.236068
+
+    There will be some checks for input plausibility perfomed, e.g.:
+
+    >>> rmse(sim=[1., 2.],
+    ...      obs=[1., 2., 3.])
+    Traceback (most recent call last):
+    ...
+    ValueError: While trying to calculate the root mean squared error, the following error occured: The shapes of the following objects are not equal: obs (3,), sim (2,).
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        return _return(numpy.sqrt(_mean((sim-obs)**2, valid)), onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the root mean squared error')
+
+
+def pbias(sim, obs):
+    """Return the percent bias of the given simulated values relative to
+    the given observed values.
+
+    Positive values indicate overestimation, negative values indicate
+    underestimation:
+
+    >>> from hydpy.auxs.statstools import pbias
+    >>> from hydpy.core.objecttools import round_
+    >>> round_(pbias(sim=[[2., 2., 3.], [1., 2., 2.]],
+    ...              obs=[1., 2., 3.]))
+    16.666667, -16.666667
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return _return(100.*numpy.sum(sim-obs, axis=1) /
+                           numpy.sum(obs, axis=1), onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the percent bias')
+
+
+def volume_error(sim, obs):
+    """Return the difference between the sums of the given simulated and
+    observed values.
+
+    Multiply the result with the simulation step size (in seconds) to
+    convert a discharge related volume error to m³:
+
+    >>> from hydpy.auxs.statstools import volume_error
+    >>> volume_error(sim=[2., 2., 3., 5.],
+    ...              obs=[1., 2., 3., numpy.nan])
+    1.0
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        return _return(numpy.sum(sim-obs, axis=1), onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the volume error')
+
+
+def peak_error(sim, obs):
+    """Return the relative error of the simulated peak value with respect
+    to the observed peak value.
+
+    Note that function :func:`peak_error` compares the maximum values
+    of both series, independently of their timing:
+
+    >>> from hydpy.auxs.statstools import peak_error
+    >>> peak_error(sim=[1., 3., 2.],
+    ...            obs=[1., 2., 4.])
+    -0.25
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            peakobs = numpy.max(numpy.where(valid, obs, -numpy.inf), axis=1)
+            peaksim = numpy.max(numpy.where(valid, sim, -numpy.inf), axis=1)
+            return _return((peaksim-peakobs)/peakobs, onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the peak error')
+
+
+def fdc_high_error(sim, obs, probability=.02):
+    """Return the percent bias of the high flow segment of the flow
+    duration curves of the given simulated and observed values.
+
+    Following Yilmaz et al. (2008), the high flow segment consists of
+    the values with exceedance probabilities lower than the given
+    `probability` (by default 2 %, at least one value).  The flow
+    duration curves of the simulated and observed values are determined
+    separately, meaning that the timing of the values is irrelevant:
+
+    >>> from hydpy.auxs.statstools import fdc_high_error
+    >>> from hydpy.core.objecttools import round_
+    >>> round_(fdc_high_error(sim=[6., 1., 2., 3., 4.],
+    ...                       obs=[1., 2., 3., 4., 5.]))
+    20.0
+    >>> round_(fdc_high_error(sim=[6., 1., 2., 3., 4.],
+    ...                       obs=[1., 2., 3., 4., 5.],
+    ...                       probability=.4))
+    11.111111
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        fdcsim = _fdc(sim, valid)
+        fdcobs = _fdc(obs, valid)
+        nmbs = numpy.sum(valid, axis=1)
+        ranks = numpy.arange(sim.shape[1])
+        segment = ranks < numpy.maximum(
+            numpy.round(probability*nmbs), 1.)[:, numpy.newaxis]
+        return _return(_segment_bias(fdcsim, fdcobs, segment), onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the bias of the high flow '
+                'segment of the flow duration curve')
+
+
+def fdc_low_error(sim, obs, probability=.7):
+    """Return the percent bias of the low flow segment of the flow
+    duration curves of the given simulated and observed values.
+
+    The low flow segment consists of the values with exceedance
+    probabilities higher than the given `probability` (by default 70 %,
+    at least one value).  Contrary to Yilmaz et al. (2008), function
+    :func:`fdc_low_error` does not log-transform the low flow values
+    and so works on series containing zero values, but otherwise
+    corresponds to function :func:`fdc_high_error`:
+
+    >>> from hydpy.auxs.statstools import fdc_low_error
+    >>> from hydpy.core.objecttools import round_
+    >>> round_(fdc_low_error(sim=[6., 0., 2., 3., 4.],
+    ...                      obs=[1., 2., 3., 4., 5.]))
+    -33.333333
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        fdcsim = _fdc(sim, valid)
+        fdcobs = _fdc(obs, valid)
+        nmbs = numpy.sum(valid, axis=1)
+        ranks = numpy.arange(sim.shape[1])
+        nmbs_low = numpy.maximum(numpy.round((1.-probability)*nmbs), 1.)
+        segment = ((ranks >= (nmbs-nmbs_low)[:, numpy.newaxis]) &
+                   (ranks < nmbs[:, numpy.newaxis]))
+        return _return(_segment_bias(fdcsim, fdcobs, segment), onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the bias of the low flow '
+                'segment of the flow duration curve')
+
+
+def fdc_slope_error(sim, obs, probabilities=(.2, .7)):
+    """Return the percent bias of the slope of the midsegment of the
+    flow duration curves of the given simulated and observed values.
+
+    Following Yilmaz et al. (2008), the slope is calculated based on
+    the logarithms of the values with the given exceedance
+    `probabilities`, which must thus be positive:
+
+    >>> from hydpy.auxs.statstools import fdc_slope_error
+    >>> from hydpy.core.objecttools import round_
+    >>> round_(fdc_slope_error(sim=[1., 2., 4., 8., 16., 32.],
+    ...                        obs=[1., 2., 4., 8., 16., 32.]))
+    0.0
+    >>> round_(fdc_slope_error(sim=[1., 4., 16., 64., 256., 1024.],
+    ...                        obs=[1., 2., 4., 8., 16., 32.]))
+    100.0
+    """
+    try:
+        sim, obs, valid, onedim = _prepare_values(sim, obs)
+        _test_positive(valid, sim=sim, obs=obs)
+        fdcsim = _fdc(sim, valid)
+        fdcobs = _fdc(obs, valid)
+        nmbs = numpy.sum(valid, axis=1)
+        rows = numpy.arange(sim.shape[0])
+        idxs = [numpy.clip(numpy.round(probability*(nmbs-1.)).astype(int),
+                           0, None) for probability in probabilities]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            slopesim = (numpy.log(fdcsim[rows, idxs[0]]) -
+                        numpy.log(fdcsim[rows, idxs[1]]))
+            slopeobs = (numpy.log(fdcobs[rows, idxs[0]]) -
+                        numpy.log(fdcobs[rows, idxs[1]]))
+            return _return(100.*(slopesim-slopeobs)/slopeobs, onedim)
+    except BaseException:
+        objecttools.augmentexcmessage(
+                'While trying to calculate the bias of the slope of the '
+                'flow duration curve')
+
+
+def _prepare_values(sim, obs):
+    """Return the given simulated and observed values as two-dimensional
+    numpy arrays (with all missing values set to zero), a boolean array
+    marking the valid pairs of values, and a flag telling if the given
+    values are one-dimensional.
+
+    A one-dimensional `obs` array is repeated for each row of a
+    two-dimensional `sim` array.
+    """
+    sim = numpy.array(sim, dtype=float)
+    obs = numpy.array(obs, dtype=float)
+    if (sim.ndim == 2) and (obs.ndim == 1) and (sim.shape[1:] == obs.shape):
+        obs = numpy.tile(obs, (sim.shape[0], 1))
+    validtools.test_equal_shape(sim=sim, obs=obs)
+    if sim.ndim not in (1, 2):
+        raise ValueError(
+            'Only one- and two-dimensional arrays are supported, but the '
+            'given arrays are %d-dimensional.' % sim.ndim)
+    onedim = sim.ndim == 1
+    sim = sim.reshape(-1, sim.shape[-1])
+    obs = obs.reshape(-1, obs.shape[-1])
+    valid = ~(numpy.isnan(sim) | numpy.isnan(obs))
+    sim[~valid] = 0.
+    obs[~valid] = 0.
+    return sim, obs, valid, onedim
+
+
+def _return(results, onedim):
+    """Return the given criterion values as a single float value for
+    one-dimensional input values and as a numpy array otherwise."""
+    if onedim:
+        return float(results[0])
+    return results
+
+
+def _mean(values, valid):
+    """Return the mean of the valid values of each row."""
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return (numpy.sum(numpy.where(valid, values, 0.), axis=1) /
+                numpy.sum(valid, axis=1))
+
+
+def _nse(sim, obs, valid):
+    """Calculate the Nash-Sutcliffe efficiency for each row."""
+    devobs = (obs-_mean(obs, valid)[:, numpy.newaxis])*valid
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return 1.-(numpy.sum((sim-obs)**2, axis=1) /
+                   numpy.sum(devobs**2, axis=1))
+
+
+def _log(values, valid):
+    """Return the logarithms of the valid values (and zero otherwise)."""
+    return numpy.log(numpy.where(valid, values, 1.))
+
+
+def _test_positive(valid, **kwargs):
+    """Raise a ValueError if at least one valid value of the objects given
+    as keywords is not positive."""
+    names = [name for (name, values) in sorted(kwargs.items())
+             if numpy.any(valid & (values <= 0.))]
+    if names:
+        raise ValueError(
+            'For the following objects, at least one value is not '
+            'positive: %s.' % ', '.join(names))
+
+
+def _fdc(values, valid):
+    """Return the valid values of each row in descending order, followed
+    by the invalid values as `nan`."""
+    return -numpy.sort(numpy.where(valid, -values, numpy.nan), axis=1)
+
+
+def _segment_bias(fdcsim, fdcobs, segment):
+    """Return the percent bias of the given flow duration curve segments."""
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return (100.*numpy.sum(numpy.where(segment, fdcsim-fdcobs, 0.),
+                               axis=1) /
+                numpy.sum(numpy.where(segment, fdcobs, 0.), axis=1))
+
 autodoctools.autodoc_module()
@@ -35,14 +35,21 @@ def test_equal_shape(**kwargs):
 
     >>> test_equal_shape(arr1=numpy.array([1., 2.]))
     >>> test_equal_shape()
+
+    Multidimensional arrays are supported as well:
+
+    >>> test_equal_shape(arr1=numpy.ones((2, 3)),
+    ...                  arr2=numpy.ones((3, 2)))
+    Traceback (most recent call last):
+    ...
+    ValueError: The shapes of the following objects are not equal: arr1 (2, 3), arr2 (3, 2).
     """
     names = list(kwargs.keys())
-    shapes = numpy.array([numpy.array(array).shape
-                          for array in kwargs.values()])
-    if any(shapes[:-1] != shapes[1:]):
+    shapes = [numpy.array(array).shape for array in kwargs.values()]
+    if len(set(shapes)) > 1:
         raise ValueError(
             'The shapes of the following objects are not equal: %s.'
-            % ', '.join('%s %s' % (name, tuple(shape)) for (name, shape)
+            % ', '.join('%s %s' % (name, shape) for (name, shape)
                         in sorted(zip(names, shapes))))
 
 
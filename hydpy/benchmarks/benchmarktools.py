@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""This module implements features for measuring the computation times
+of the main steps of HydPy workflows for synthetic projects of different
+size and topology.
+
+Function :func:`run` writes a project for each combination of the given
+topologies (see :const:`~hydpy.benchmarks.topologytools.TOPOLOGIES`)
+and network sizes via function
+:func:`~hydpy.benchmarks.projecttools.write_project`, and records the
+wall-clock times of the workflow steps listed in :const:`PHASES`, in
+pure Python mode and/or in Cython mode.  The results are returned as a
+nested dictionary, which function :func:`save_results` writes to a JSON
+file.  Function :func:`compare_results` reports all timings of a new
+run that are significantly slower than those of a reference run.
+
+The benchmarks can also be started from the command line, e.g.::
+
+    python -m hydpy.benchmarks.benchmarktools --topologies chain star \
+--sizes 10 100 --modes python cython --output results.json
+
+Note that the Cython models need to be compiled before their first
+application, which can take some time.  Hence, do not compare results
+of first runs with those of later runs.
+"""
+# import...
+# ...from standard library
+from __future__ import division, print_function
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy import pub
+from hydpy.core import autodoctools
+from hydpy.core import devicetools
+from hydpy.core import hydpytools
+from hydpy.core import timetools
+from hydpy.benchmarks import projecttools
+from hydpy.benchmarks import topologytools
+
+PHASES = ('init_models', 'loadconditions', 'prepare_inputseries',
+          'prepare_fluxseries', 'prepare_stateseries', 'prepare_simseries',
+          'doit', 'save_fluxseries', 'save_stateseries', 'save_simseries')
+"""Names of the methods of class :class:`~hydpy.core.hydpytools.HydPy`,
+whose computation times are measured (in the given order)."""
+MODES = ('python', 'cython')
+"""Names of the available simulation modes."""
+PROJECTNAME = 'benchmark'
+"""Name of all benchmark projects."""
+
+
+def run_benchmark(dirpath, mode='python', ramflag=True):
+    """Execute the workflow of the HydPy project stored in the given
+    directory and return the computation times of all :const:`PHASES`
+    in a dictionary.
+
+    Function :func:`run_benchmark` clears the registries of all nodes
+    and elements and changes the current working directory temporarily.
+    Argument `mode` must be one of the :const:`MODES`:
+
+    >>> from hydpy.benchmarks.benchmarktools import run_benchmark
+    >>> run_benchmark('.', mode='fortran')
+    Traceback (most recent call last):
+    ...
+    ValueError: The given simulation mode `fortran` is not available.  \
+Please choose one of the following: python, cython.
+    """
+    _checkmode(mode)
+    cwd = os.getcwd()
+    os.chdir(dirpath)
+    try:
+        devicetools.Node.clear_registry()
+        devicetools.Element.clear_registry()
+        with pub.options.usecython(mode == 'cython'), \
+                pub.options.printprogress(False):
+            hp = hydpytools.HydPy(PROJECTNAME, _worker=True)
+            hp.preparenetwork()
+            pub.sequencemanager.outputoverwrite = True
+            pub.sequencemanager.simoverwrite = True
+            times = {}
+            for phase in PHASES:
+                method = getattr(hp, phase)
+                time = timeit.default_timer()
+                if phase.startswith('prepare_'):
+                    method(ramflag)
+                else:
+                    method()
+                times[phase] = timeit.default_timer()-time
+        return times
+    finally:
+        os.chdir(cwd)
+
+
+def _checkmode(mode):
+    if mode not in MODES:
+        raise ValueError(
+            'The given simulation mode `%s` is not available.  Please '
+            'choose one of the following: %s.' % (mode, ', '.join(MODES)))
+
+
+def run(topologies=('chain', 'binarytree', 'star'), sizes=(10, 100),
+        modes=MODES, repetitions=1, firstdate='01.01.2000',
+        lastdate='01.01.2001', stepsize='1d', ramflag=True, seed=0,
+        dirpath=None):
+    """Benchmark all combinations of the given topologies, sizes, and
+    modes and return the results in a dictionary.
+
+    Each project is written into a subdirectory of `dirpath`.  If
+    `dirpath` is `None`, a temporary directory is used and removed
+    afterwards.  The returned dictionary provides information on the
+    system, under the key `system`, and the computation times of all
+    :const:`PHASES` for each single benchmark, under the key
+    `benchmarks`.
+
+    Unknown topologies result in the following error:
+
+    >>> from hydpy.benchmarks.benchmarktools import run
+    >>> run(topologies=['ring'])
+    Traceback (most recent call last):
+    ...
+    ValueError: The given topology `ring` is not available.  Please \
+choose one of the following: binarytree, chain, star.
+    """
+    for topology in topologies:
+        if topology not in topologytools.TOPOLOGIES:
+            raise ValueError(
+                'The given topology `%s` is not available.  Please choose '
+                'one of the following: %s.'
+                % (topology, ', '.join(sorted(topologytools.TOPOLOGIES))))
+    for mode in modes:
+        _checkmode(mode)
+    tempdir = dirpath is None
+    if tempdir:
+        dirpath = tempfile.mkdtemp(prefix='hydpy_benchmarks_')
+    results = {'system': systeminfo(),
+               'settings': {'firstdate': firstdate,
+                            'lastdate': lastdate,
+                            'stepsize': stepsize,
+                            'ramflag': ramflag,
+                            'seed': seed},
+               'benchmarks': []}
+    nmb_steps = len(timetools.Timegrid(firstdate, lastdate, stepsize))
+    try:
+        for topology in topologies:
+            for size in sizes:
+                network = topologytools.TOPOLOGIES[topology](size)
+                projectpath = os.path.join(dirpath, network.name)
+                projecttools.write_project(
+                    network, projectpath, projectname=PROJECTNAME,
+                    firstdate=firstdate, lastdate=lastdate,
+                    stepsize=stepsize, seed=seed)
+                for mode in modes:
+                    for repetition in range(repetitions):
+                        times = run_benchmark(projectpath, mode, ramflag)
+                        results['benchmarks'].append(
+                            {'network': network.name,
+                             'topology': topology,
+                             'size': size,
+                             'nmb_elements': len(network.elements),
+                             'nmb_nodes': len(network.nodes),
+                             'models': network.modelcounts,
+                             'nmb_steps': nmb_steps,
+                             'mode': mode,
+                             'repetition': repetition,
+                             'times': times,
+                             'total': sum(times.values())})
+    finally:
+        if tempdir:
+            shutil.rmtree(dirpath, ignore_errors=True)
+    return results
+
+
+def systeminfo():
+    """Return a dictionary containing the current date and the versions
+    of the relevant software components."""
+    try:
+        import Cython
+        cython = Cython.__version__
+    except ImportError:
+        cython = None
+    return {'date': datetime.datetime.now().isoformat(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'python': platform.python_version(),
+            'numpy': numpy.__version__,
+            'cython': cython}
+
+
+def save_results(results, filepath):
+    """Write the given results to a JSON file."""
+    with open(filepath, 'w') as file_:
+        json.dump(results, file_, indent=2, sort_keys=True)
+
+
+def load_results(filepath):
+    """Read results previously written by function :func:`save_results`."""
+    with open(filepath) as file_:
+        return json.load(file_)
+
+
+def compare_results(reference, current, threshold=1.2, mintime=0.01):
+    """Return a list of tuples, each one containing the network name,
+    the mode, the phase, the reference time, and the current time of
+    all phases, which took at least `threshold` times longer in the
+    current than in the reference run.
+
+    Only benchmarks available in both runs are compared.  If more than
+    one repetition is available, the fastest one is relevant.  Phases
+    taking less than `mintime` seconds in both runs are ignored, as
+    their timings are usually too noisy:
+
+    >>> from hydpy.benchmarks.benchmarktools import compare_results
+    >>> def results(*times):
+    ...     return {'benchmarks': [
+    ...         {'network': 'chain_10', 'mode': 'python',
+    ...          'times': {'doit': time, 'init_models': time/1000.}}
+    ...         for time in times]}
+    >>> compare_results(results(1.0, 1.1), results(1.3, 1.5))
+    [('chain_10', 'python', 'doit', 1.0, 1.3)]
+    >>> compare_results(results(1.0), results(1.1))
+    []
+    >>> compare_results(results(1.0), results(1.1), threshold=1.05)
+    [('chain_10', 'python', 'doit', 1.0, 1.1)]
+    """
+    reference = _fastest(reference)
+    current = _fastest(current)
+    regressions = []
+    for key in sorted(set(reference).intersection(current)):
+        if (max(reference[key], current[key]) >= mintime) and \
+                (current[key] >= threshold*reference[key]):
+            regressions.append(key + (reference[key], current[key]))
+    return regressions
+
+
+def _fastest(results):
+    times = {}
+    for benchmark in results['benchmarks']:
+        for (phase, time) in benchmark['times'].items():
+            key = (benchmark['network'], benchmark['mode'], phase)
+            times[key] = min(times.get(key, time), time)
+    return times
+
+
+def main(args=None):
+    """Run the benchmarks with the given command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Measure the computation times of synthetic HydPy '
+                    'projects.')
+    parser.add_argument('--topologies', nargs='+',
+                        default=['chain', 'binarytree', 'star'],
+                        choices=sorted(topologytools.TOPOLOGIES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10, 100])
+    parser.add_argument('--modes', nargs='+', default=list(MODES),
+                        choices=MODES)
+    parser.add_argument('--repetitions', type=int, default=1)
+    parser.add_argument('--firstdate', default='01.01.2000')
+    parser.add_argument('--lastdate', default='01.01.2001')
+    parser.add_argument('--stepsize', default='1d')
+    parser.add_argument('--disk', action='store_true',
+                        help='handle all time series on disk')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dirpath', default=None,
+                        help='directory for keeping the generated projects')
+    parser.add_argument('--output', default=None,
+                        help='path of the JSON file for the results')
+    parser.add_argument('--reference', default=None,
+                        help='path of a JSON file containing reference '
+                             'results to compare with')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args(args)
+    results = run(topologies=args.topologies, sizes=args.sizes,
+                  modes=args.modes, repetitions=args.repetitions,
+                  firstdate=args.firstdate, lastdate=args.lastdate,
+                  stepsize=args.stepsize, ramflag=not args.disk,
+                  seed=args.seed, dirpath=args.dirpath)
+    for benchmark in results['benchmarks']:
+        print('%-16s %-7s %8.3f s' % (benchmark['network'],
+                                      benchmark['mode'],
+                                      benchmark['total']))
+    if args.output:
+        save_results(results, args.output)
+    if args.reference:
+        regressions = compare_results(load_results(args.reference),
+                                      results, args.threshold)
+        for regression in regressions:
+            print('Regression: %s (%s), %s: %.3f s -> %.3f s' % regression)
+        if regressions:
+            return 1
+    return 0
+
+
+autodoctools.autodoc_module()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
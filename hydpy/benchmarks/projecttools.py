@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+"""This module implements features for writing complete HydPy projects
+based on the synthetic networks defined by module
+:mod:`~hydpy.benchmarks.topologytools`.
+
+Function :func:`write_project` writes the project's main file, its
+network file, the control and initial condition files of all elements,
+and the input series of all land elements.  The control parameter
+values are sampled randomly within ranges that result in valid and
+reasonably behaving models, but they are not meant to represent any
+real catchment.  The same applies to the synthetic meteorological input
+series.  Passing the same `seed` always results in the same project.
+"""
+# import...
+# ...from standard library
+from __future__ import division, print_function
+import os
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy.core import autodoctools
+from hydpy.core import timetools
+
+PARAMETERSTEP = '1d'
+"""Parameter step size of all written control files."""
+
+
+def _format(*values):
+    return ', '.join(str(round(float(value), 6)) for value in values)
+
+
+def _uniform(rng, lower, upper):
+    return _format(rng.uniform(lower, upper))
+
+
+def _control_hland_v1(rng, element):
+    nmbzones = rng.randint(1, 6)
+    zonetypes = rng.choice(('FIELD', 'FOREST', 'GLACIER', 'ILAKE'),
+                           size=nmbzones, p=(.45, .35, .1, .1))
+    zoneareas = rng.dirichlet(numpy.ones(nmbzones))*rng.uniform(10., 500.)
+    zonez = rng.uniform(2., 20., nmbzones)
+    zrel = _format(numpy.dot(zoneareas, zonez)/numpy.sum(zoneareas))
+    return ['area(%s)' % _format(numpy.sum(zoneareas)),
+            'nmbzones(%d)' % nmbzones,
+            'zonetype(%s)' % ', '.join(zonetypes),
+            'zonearea(%s)' % _format(*zoneareas),
+            'zonez(%s)' % _format(*zonez),
+            'zrelp(%s)' % zrel,
+            'zrelt(%s)' % zrel,
+            'zrele(%s)' % zrel,
+            'pcorr(%s)' % _uniform(rng, .9, 1.2),
+            'pcalt(%s)' % _uniform(rng, 0., .1),
+            'rfcf(%s)' % _uniform(rng, .9, 1.1),
+            'sfcf(%s)' % _uniform(rng, 1., 1.3),
+            'tcalt(%s)' % _uniform(rng, .5, .7),
+            'ecorr(%s)' % _uniform(rng, .9, 1.1),
+            'ecalt(%s)' % _uniform(rng, 0., .1),
+            'epf(%s)' % _uniform(rng, 0., .02),
+            'etf(%s)' % _uniform(rng, 0., .1),
+            'ered(%s)' % _uniform(rng, 0., .5),
+            'ttice(%s)' % _uniform(rng, -1., 1.),
+            'icmax(%s)' % _uniform(rng, .5, 3.),
+            'tt(%s)' % _uniform(rng, -1., 1.),
+            'ttint(%s)' % _uniform(rng, 0., 2.),
+            'dttm(%s)' % _uniform(rng, -.5, .5),
+            'cfmax(%s)' % _uniform(rng, 2., 5.),
+            'gmelt(%s)' % _uniform(rng, 3., 6.),
+            'cfr(%s)' % _uniform(rng, 0., .1),
+            'whc(%s)' % _uniform(rng, 0., .2),
+            'fc(%s)' % _uniform(rng, 100., 300.),
+            'lp(%s)' % _uniform(rng, .5, 1.),
+            'beta(%s)' % _uniform(rng, 1., 4.),
+            'percmax(%s)' % _uniform(rng, .5, 3.),
+            'cflux(%s)' % _uniform(rng, 0., 1.),
+            'resparea(%s)' % bool(rng.randint(2)),
+            'recstep(%d)' % rng.randint(10, 101),
+            'alpha(%s)' % _uniform(rng, 0., 1.),
+            'k(%s)' % _uniform(rng, .001, .1),
+            'k4(%s)' % _uniform(rng, .005, .1),
+            'gamma(%s)' % _uniform(rng, 0., 1.),
+            'maxbaz(%s)' % _uniform(rng, 0., 5.),
+            'abstr(%s)' % _uniform(rng, 0., .1)]
+
+
+def _control_lland(rng, element, version):
+    nhru = rng.randint(1, 6)
+    landuses = rng.choice(('ACKER', 'GRUE_I', 'LAUBW', 'NADELW', 'MISCHW',
+                           'SIED_L', 'VERS', 'WASSER'),
+                          size=nhru, p=(.2, .15, .15, .15, .1, .1, .1, .05))
+    lines = ['ft(%s)' % _uniform(rng, 10., 500.),
+             'nhru(%d)' % nhru,
+             'lnk(%s)' % ', '.join(landuses),
+             'fhru(%s)' % _format(*rng.dirichlet(numpy.ones(nhru)))]
+    if version == 1:
+        lines.append('hnn(%s)' % _format(*rng.uniform(100., 1000., nhru)))
+    lines.extend(('kg(%s)' % _uniform(rng, .9, 1.2),
+                  'kt(%s)' % _uniform(rng, -1., 1.),
+                  'ke(%s)' % _uniform(rng, .8, 1.2)))
+    if version == 1:
+        lines.append('kf(%s)' % _uniform(rng, .6, 1.))
+    lines.extend(('fln(%s)' % _uniform(rng, .5, 1.2),
+                  'hinz(%s)' % _uniform(rng, .1, .3),
+                  'lai(%s)' % _uniform(rng, 1., 8.),
+                  'treft(%s)' % _uniform(rng, -1., 1.),
+                  'trefn(%s)' % _uniform(rng, -1., 1.),
+                  'tgr(%s)' % _uniform(rng, 0., 1.),
+                  'tsp(%s)' % _uniform(rng, 1., 3.),
+                  'gtf(%s)' % _uniform(rng, 2., 6.),
+                  'rschmelz(334.0)',
+                  'cpwasser(4.1868)',
+                  'pwmax(%s)' % _uniform(rng, 1.2, 1.6),
+                  'grasref_r(%s)' % _uniform(rng, 4., 6.),
+                  'nfk(%s)' % _uniform(rng, 50., 300.),
+                  'relwz(%s)' % _uniform(rng, .5, .9),
+                  'relwb(%s)' % _uniform(rng, .01, .1),
+                  'beta(%s)' % _uniform(rng, .005, .05),
+                  'fbeta(%s)' % _uniform(rng, 1., 2.),
+                  'dmax(%s)' % _uniform(rng, 2., 10.),
+                  'dmin(%s)' % _uniform(rng, .1, 1.),
+                  'bsf(%s)' % _uniform(rng, .2, .6),
+                  'a1(%s)' % _uniform(rng, .5, 5.),
+                  'a2(%s)' % _uniform(rng, 0., 2.),
+                  'tind(%s)' % _uniform(rng, .5, 10.),
+                  'eqb(%s)' % _uniform(rng, 5000., 20000.),
+                  'eqi1(%s)' % _uniform(rng, 2000., 5000.),
+                  'eqi2(%s)' % _uniform(rng, 1000., 2000.),
+                  'eqd1(%s)' % _uniform(rng, 100., 1000.),
+                  'eqd2(%s)' % _uniform(rng, 10., 100.)))
+    return lines
+
+
+def _control_lland_v1(rng, element):
+    return _control_lland(rng, element, 1)
+
+
+def _control_lland_v2(rng, element):
+    return _control_lland(rng, element, 2)
+
+
+def _control_hstream_v1(rng, element):
+    return ['lag(%s)' % _uniform(rng, 0., 2.),
+            'damp(%s)' % _uniform(rng, 0., 1.)]
+
+
+def _control_lstream_v1(rng, element):
+    def scaled(*values):
+        return _format(*(value*rng.uniform(.5, 2.) for value in values))
+    return ['laen(%s)' % _uniform(rng, 5., 50.),
+            'gef(%s)' % _uniform(rng, .0005, .005),
+            'hm(%s)' % scaled(1.),
+            'bm(%s)' % scaled(2.),
+            'bv(%s)' % scaled(.5, 10.),
+            'bbv(%s)' % scaled(1., 2.),
+            'bnm(%s)' % scaled(4.),
+            'bnv(%s)' % scaled(1., 8.),
+            'bnvr(%s)' % scaled(20.),
+            'skm(%s)' % scaled(20.),
+            'skv(%s)' % scaled(60., 80.),
+            'ekm(%s)' % _uniform(rng, .8, 1.2),
+            'ekv(%s)' % _uniform(rng, .8, 1.2),
+            'qtol(1e-06)',
+            'htol(1e-06)']
+
+
+def _control_arma_v1(rng, element):
+    if rng.randint(2):
+        ar = rng.uniform(.1, .6)
+        responses = ((round(ar, 6),), (round(1.-ar, 6),))
+    else:
+        weights = rng.dirichlet(numpy.ones(rng.randint(1, 6)))
+        responses = ((), tuple(round(weight, 6) for weight in weights))
+    return ['responses(%s)' % (responses,)]
+
+
+def _control_llake_v1(rng, element):
+    n = rng.randint(2, 6)
+
+    def increasing(lower, upper):
+        return _format(*numpy.cumsum(
+            numpy.concatenate(([0.], rng.uniform(lower, upper, n-1)))))
+    return ['n(%d)' % n,
+            'w(%s)' % increasing(.5, 2.),
+            'v(%s)' % increasing(1e5, 1e6),
+            'q(%s)' % increasing(1., 50.),
+            "maxdt('6h')",
+            'maxdw(%s)' % _uniform(rng, 0., .1),
+            'verzw(0.0)']
+
+
+def _control_dam_v1(rng, element):
+    return ['catchmentarea(%s)' % _uniform(rng, 10., 1000.),
+            'nmblogentries(1)',
+            'remotedischargeminimum(%s)' % _uniform(rng, 0., 2.),
+            'remotedischargesavety(%s)' % _uniform(rng, 0., .5),
+            'neardischargeminimumthreshold(%s)' % _uniform(rng, 0., .5),
+            'neardischargeminimumtolerance(%s)' % _uniform(rng, 0., .2),
+            'waterlevelminimumthreshold(%s)' % _uniform(rng, 0., .01),
+            'waterlevelminimumtolerance(%s)' % _uniform(rng, 0., .01),
+            'watervolume2waterlevel(weights_input=1e-6, weights_output=1e6,',
+            '                       intercepts_hidden=0.0, '
+            'intercepts_output=-1e6/2)',
+            'waterlevel2flooddischarge(weights_input=%s, weights_output=1e7,'
+            % _uniform(rng, 1e-5, 1e-4),
+            '                          intercepts_hidden=0.0, '
+            'intercepts_output=-1e7/2)']
+
+
+def _control_hbranch_v1(rng, element):
+    x1 = rng.uniform(1., 10.)
+    x2 = x1+rng.uniform(10., 100.)
+    share = rng.uniform(.5, .9)
+    (downstream, diversion) = element.outlets
+    return ['xpoints(%s)' % _format(0., x1, x2),
+            'ypoints(%s=[%s],' % (downstream,
+                                  _format(0., x1, x1+share*(x2-x1))),
+            '        %s=[%s])' % (diversion,
+                                  _format(0., 0., (1.-share)*(x2-x1)))]
+
+
+CONTROLFILES = {'hland_v1': _control_hland_v1,
+                'lland_v1': _control_lland_v1,
+                'lland_v2': _control_lland_v2,
+                'hstream_v1': _control_hstream_v1,
+                'lstream_v1': _control_lstream_v1,
+                'arma_v1': _control_arma_v1,
+                'llake_v1': _control_llake_v1,
+                'dam_v1': _control_dam_v1,
+                'hbranch_v1': _control_hbranch_v1}
+"""Functions returning the lines of randomly parameterized control files
+of the supported models."""
+
+
+def _conditions_hland_v1(rng, element, controllines):
+    fc = float(_getvalue(controllines, 'fc'))
+    return ['ic(0.0)',
+            'sp(0.0)',
+            'wc(0.0)',
+            'sm(%s)' % _format(rng.uniform(.3, .9)*fc),
+            'uz(%s)' % _uniform(rng, 0., 10.),
+            'lz(%s)' % _uniform(rng, 0., 50.),
+            'quh(0.0)']
+
+
+def _conditions_lland(rng, element, controllines):
+    nfk = float(_getvalue(controllines, 'nfk'))
+    return ['inzp(0.0)',
+            'wats(0.0)',
+            'waes(0.0)',
+            'bowa(%s)' % _format(rng.uniform(.3, .9)*nfk),
+            'qdgz1(0.0)',
+            'qdgz2(0.0)',
+            'qigz1(0.0)',
+            'qigz2(0.0)',
+            'qbgz(%s)' % _uniform(rng, 0., 1.),
+            'qdga1(0.0)',
+            'qdga2(0.0)',
+            'qiga1(0.0)',
+            'qiga2(0.0)',
+            'qbga(%s)' % _uniform(rng, 0., 1.)]
+
+
+def _conditions_hstream_v1(rng, element, controllines):
+    return ['qjoints(%s)' % _uniform(rng, 1., 10.)]
+
+
+def _conditions_lstream_v1(rng, element, controllines):
+    discharge = _uniform(rng, 1., 10.)
+    return ['qz(%s)' % discharge,
+            'qa(%s)' % discharge]
+
+
+def _conditions_arma_v1(rng, element, controllines):
+    discharge = _uniform(rng, 1., 10.)
+    return ['login(%s)' % discharge,
+            'logout(%s)' % discharge]
+
+
+def _conditions_llake_v1(rng, element, controllines):
+    return ['v(0.0)',
+            'w(0.0)']
+
+
+def _conditions_dam_v1(rng, element, controllines):
+    return ['watervolume(%s)' % _uniform(rng, 0., 1.),
+            'loggedtotalremotedischarge(%s)' % _uniform(rng, 1., 10.),
+            'loggedoutflow(0.0)']
+
+
+CONDITIONFILES = {'hland_v1': _conditions_hland_v1,
+                  'lland_v1': _conditions_lland,
+                  'lland_v2': _conditions_lland,
+                  'hstream_v1': _conditions_hstream_v1,
+                  'lstream_v1': _conditions_lstream_v1,
+                  'arma_v1': _conditions_arma_v1,
+                  'llake_v1': _conditions_llake_v1,
+                  'dam_v1': _conditions_dam_v1}
+"""Functions returning the lines of initial condition files consistent
+with the given control file lines of the supported models (models
+without any conditions are omitted)."""
+
+INPUTSEQUENCES = {'hland_v1': ('p', 't', 'tn', 'epn'),
+                  'lland_v1': ('nied', 'teml', 'glob'),
+                  'lland_v2': ('nied', 'teml', 'pet')}
+"""Names of the input sequences of the supported models (models without
+any input sequences are omitted)."""
+
+
+def _getvalue(lines, name):
+    prefix = name + '('
+    for line in lines:
+        if line.startswith(prefix):
+            return line[len(prefix):-1]
+    raise KeyError(name)
+
+
+def synthetic_inputs(rng, timegrid):
+    """Return a :class:`dict` containing synthetic meteorological input
+    series for the given :class:`~hydpy.core.timetools.Timegrid` object.
+
+    The series follow a simple annual cycle, superimposed by random
+    fluctuations.  Precipitation is given in mm per simulation step,
+    air temperature in °C, global radiation in W/m², and potential
+    evaporation in mm per simulation step:
+
+    >>> import numpy
+    >>> from hydpy import Timegrid
+    >>> from hydpy.benchmarks.projecttools import synthetic_inputs
+    >>> inputs = synthetic_inputs(numpy.random.RandomState(0),
+    ...                           Timegrid('01.01.2000', '01.01.2001', '1d'))
+    >>> sorted(inputs.keys())
+    ['epn', 'glob', 'nied', 'p', 'pet', 't', 'teml', 'tn']
+    >>> inputs['p'].shape
+    (366,)
+    >>> from hydpy.core.objecttools import round_
+    >>> round_(numpy.min(inputs['p']) >= 0.)
+    True
+    >>> round_(numpy.mean(inputs['tn'][:31]) < numpy.mean(inputs['tn'][182:213]))
+    True
+
+    All input sequences of the same kind refer to the same data:
+
+    >>> inputs['p'] is inputs['nied']
+    True
+    """
+    nmb = len(timegrid)
+    days = timegrid.stepsize.days
+    phase = numpy.cos(2.*numpy.pi*(numpy.arange(nmb)*days-15.)/365.)
+    tn = 8.-10.*phase
+    t = tn+rng.normal(0., 3., nmb)
+    p = (rng.uniform(size=nmb) < min(.4*days, 1.))*rng.gamma(.7, 8.*days, nmb)
+    glob = numpy.clip(150.-100.*phase+rng.normal(0., 30., nmb), 0., None)
+    epn = days*numpy.clip(.2+.15*tn, 0., None)
+    pet = days*numpy.clip(.2+.15*t, 0., None)
+    return {'p': p, 'nied': p,
+            't': t, 'teml': t,
+            'tn': tn,
+            'epn': epn,
+            'pet': pet,
+            'glob': glob}
+
+
+def write_project(network, dirpath, projectname='benchmark',
+                  firstdate='01.01.2000', lastdate='01.01.2001',
+                  stepsize='1d', seed=0):
+    """Write a complete HydPy project for the given
+    :class:`~hydpy.benchmarks.topologytools.Network` object into the
+    given directory.
+
+    The following structure results (for the default project name):
+
+      * benchmark.py (main file defining the time grids)
+      * network/benchmark/<network name>.py
+      * control/benchmark/default/<element name>.py
+      * conditions/benchmark/init_<first date>/<element name>.py
+      * sequences/benchmark/input/<element name>_input_<sequence>.npy
+      * sequences/benchmark/output, .../node, and .../temp (empty)
+
+    Note that :mod:`~hydpy.models.lland_v1` is designed for daily step
+    sizes only.
+    """
+    rng = numpy.random.RandomState(seed)
+    timegrid = timetools.Timegrid(firstdate, lastdate, stepsize)
+    conditiondir = 'init_' + timegrid.firstdate.string('os')
+    dirpaths = {}
+    for (key, subpath) in (
+            ('network', ('network', projectname)),
+            ('control', ('control', projectname, 'default')),
+            ('conditions', ('conditions', projectname, conditiondir)),
+            ('input', ('sequences', projectname, 'input')),
+            ('output', ('sequences', projectname, 'output')),
+            ('node', ('sequences', projectname, 'node')),
+            ('temp', ('sequences', projectname, 'temp'))):
+        dirpaths[key] = os.path.join(dirpath, *subpath)
+        if not os.path.exists(dirpaths[key]):
+            os.makedirs(dirpaths[key])
+    with open(os.path.join(dirpath, projectname+'.py'), 'w') as file_:
+        file_.write('from hydpy import Timegrid, Timegrids\n\n'
+                    "timegrids = Timegrids(Timegrid('%s', '%s', '%s'))\n"
+                    % (timegrid.firstdate, timegrid.lastdate,
+                       timegrid.stepsize))
+    with open(os.path.join(dirpaths['network'],
+                           network.name+'.py'), 'w') as file_:
+        file_.write(network.networkfile())
+    inputs = synthetic_inputs(rng, timegrid)
+    for element in network.elements:
+        header = 'from hydpy.models.%s import *\n\n' % element.model
+        controllines = CONTROLFILES[element.model](rng, element)
+        with open(os.path.join(dirpaths['control'],
+                               element.name+'.py'), 'w') as file_:
+            file_.write(header)
+            file_.write('parameterstep("%s")\nsimulationstep("%s")\n\n'
+                        % (PARAMETERSTEP, timegrid.stepsize))
+            file_.write('\n'.join(controllines) + '\n')
+        writer = CONDITIONFILES.get(element.model)
+        if writer:
+            with open(os.path.join(dirpaths['conditions'],
+                                   element.name+'.py'), 'w') as file_:
+                file_.write(header)
+                file_.write('\n'.join(writer(rng, element, controllines)))
+                file_.write('\n')
+        for name in INPUTSEQUENCES.get(element.model, ()):
+            values = inputs[name]
+            if name in ('p', 'nied'):
+                values = values*rng.uniform(.8, 1.2)
+            elif name in ('t', 'teml'):
+                values = values+rng.normal(0., 1.)
+            numpy.save(os.path.join(dirpaths['input'], '%s_input_%s.npy'
+                                    % (element.name, name)),
+                       timegrid.array2series(values))
+
+
+autodoctools.autodoc_module()
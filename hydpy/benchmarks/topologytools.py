@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""This module implements features for defining synthetic river networks
+of arbitrary size, serving as test cases for the benchmarks of module
+:mod:`~hydpy.benchmarks.benchmarktools`.
+
+Each network consists of a number of subbasins.  Each subbasin is drained
+by a single "land" element, passing its runoff to the node of the
+subbasin.  Each subbasin except the first one is connected to a
+downstream subbasin by a single "routing" element.  Functions
+:func:`chain`, :func:`binarytree`, and :func:`star` define the relevant
+downstream relationships for three basic topologies.  The applied
+models are selected from the tuples :const:`LANDMODELS` and
+:const:`ROUTINGMODELS` in a cyclical manner.
+"""
+# import...
+# ...from standard library
+from __future__ import division, print_function
+# ...from HydPy
+from hydpy.core import autodoctools
+from hydpy.core import objecttools
+
+LANDMODELS = ('hland_v1', 'lland_v1', 'lland_v2')
+"""Names of the models applicable for land elements."""
+ROUTINGMODELS = ('hstream_v1', 'lstream_v1', 'arma_v1',
+                 'llake_v1', 'dam_v1', 'hbranch_v1')
+"""Names of the models applicable for routing elements."""
+
+
+class ElementSpec(object):
+    """Specification of a single element of a synthetic network.
+
+    The string representation of :class:`ElementSpec` objects agrees
+    with the one of :class:`~hydpy.core.devicetools.Element` objects,
+    which allows for writing network files directly:
+
+    >>> from hydpy.benchmarks.topologytools import ElementSpec
+    >>> ElementSpec('routing_1', 'dam_v1', 'routing',
+    ...             inlets='node_1', outlets='node_0', receivers='node_0')
+    Element("routing_1",
+            inlets="node_1",
+            outlets="node_0",
+            receivers="node_0",
+            keywords=["dam_v1", "routing"])
+    """
+
+    def __init__(self, name, model, group,
+                 inlets=(), outlets=(), receivers=()):
+        self.name = name
+        self.model = model
+        self.group = group
+        self.inlets = self._totuple(inlets)
+        self.outlets = self._totuple(outlets)
+        self.receivers = self._totuple(receivers)
+
+    @staticmethod
+    def _totuple(values):
+        if isinstance(values, str):
+            return (values,)
+        return tuple(values)
+
+    @property
+    def nodes(self):
+        """All nodes the element is connected with."""
+        return self.inlets + self.outlets + self.receivers
+
+    def __repr__(self):
+        lines = ['Element("%s",' % self.name]
+        for name in ('inlets', 'outlets', 'receivers'):
+            nodes = getattr(self, name)
+            if len(nodes) == 1:
+                lines.append('        %s="%s",' % (name, nodes[0]))
+            elif nodes:
+                lines.append('        %s=[%s],'
+                             % (name, ', '.join('"%s"' % node
+                                                for node in nodes)))
+        lines.append('        keywords=["%s", "%s"])'
+                     % tuple(sorted((self.model, self.group))))
+        return '\n'.join(lines)
+
+    def __dir__(self):
+        return objecttools.dir_(self)
+
+
+class Network(object):
+    """Synthetic river network, defined by the downstream relationships
+    between its subbasins.
+
+    Argument `downstream` must contain the index of the downstream
+    subbasin of each subbasin.  The first subbasin is the outlet of
+    the network, so its downstream index must be `None`.  All other
+    subbasins must drain into subbasins with smaller indices, which
+    excludes cycles by definition.  The following network consists of
+    four subbasins, with the second and the fourth one draining into
+    the first one:
+
+    >>> from hydpy.benchmarks.topologytools import Network
+    >>> network = Network('test', (None, 0, 1, 0))
+    >>> network
+    Network('test', (None, 0, 1, 0))
+    >>> network.size
+    4
+
+    Each subbasin is represented by a land element and each downstream
+    relationship by a routing element:
+
+    >>> for element in network.elements:
+    ...     print(element.name, element.model,
+    ...           element.inlets, element.outlets)
+    land_0 hland_v1 () ('node_0',)
+    land_1 lland_v1 () ('node_1',)
+    routing_1 hstream_v1 ('node_1',) ('node_0',)
+    land_2 lland_v2 () ('node_2',)
+    routing_2 lstream_v1 ('node_2',) ('node_1',)
+    land_3 hland_v1 () ('node_3',)
+    routing_3 arma_v1 ('node_3',) ('node_0',)
+
+    Dam models (:mod:`~hydpy.models.dam_v1`) additionally receive the
+    discharge of their downstream node, and branch models
+    (:mod:`~hydpy.models.hbranch_v1`) divert parts of their inflow to an
+    additional node, which is not connected to any other element:
+
+    >>> network = Network('test', (None, 0, 1),
+    ...                   landmodels=['hland_v1'],
+    ...                   routingmodels=['dam_v1', 'hbranch_v1'])
+    >>> network.elements[-1]
+    Element("routing_2",
+            inlets="node_2",
+            outlets=["node_1", "diversion_2"],
+            keywords=["hbranch_v1", "routing"])
+    >>> network.nodes
+    ('diversion_2', 'node_0', 'node_1', 'node_2')
+    >>> sorted(network.modelcounts.items())
+    [('dam_v1', 1), ('hbranch_v1', 1), ('hland_v1', 3)]
+
+    Method :func:`~Network.networkfile` returns the text of a network
+    file defining all elements.
+
+    Wrong downstream relationships and unknown models result in the
+    following error messages:
+
+    >>> Network('test', (0, 0))
+    Traceback (most recent call last):
+    ...
+    ValueError: The first subbasin of network `test` must be its outlet, \
+but its downstream index is `0` instead of `None`.
+    >>> Network('test', (None, 1))
+    Traceback (most recent call last):
+    ...
+    ValueError: Subbasin `1` of network `test` must drain into a subbasin \
+with a smaller index, but its downstream index is `1`.
+    >>> Network('test', (None, 0), routingmodels=['hland_v1'])
+    Traceback (most recent call last):
+    ...
+    ValueError: Model `hland_v1` cannot be applied on routing elements.  \
+Please choose one of the following: hstream_v1, lstream_v1, arma_v1, \
+llake_v1, dam_v1, hbranch_v1.
+    """
+
+    def __init__(self, name, downstream,
+                 landmodels=LANDMODELS, routingmodels=ROUTINGMODELS):
+        self.name = str(name)
+        self.downstream = tuple(downstream)
+        self.landmodels = self._checkmodels(landmodels, LANDMODELS, 'land')
+        self.routingmodels = self._checkmodels(
+            routingmodels, ROUTINGMODELS, 'routing')
+        if (not self.downstream) or (self.downstream[0] is not None):
+            raise ValueError(
+                'The first subbasin of network `%s` must be its outlet, but '
+                'its downstream index is `%s` instead of `None`.'
+                % (self.name, self.downstream[0] if self.downstream else '-'))
+        for (idx, jdx) in enumerate(self.downstream[1:], 1):
+            if (jdx is None) or not (0 <= jdx < idx):
+                raise ValueError(
+                    'Subbasin `%d` of network `%s` must drain into a subbasin '
+                    'with a smaller index, but its downstream index is `%s`.'
+                    % (idx, self.name, jdx))
+        self.elements = self._getelements()
+
+    @staticmethod
+    def _checkmodels(models, available, group):
+        models = tuple(models)
+        if not models:
+            raise ValueError('At least one model for the %s elements must '
+                             'be given.' % group)
+        for model in models:
+            if model not in available:
+                raise ValueError(
+                    'Model `%s` cannot be applied on %s elements.  Please '
+                    'choose one of the following: %s.'
+                    % (model, group, ', '.join(available)))
+        return models
+
+    def _getelements(self):
+        elements = []
+        for (idx, jdx) in enumerate(self.downstream):
+            node = 'node_%d' % idx
+            elements.append(
+                ElementSpec('land_%d' % idx,
+                            self.landmodels[idx % len(self.landmodels)],
+                            'land', outlets=node))
+            if jdx is None:
+                continue
+            model = self.routingmodels[(idx-1) % len(self.routingmodels)]
+            outlets = ['node_%d' % jdx]
+            receivers = []
+            if model == 'hbranch_v1':
+                outlets.append('diversion_%d' % idx)
+            elif model == 'dam_v1':
+                receivers.append(outlets[0])
+            elements.append(
+                ElementSpec('routing_%d' % idx, model, 'routing',
+                            inlets=node, outlets=outlets,
+                            receivers=receivers))
+        return elements
+
+    @property
+    def size(self):
+        """Number of subbasins."""
+        return len(self.downstream)
+
+    @property
+    def nodes(self):
+        """Sorted names of all nodes."""
+        names = set()
+        for element in self.elements:
+            names.update(element.nodes)
+        return tuple(sorted(names))
+
+    @property
+    def modelcounts(self):
+        """Number of elements handling the different models."""
+        counts = {}
+        for element in self.elements:
+            counts[element.model] = counts.get(element.model, 0) + 1
+        return counts
+
+    def networkfile(self):
+        """Return the text of a network file defining all nodes and
+        elements of the network."""
+        lines = ['# -*- coding: utf-8 -*-', '',
+                 'from hydpy import Node, Element', '']
+        for node in self.nodes:
+            lines.append('Node("%s")' % node)
+        for element in self.elements:
+            lines.extend(('', repr(element)))
+        return '\n'.join(lines) + '\n'
+
+    def __repr__(self):
+        return 'Network(%r, %r)' % (self.name, self.downstream)
+
+    def __dir__(self):
+        return objecttools.dir_(self)
+
+
+def chain(size, **kwargs):
+    """Return a :class:`Network` object, in which each subbasin drains
+    into the subbasin with the next smaller index.
+
+    >>> from hydpy.benchmarks.topologytools import chain
+    >>> chain(4)
+    Network('chain_4', (None, 0, 1, 2))
+
+    Additional keyword arguments are passed to :class:`Network`.
+    """
+    return Network('chain_%d' % size,
+                   [None] + list(range(size-1)), **kwargs)
+
+
+def binarytree(size, **kwargs):
+    """Return a :class:`Network` object, in which each subbasin has (at
+    most) two upstream subbasins.
+
+    >>> from hydpy.benchmarks.topologytools import binarytree
+    >>> binarytree(6)
+    Network('binarytree_6', (None, 0, 0, 1, 1, 2))
+
+    Additional keyword arguments are passed to :class:`Network`.
+    """
+    return Network('binarytree_%d' % size,
+                   [None] + [(idx-1)//2 for idx in range(1, size)], **kwargs)
+
+
+def star(size, **kwargs):
+    """Return a :class:`Network` object, in which all subbasins drain
+    into the first one directly.
+
+    >>> from hydpy.benchmarks.topologytools import star
+    >>> star(4)
+    Network('star_4', (None, 0, 0, 0))
+
+    Additional keyword arguments are passed to :class:`Network`.
+    """
+    return Network('star_%d' % size, [None] + [0]*(size-1), **kwargs)
+
+
+TOPOLOGIES = {'chain': chain,
+              'binarytree': binarytree,
+              'star': star}
+"""Functions defining the available network topologies."""
+
+
+autodoctools.autodoc_module()
@@ -7,7 +7,6 @@ structure HydPy projects.
 # ...from standard library
 from __future__ import division, print_function
 import copy
-import struct
 import weakref
 # ...from site-packages
 from matplotlib import pyplot
@@ -586,11 +585,8 @@ Keep in mind, that `name` is the unique identifier of node objects.
         Used during simulations in Python mode only.
         """
         fastaccess = self.sequences.fastaccess
-        if fastaccess._sim_ramflag:
-            fastaccess.sim[0] = fastaccess._sim_array[idx]
-        elif fastaccess._sim_diskflag:
-            raw = fastaccess._sim_file.read(8)
-            fastaccess.sim[0] = struct.unpack('d', raw)
+        if fastaccess._sim_ramflag or fastaccess._sim_diskflag:
+            fastaccess.sim[0] = fastaccess.loadvalues('sim', idx)
 
     def _savedata_sim(self, idx):
         """Save the last sim sequence value (of the given index).
@@ -598,11 +594,8 @@ Keep in mind, that `name` is the unique identifier of node objects.
         Used during simulations in Python mode only.
         """
         fastaccess = self.sequences.fastaccess
-        if fastaccess._sim_ramflag:
-            fastaccess._sim_array[idx] = fastaccess.sim[0]
-        elif fastaccess._sim_diskflag:
-            raw = struct.pack('d', fastaccess.sim[0])
-            fastaccess._sim_file.write(raw)
+        if fastaccess._sim_ramflag or fastaccess._sim_diskflag:
+            fastaccess.savevalues('sim', idx, fastaccess.sim[0])
 
     def _loaddata_obs(self, idx):
         """Load the next obs sequence value (of the given index).
@@ -610,11 +603,8 @@ Keep in mind, that `name` is the unique identifier of node objects.
         Used during simulations in Python mode only.
         """
         fastaccess = self.sequences.fastaccess
-        if fastaccess._obs_ramflag:
-            fastaccess.obs[0] = fastaccess._obs_array[idx]
-        elif fastaccess._obs_diskflag:
-            raw = fastaccess._obs_file.read(8)
-            fastaccess.obs[0] = struct.unpack('d', raw)
+        if fastaccess._obs_ramflag or fastaccess._obs_diskflag:
+            fastaccess.obs[0] = fastaccess.loadvalues('obs', idx)
 
     def prepare_allseries(self, ramflag=True):
         """Prepare the series objects of both the `sim` and the `obs` sequence.
@@ -1013,26 +1003,34 @@ assigned to the element so far.
         """
         self._prepare_series('inputs', ramflag)
 
-    def prepare_fluxseries(self, ramflag=True):
+    def prepare_fluxseries(self, ramflag=True, aggregation=None):
         """Prepare the series objects of the `flux` sequences of the model
         handled by this element.
 
         See method :func:`Element.prepare_allseries` for further information.
+        Optionally, pass a tuple containing an aggregation mode and step
+        size to store aggregated series only (see method
+        :func:`~hydpy.core.sequencetools.ModelIOSequence.activate_aggregation`).
+        Otherwise, any previously activated aggregation is deactivated.
         """
-        self._prepare_series('fluxes', ramflag)
+        self._prepare_series('fluxes', ramflag, aggregation)
 
-    def prepare_stateseries(self, ramflag=True):
+    def prepare_stateseries(self, ramflag=True, aggregation=None):
         """Prepare the series objects of the `state` sequences of the model
         handled by this element.
 
-        See method :func:`Element.prepare_allseries` for further information.
+        See method :func:`Element.prepare_fluxseries` for further information.
         """
-        self._prepare_series('states', ramflag)
+        self._prepare_series('states', ramflag, aggregation)
 
-    def _prepare_series(self, name_subseqs, ramflag):
+    def _prepare_series(self, name_subseqs, ramflag, aggregation=None):
         sequences = self.model.sequences
         subseqs = getattr(sequences, name_subseqs, None)
         if subseqs:
+            if aggregation is None:
+                subseqs.deactivate_aggregation()
+            else:
+                subseqs.activate_aggregation(*aggregation)
             if ramflag:
                 subseqs.activate_ram()
             else:
@@ -1579,17 +1577,17 @@ class Elements(Devices):
         for element in self:
             element.prepare_inputseries(ramflag)
 
-    def prepare_fluxseries(self, ramflag=True):
+    def prepare_fluxseries(self, ramflag=True, aggregation=None):
         """Call method :func:`~Element.prepare_fluxseries` of all handled
         elements."""
         for element in self:
-            element.prepare_fluxseries(ramflag)
+            element.prepare_fluxseries(ramflag, aggregation)
 
-    def prepare_stateseries(self, ramflag=True):
+    def prepare_stateseries(self, ramflag=True, aggregation=None):
         """Call method :func:`~Element.prepare_stateseries` of all handled
         elements."""
         for element in self:
-            element.prepare_stateseries(ramflag)
+            element.prepare_stateseries(ramflag, aggregation)
 
 
 autodoctools.autodoc_module()
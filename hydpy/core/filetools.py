@@ -431,9 +431,16 @@ class FolderShow(object):
 
 
 class SequenceManager(object):
-    """Manager for sequence files."""
+    """Manager for sequence files.
 
-    _supportedmodes = ('npy', 'asc')
+    Supported file types are `npy` (binary numpy files), `asc` (text
+    files), `store` (consolidated files containing the series of all
+    devices, see module :mod:`~hydpy.core.seriestools`), and `chunked`
+    (compressed files, see class
+    :class:`~hydpy.core.seriestools.ChunkedFile`).
+    """
+
+    _supportedmodes = ('npy', 'asc', 'store', 'chunked')
 
     def __init__(self, projectdirectory=None, inputdirectory=None,
                  outputdirectory=None, nodedirectory=None, tempdirectory=None,
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""This module implements an index of the connections between the
+:class:`~hydpy.core.devicetools.Node` and
+:class:`~hydpy.core.devicetools.Element` objects of a network.
+
+Class :class:`NetworkGraph` collects the connections once and stores them
+in form of adjacency arrays.  All graph algorithms (determining the end
+nodes, the simulation order, the devices upstream or downstream of a
+given starting point, and the connected components) work iteratively on
+these arrays.  Hence, their computation times increase linearly with
+network size, and there is no recursion limit with regard to the length
+of river channels.
+"""
+# import...
+# ...from standard library
+from __future__ import division, print_function
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy.core import objecttools
+from hydpy.core import devicetools
+from hydpy.core import autodoctools
+
+
+class NetworkGraph(object):
+    """Index of the connections between the given nodes and elements.
+
+    We define the following network, where two headwater elements drain
+    into a common node, which is the inlet of a dam (also receiving the
+    discharge of its outlet node), and a separate network consisting of
+    a single element:
+
+    >>> from hydpy import Node, Nodes, Element, Elements
+    >>> nodes = Nodes('n1', 'n2', 'n3', 'n4', 'n5', 'n6')
+    >>> elements = Elements(
+    ...     Element('e1', outlets='n1'),
+    ...     Element('e2', inlets='n2', outlets='n1'),
+    ...     Element('dam', inlets='n1', outlets='n3', receivers='n3'),
+    ...     Element('e3', inlets='n5', outlets='n6'))
+    >>> from hydpy.core.graphtools import NetworkGraph
+    >>> graph = NetworkGraph(nodes, elements)
+
+    Each device is identified by an index.  The indices of the nodes come
+    first, all indices are sorted by device names:
+
+    >>> for device in graph.devices:
+    ...     print(graph.index(device), device)
+    0 n1
+    1 n2
+    2 n3
+    3 n4
+    4 n5
+    5 n6
+    6 dam
+    7 e1
+    8 e2
+    9 e3
+    >>> graph.index(nodes.n3), graph.index(elements.dam)
+    (2, 6)
+
+    The downstream connections lead from inlet nodes to elements and from
+    elements to outlet nodes.  Receiver nodes are ignored, as their values
+    are passed at the end of each simulation step.  The connections are
+    stored in compressed sparse row format:
+
+    >>> graph.downstream_indptr
+    array([0, 1, 2, 2, 2, 3, 3, 4, 5, 6, 7])
+    >>> graph.downstream_indices
+    array([6, 8, 9, 2, 0, 0, 5])
+
+    The upstream connections are the reverse of the downstream connections,
+    except that they also lead from sender nodes to the sending elements:
+
+    >>> graph.upstream_indptr
+    array([0, 2, 2, 3, 3, 3, 4, 5, 5, 6, 7])
+    >>> graph.upstream_indices
+    array([7, 8, 6, 9, 0, 1, 4])
+
+    End nodes are nodes without any downstream connections:
+
+    >>> graph.endnodes
+    Nodes("n3", "n4", "n6")
+
+    Method :func:`~NetworkGraph.deviceorder` returns all devices in an
+    order suitable for simulation (each element comes after the elements
+    its inlet nodes depend on):
+
+    >>> for device in graph.deviceorder():
+    ...     print(device)
+    n5
+    e3
+    n6
+    n4
+    n2
+    e2
+    e1
+    n1
+    dam
+    n3
+
+    Methods :func:`~NetworkGraph.upstream` and
+    :func:`~NetworkGraph.downstream` return all nodes and elements
+    upstream and downstream of the given starting points, including
+    the starting points themselves:
+
+    >>> graph.upstream(elements.dam)
+    (Nodes("n1", "n2"), Elements("dam", "e1", "e2"))
+    >>> graph.downstream(nodes.n2, nodes.n5)
+    (Nodes("n1", "n2", "n3", "n5", "n6"), Elements("dam", "e2", "e3"))
+
+    Devices not handled by the graph are ignored:
+
+    >>> graph.upstream(Node('n7'))
+    (Nodes(), Elements())
+
+    Method :func:`~NetworkGraph.components` returns the connected parts
+    of the network:
+
+    >>> for component in graph.components():
+    ...     print(component)
+    (Nodes("n1", "n2", "n3"), Elements("dam", "e1", "e2"))
+    (Nodes("n4"), Elements())
+    (Nodes("n5", "n6"), Elements("e3"))
+    """
+
+    def __init__(self, nodes, elements):
+        self.nodes = nodes
+        self.elements = elements
+        self.devices = tuple(nodes) + tuple(elements)
+        self.nmb_nodes = len(nodes)
+        self._nodeindices = dict(
+            (node.name, idx) for (idx, node) in enumerate(nodes))
+        self._elementindices = dict(
+            (element.name, idx) for (idx, element)
+            in enumerate(elements, self.nmb_nodes))
+        self._down = [[] for dummy in self.devices]
+        self._up = [[] for dummy in self.devices]
+        self._links = [[] for dummy in self.devices]
+        for (jdx, element) in enumerate(elements, self.nmb_nodes):
+            for node in element.inlets:
+                idx = self._nodeindices.get(node.name)
+                if idx is not None:
+                    self._down[idx].append(jdx)
+                    self._up[jdx].append(idx)
+            for node in element.outlets:
+                idx = self._nodeindices.get(node.name)
+                if idx is not None:
+                    self._down[jdx].append(idx)
+                    self._up[idx].append(jdx)
+            for node in element.senders:
+                idx = self._nodeindices.get(node.name)
+                if idx is not None:
+                    self._up[idx].append(jdx)
+            for node in element.receivers:
+                idx = self._nodeindices.get(node.name)
+                if idx is not None:
+                    self._links[idx].append(jdx)
+                    self._links[jdx].append(idx)
+        for neighbours in self._up[:self.nmb_nodes]:
+            neighbours.sort()
+        self.downstream_indptr, self.downstream_indices = \
+            self._tocsr(self._down)
+        self.upstream_indptr, self.upstream_indices = self._tocsr(self._up)
+
+    @staticmethod
+    def _tocsr(lists):
+        indptr = numpy.zeros(len(lists)+1, dtype=int)
+        indptr[1:] = numpy.cumsum([len(neighbours) for neighbours in lists])
+        indices = numpy.fromiter(
+            (idx for neighbours in lists for idx in neighbours),
+            dtype=int, count=indptr[-1])
+        return indptr, indices
+
+    def index(self, device):
+        """Return the index of the given device or `None`, if the graph
+        does not handle it."""
+        if isinstance(device, devicetools.Node):
+            return self._nodeindices.get(device.name)
+        if isinstance(device, devicetools.Element):
+            return self._elementindices.get(device.name)
+        raise TypeError(
+            'Pass either a `Node` or an `Element` instance.  The given '
+            'value `%s` is of type `%s`.'
+            % (device, objecttools.classname(device)))
+
+    @property
+    def endnodes(self):
+        """All nodes without downstream connections."""
+        return devicetools.Nodes(
+            [self.devices[idx] for idx in range(self.nmb_nodes)
+             if not self._down[idx]])
+
+    def deviceorder(self):
+        """Return a list of all devices, sorted in simulation order.
+
+        The order results from a depth-first search starting at the
+        :attr:`~NetworkGraph.endnodes` (and, if necessary, at all devices
+        not connected with any end node).  It follows all downstream
+        connections before and all upstream connections after adding a
+        device.  Finally, the order is reversed, so that each device
+        comes after all devices upstream.
+        """
+        down, up = self._down, self._up
+        entered = [False]*len(self.devices)
+        order = []
+        roots = [idx for idx in range(self.nmb_nodes) if not down[idx]]
+        for root in roots + list(range(len(self.devices))):
+            if entered[root]:
+                continue
+            entered[root] = True
+            stack = [[root, False, 0]]
+            while stack:
+                frame = stack[-1]
+                (idx, upwards, pos) = frame
+                neighbours = up[idx] if upwards else down[idx]
+                while (pos < len(neighbours)) and entered[neighbours[pos]]:
+                    pos += 1
+                if pos < len(neighbours):
+                    frame[2] = pos+1
+                    jdx = neighbours[pos]
+                    entered[jdx] = True
+                    stack.append([jdx, False, 0])
+                elif upwards:
+                    stack.pop()
+                else:
+                    order.append(idx)
+                    frame[1], frame[2] = True, 0
+        return [self.devices[idx] for idx in reversed(order)]
+
+    def upstream(self, *devices):
+        """Return all nodes and elements upstream of the given devices,
+        including the given devices themselves.
+
+        The upstream search follows the connections from nodes to the
+        elements passing their outlet or sender values and from elements
+        to their inlet nodes.
+        """
+        return self._split(self._closure(devices, self._up))
+
+    def downstream(self, *devices):
+        """Return all nodes and elements downstream of the given devices,
+        including the given devices themselves.
+
+        The downstream search follows the connections from nodes to the
+        elements taking them as inlets and from elements to their outlet
+        nodes.
+        """
+        return self._split(self._closure(devices, self._down))
+
+    def _closure(self, devices, adjacency):
+        visited = set()
+        stack = []
+        for device in devices:
+            idx = self.index(device)
+            if (idx is not None) and (idx not in visited):
+                visited.add(idx)
+                stack.append(idx)
+        while stack:
+            for jdx in adjacency[stack.pop()]:
+                if jdx not in visited:
+                    visited.add(jdx)
+                    stack.append(jdx)
+        return visited
+
+    def componentlabels(self):
+        """Return an array containing, for each device, the smallest index
+        of all devices of the same connected component.
+
+        Two devices are connected if one is directly upstream or downstream
+        of the other one or if one is a receiver node of the other one.
+        Hence, devices of different components never need to exchange
+        data during a simulation run.
+        """
+        labels = numpy.full(len(self.devices), -1, dtype=int)
+        down, up, links = self._down, self._up, self._links
+        for root in range(len(self.devices)):
+            if labels[root] >= 0:
+                continue
+            labels[root] = root
+            stack = [root]
+            while stack:
+                idx = stack.pop()
+                for neighbours in (down[idx], up[idx], links[idx]):
+                    for jdx in neighbours:
+                        if labels[jdx] < 0:
+                            labels[jdx] = root
+                            stack.append(jdx)
+        return labels
+
+    def components(self):
+        """Return a list of tuples, each one containing the
+        :class:`~hydpy.core.devicetools.Nodes` and
+        :class:`~hydpy.core.devicetools.Elements` object of a connected
+        component (sorted by the smallest device index of each component).
+        """
+        groups = {}
+        for (idx, label) in enumerate(self.componentlabels()):
+            groups.setdefault(label, []).append(idx)
+        return [self._split(groups[label]) for label in sorted(groups)]
+
+    def _split(self, indices):
+        indices = sorted(indices)
+        nodes = devicetools.Nodes(
+            [self.devices[idx] for idx in indices if idx < self.nmb_nodes])
+        elements = devicetools.Elements(
+            [self.devices[idx] for idx in indices if idx >= self.nmb_nodes])
+        return nodes, elements
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __dir__(self):
+        return objecttools.dir_(self)
+
+
+autodoctools.autodoc_module()
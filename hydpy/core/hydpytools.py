@@ -5,36 +5,65 @@
 # ...from standard library
 from __future__ import division, print_function
 import os
+import copy
 import warnings
+import importlib
+import multiprocessing
+# ...from site-packages
+import numpy
 # ...from HydPy
 from hydpy import pub
+from hydpy.cythons import networkutils
 from hydpy.core import objecttools
+from hydpy.core import optiontools
 from hydpy.core import filetools
 from hydpy.core import devicetools
 from hydpy.core import selectiontools
+from hydpy.core import graphtools
 from hydpy.core import autodoctools
 from hydpy.core import magictools
+from hydpy.core import profiletools
+from hydpy.core import seriestools
+from hydpy.core import timetools
 
 
 class HydPy(object):
-    """Main class for managing HydPy projects."""
+    """Main class for managing HydPy projects.
+
+    Initializing more than one instance within the same process results
+    in a warning.  Instances serving internal purposes only (e.g. within
+    the worker processes of method :func:`~HydPy.doit`) are initialized
+    with the private flag `_worker` instead, which excludes them from
+    counting.
+    """
 
     # A counter for the number of HydPy instances.
     nmb_instances = 0
 
-    def __init__(self, projectname=None):
+    def __init__(self, projectname=None, _worker=False):
 
         # Increment and check number of HydPy instances.
-        HydPy.nmb_instances += 1
-        if HydPy.nmb_instances > 1:
-            warnings.warn('Currently %d instances of HydPy are initialized '
-                          'within the same process.  It is strongly '
-                          'recommended to initialize only one instance at a '
-                          'time.  Consider deleting all instances and '
-                          'initializing a new one, unless you are fully aware '
-                          'in what manner HydPy is relying on some global '
-                          'information stored in module `pub`.'
-                          % HydPy.nmb_instances)
+        if not _worker:
+            HydPy.nmb_instances += 1
+            if HydPy.nmb_instances > 1:
+                warnings.warn('Currently %d instances of HydPy are '
+                              'initialized within the same process.  It is '
+                              'strongly recommended to initialize only one '
+                              'instance at a time.  Consider deleting all '
+                              'instances and initializing a new one, unless '
+                              'you are fully aware in what manner HydPy is '
+                              'relying on some global information stored in '
+                              'module `pub`.' % HydPy.nmb_instances)
+
+        # Index of the simulation step following the last simulation run.
+        self._idx_next = None
+
+        # Information on the last run of method `resimulate`.
+        self._resimulationcache = None
+
+        # Connection index of the actual nodes and elements.
+        self._graph = None
+        self._distinctnetworks = None
 
         # Store public information in a seperate module.
         if projectname is not None:
@@ -143,6 +172,152 @@ class HydPy(object):
         for element in self.elements:
             element.model.sequences.reset()
 
+    def checkpoint(self, path, idx=None):
+        """Write the complete simulation state into the binary numpy
+        file `path`.
+
+        The state consists of the actual values of all state sequences
+        (`new` and `old`), all log sequences, the numerical variables
+        of all models applying a numerical solver, the `sim` and `obs`
+        values of all nodes, and the index `idx` of the next simulation
+        step.  By default, `idx` is the index following the last
+        simulation run or, if no simulation has been performed so far,
+        the first index of the actual simulation period.  Use method
+        :func:`~HydPy.resume` to continue a simulation run from the
+        written state.
+
+        Additionally, the state contains the internal series calculated
+        during simulation and handled in RAM, which are the `sim` series
+        of all nodes not using their `sim` series as input and all flux
+        and state series (including the partially aggregated values of
+        aggregated series, see method
+        :func:`~hydpy.core.sequencetools.ModelIOSequence.activate_aggregation`).
+        Input series and series handled on disk are not included, as
+        their data is available from the respective files.  The same
+        holds for streamed series (see method
+        :func:`~hydpy.core.sequencetools.IOSequence.activate_stream`),
+        whose values are written up to index `idx` before method
+        :func:`~HydPy.doit` writes a checkpoint file, and which are
+        kept in their files by method :func:`~HydPy.resume`.  Series
+        handling ensemble members (see method :func:`~HydPy.doit_ensemble`)
+        are not supported.
+        """
+        if self._ensemble:
+            raise RuntimeError(
+                'Checkpoint files cannot store series handling ensemble '
+                'members.')
+        if idx is None:
+            idx = self._idx_next
+            if idx is None:
+                idx = self.simindices[0]
+        arrays = {'idx_sim': numpy.array(idx)}
+        for node in self.nodes:
+            fastaccess = node.sequences.fastaccess
+            for name in ('sim', 'obs'):
+                arrays['%s.%s' % (node.name, name)] = \
+                    numpy.array(getattr(fastaccess, name)[0])
+        for (key, seq) in self._checkpointseries():
+            arrays['series.%s.%s.%s' % key] = \
+                numpy.array(getattr(seq.fastaccess, seq._arrayname))
+        for element in self.elements:
+            model = element.model
+            if model is None:
+                continue
+            for (name, seq) in model.sequences.conditions:
+                arrays['%s.%s.%s' % (element.name, seq.subseqs.name, name)] = \
+                    numpy.array(seq.values)
+                if hasattr(seq, 'old'):
+                    arrays['%s.old_states.%s' % (element.name, name)] = \
+                        numpy.array(seq.old)
+            if model.NUMERICAL:
+                from hydpy.core import modeltools
+                for name in vars(modeltools.NumVarsELS()).keys():
+                    arrays['%s.numvars.%s' % (element.name, name)] = \
+                        numpy.array(getattr(model.numvars, name))
+        with open(path, 'wb') as file_:
+            numpy.savez(file_, **arrays)
+
+    def _checkpointseries(self):
+        """Return a list of the keys (see function :func:`get_sequence`)
+        and the sequences of all series included in checkpoint files."""
+        series = []
+        for node in self.nodes:
+            seq = node.sequences.sim
+            if (node.deploy_mode != 'oldsim') and seq.ramflag:
+                series.append(((node.name, 'nodes', 'sim'), seq))
+        for element in self.elements:
+            if element.model is None:
+                continue
+            for name_subseqs in ('fluxes', 'states'):
+                subseqs = getattr(element.model.sequences, name_subseqs, ())
+                for (name, seq) in subseqs:
+                    if seq.ramflag and not seq.window:
+                        series.append(
+                            ((element.name, name_subseqs, name), seq))
+        return series
+
+    def resume(self, path, checkpointstep=None):
+        """Restore the simulation state written by method
+        :func:`~HydPy.checkpoint` into file `path` and simulate the
+        remaining steps of the actual simulation period in `serial` mode.
+
+        No control or condition files are reloaded.  Hence, the network
+        and the parameter values must agree with those of the interrupted
+        simulation run, which is then continued bit-identically.  The
+        same holds for the preparation of all series, as the internal
+        series stored in the checkpoint file are written into the
+        already available series of the respective sequences.  The files
+        of streamed series keep the values written before the checkpoint
+        and receive the values of the remaining steps.  If
+        `checkpointstep` is given, further checkpoints are written to
+        `path` (see method :func:`~HydPy.doit`).
+        """
+        with open(path, 'rb') as file_:
+            data = numpy.load(file_)
+            arrays = dict((key, data[key]) for key in data.files)
+        idx_start = int(arrays.pop('idx_sim'))
+        idx_first, idx_last = self.simindices
+        if not idx_first <= idx_start <= idx_last:
+            raise ValueError(
+                'The checkpoint file `%s` refers to the simulation step '
+                'with index `%d`, which is not part of the actual '
+                'simulation period (indices `%d` to `%d`).'
+                % (path, idx_start, idx_first, idx_last))
+        for (key, values) in arrays.items():
+            names = key.split('.')
+            try:
+                if (len(names) == 4) and (names[0] == 'series'):
+                    seq = get_sequence(self.nodes, self.elements, names[1:])
+                    array = getattr(seq.fastaccess, seq._arrayname)
+                    if numpy.shape(array) != values.shape:
+                        raise ValueError(
+                            'The shape of the internal series `%s` is %s, '
+                            'but the checkpoint file provides an array of '
+                            'shape %s.' % (seq.name, numpy.shape(array),
+                                           values.shape))
+                    numpy.asarray(array)[:] = values
+                    continue
+                if len(names) == 2:
+                    node = getattr(self.nodes, names[0])
+                    getattr(node.sequences.fastaccess, names[1])[0] = \
+                        float(values)
+                    continue
+                model = getattr(self.elements, names[0]).model
+                if names[1] == 'numvars':
+                    setattr(model.numvars, names[2], values.item())
+                elif names[1] == 'old_states':
+                    getattr(model.sequences.states, names[2]).old = values
+                else:
+                    subseqs = getattr(model.sequences, names[1])
+                    getattr(subseqs, names[2]).values = values
+            except (AttributeError, ValueError):
+                objecttools.augmentexcmessage(
+                    'While trying to restore the value(s) `%s` of the '
+                    'checkpoint file `%s`' % (key, path))
+        self._prepare_profiling()
+        self._doit_serial(idx_start, path, checkpointstep, keep=True)
+        self._idx_next = idx_last
+
     def connect(self):
         for element in self.elements:
             element.connect()
@@ -158,61 +333,57 @@ class HydPy(object):
 
     @property
     def distinct_networks(self):
-        sels1 = selectiontools.Selections()
-        sels2 = selectiontools.Selections()
-        complete = selectiontools.Selection('complete',
-                                            self.nodes, self.elements)
-        for node in self.endnodes:
-            sel = complete.copy(node.name).select_upstream(node)
-            sels1 += sel
-            sels2 += sel.copy(node.name)
-        for sel1 in sels1:
-            for sel2 in sels2:
-                if sel1.name != sel2.name:
-                    sel1 -= sel2
-        for name in list(sels1.names):
-            if not sels1[name].elements:
-                del sels1[name]
-        return sels1
+        """A :class:`~hydpy.core.selectiontools.Selections` object
+        containing one :class:`~hydpy.core.selectiontools.Selection`
+        object for each connected part of the network, which can be
+        simulated independently.
+
+        The connected parts are the components determined by method
+        :func:`~hydpy.core.graphtools.NetworkGraph.components` of
+        :attr:`~HydPy.graph`.  Each selection is named after the first
+        end node of its component (or after its first element, if there
+        is no end node).  Components without any elements are omitted.
+        The result is cached until the graph is rebuilt.
+        """
+        graph = self.graph
+        if ((self._distinctnetworks is None) or
+                (self._distinctnetworks[0] is not graph)):
+            endnames = set(graph.endnodes.names)
+            selections = selectiontools.Selections()
+            for (nodes, elements) in graph.components():
+                if not elements:
+                    continue
+                names = [name for name in nodes.names if name in endnames]
+                name = names[0] if names else elements.names[0]
+                selections += selectiontools.Selection(name, nodes, elements)
+            self._distinctnetworks = (graph, selections)
+        return self._distinctnetworks[1]
+
+    @property
+    def graph(self):
+        """A :class:`~hydpy.core.graphtools.NetworkGraph` object indexing
+        the connections between the actual nodes and elements.
+
+        The graph is built by method :func:`~HydPy.updatedevices` and
+        rebuilt on demand when attribute `nodes` or `elements` refers to
+        another object or the number of devices has changed.
+        """
+        graph = self._graph
+        if ((graph is None) or
+                (graph.nodes is not self.nodes) or
+                (graph.elements is not self.elements) or
+                (graph.nmb_nodes != len(self.nodes)) or
+                (len(graph) != len(self.nodes)+len(self.elements))):
+            graph = graphtools.NetworkGraph(self.nodes, self.elements)
+            self._graph = graph
+        return graph
 
     def _updatedeviceorder(self):
-        self.deviceorder = []
-        for node in self.endnodes:
-            self._nextnode(node)
-        self.deviceorder = self.deviceorder[::-1]
-
-    def _nextnode(self, node):
-        for element in node.exits:
-            if ((element in self.elements) and
-                    (element not in self.deviceorder)):
-                if node not in element.receivers:
-                    self._nextelement(element)
-        if (node in self.nodes) and (node not in self.deviceorder):
-            self.deviceorder.append(node)
-            for element in node.entries:
-                self._nextelement(element)
-
-    def _nextelement(self, element):
-        for node in element.outlets:
-            if ((node in self.nodes) and
-                    (node not in self.deviceorder)):
-                self._nextnode(node)
-        if (element in self.elements) and (element not in self.deviceorder):
-            self.deviceorder.append(element)
-            for node in element.inlets:
-                self._nextnode(node)
+        self.deviceorder = self.graph.deviceorder()
 
     @property
     def endnodes(self):
-        endnodes = devicetools.Nodes()
-        for node in self.nodes:
-            for element in node.exits:
-                if ((element in self.elements) and
-                        (node not in element.receivers)):
-                    break
-            else:
-                endnodes += node
-        return endnodes
+        return self.graph.endnodes
 
     @property
     def variables(self):
@@ -242,10 +413,22 @@ class HydPy(object):
         if selection is not None:
             self.nodes = selection.nodes
             self.elements = selection.elements
+        self._graph = None
         self._updatedeviceorder()
 
     @property
     def funcorder(self):
+        funcs = self._startfuncs
+        for device in self.deviceorder:
+            if isinstance(device, devicetools.Element):
+                funcs.append(device.model.doit)
+        funcs.extend(self._endfuncs)
+        return funcs
+
+    @property
+    def _startfuncs(self):
+        """The functions of :attr:`~HydPy.funcorder` to be called before
+        the `doit` methods of all models."""
         funcs = []
         for node in self.nodes:
             if node.deploy_mode == 'oldsim':
@@ -255,9 +438,13 @@ class HydPy(object):
         for node in self.nodes:
             if node.deploy_mode != 'oldsim':
                 funcs.append(node.reset)
-        for device in self.deviceorder:
-            if isinstance(device, devicetools.Element):
-                funcs.append(device.model.doit)
+        return funcs
+
+    @property
+    def _endfuncs(self):
+        """The functions of :attr:`~HydPy.funcorder` to be called after
+        the `doit` methods of all models."""
+        funcs = []
         for element in self.elements:
             if element.senders:
                 funcs.append(element.model.update_senders)
@@ -269,35 +456,761 @@ class HydPy(object):
                 funcs.append(node._savedata_sim)
         return funcs
 
+    @property
+    def _functionaddresses(self):
+        """Dictionary containing the C function addresses of the modules
+        of all cythonized models (see :attr:`~HydPy.networkrunner`) or
+        `None`, if at least one model is not cythonized."""
+        addresses = {}
+        for element in self.elements:
+            modulename = type(element.model.cymodel).__module__
+            if not modulename.startswith('hydpy.cythons.autogen.'):
+                return None
+            if modulename not in addresses:
+                module = importlib.import_module(modulename)
+                if not hasattr(module, 'functionaddresses'):
+                    return None
+                addresses[modulename] = module.functionaddresses()
+        return addresses
+
+    @property
+    def elementlevels(self):
+        """List of :class:`~hydpy.core.devicetools.Elements` objects, each
+        one containing all elements of the same dependency level.
+
+        The elements of the first level do not depend on any other element
+        within the same simulation step.  The elements of each subsequent
+        level depend on at least one element of the preceding level via
+        their inlet nodes.  Receiver nodes are not taken into account, as
+        their values are updated at the end of each simulation step.
+        """
+        levels = {}
+        for device in self.deviceorder:
+            if isinstance(device, devicetools.Element):
+                level = 0
+                for node in device.inlets:
+                    for element in node.entries:
+                        if element in levels:
+                            level = max(level, levels[element]+1)
+                levels[device] = level
+        elementlevels = [devicetools.Elements()
+                         for dummy in range(max(levels.values() or [-1])+1)]
+        for (element, level) in levels.items():
+            elementlevels[level] += element
+        return elementlevels
+
+    @property
+    def networkrunner(self):
+        """A :class:`~hydpy.cythons.networkutils.NetworkRunner` object
+        performing the same tasks as the functions of :attr:`~HydPy.funcorder`
+        or `None`, if at least one model is not cythonized or at least
+        one node series is handled on disk in block mode (see option
+        `diskblocksize`).
+
+        Node series handled on disk must be mapped into memory (via
+        method :func:`~HydPy.openfiles`) before querying the runner."""
+        return self._getnetworkrunner()
+
+    def _getnetworkrunner(self, nmb_threads=None):
+        """Return the :attr:`~HydPy.networkrunner` or `None`.
+
+        If `nmb_threads` is given, the `doit` methods of the models are
+        registered as level calls (see method
+        :func:`~hydpy.cythons.networkutils.NetworkRunner.add_levelcall`),
+        following the :attr:`~HydPy.elementlevels`.  Elements sharing an
+        outlet node are assigned to the same task."""
+        addresses = self._functionaddresses
+        if addresses is None:
+            return None
+        if pub.options.diskblocksize:
+            for node in self.nodes:
+                fastaccess = node.sequences.fastaccess
+                if fastaccess._sim_diskflag or fastaccess._obs_diskflag:
+                    return None
+        runner = networkutils.NetworkRunner(pub.options.fastcython)
+        for node in self.nodes:
+            fastaccess = node.sequences.fastaccess
+            if node.deploy_mode == 'oldsim':
+                name = 'sim'
+            elif node.sequences.obs.use_ext:
+                name = 'obs'
+            else:
+                continue
+            if (getattr(fastaccess, '_%s_ramflag' % name) or
+                    getattr(fastaccess, '_%s_diskflag' % name)):
+                runner.add_load(getattr(fastaccess, name),
+                                _get_nodearray(fastaccess, name))
+        for node in self.nodes:
+            if node.deploy_mode != 'oldsim':
+                runner.add_reset(node.sequences.fastaccess.sim)
+        calls = []
+        if nmb_threads is None:
+            for device in self.deviceorder:
+                if isinstance(device, devicetools.Element):
+                    calls.append((device, 'doit'))
+        else:
+            runner.nmb_threads = nmb_threads
+            for (level, elements) in enumerate(self.elementlevels):
+                for (task, group) in enumerate(_group_by_outlets(elements)):
+                    for element in group:
+                        cymodel = element.model.cymodel
+                        runner.add_levelcall(
+                            level, task,
+                            addresses[type(cymodel).__module__]['doit'],
+                            cymodel)
+        for element in self.elements:
+            if element.senders:
+                calls.append((element, 'update_senders'))
+        for element in self.elements:
+            if element.receivers:
+                calls.append((element, 'update_receivers'))
+        for (element, funcname) in calls:
+            cymodel = element.model.cymodel
+            runner.add_call(
+                addresses[type(cymodel).__module__][funcname], cymodel)
+        for node in self.nodes:
+            fastaccess = node.sequences.fastaccess
+            if ((node.deploy_mode != 'oldsim') and
+                    (fastaccess._sim_ramflag or fastaccess._sim_diskflag)):
+                runner.add_save(fastaccess.sim,
+                                _get_nodearray(fastaccess, 'sim'))
+        return runner
+
     @magictools.printprogress
-    def doit(self):
+    def doit(self, mode='serial', nmb_workers=None,
+             checkpointpath=None, checkpointstep=None):
+        """Perform a simulation run over the actual simulation period.
+
+        The following modes are supported:
+
+          * serial: Call all functions of :attr:`~HydPy.funcorder` one
+            after another for each simulation step.  If option
+            `usenetworkrunner` is enabled (see module
+            :mod:`~hydpy.core.optiontools`), the complete time loop is
+            passed to the :attr:`~HydPy.networkrunner` instead, if possible.
+          * processes: Simulate the :attr:`~HydPy.distinct_networks`
+            within a pool of `nmb_workers` processes (by default, one
+            process per CPU).  The networks are grouped so that each
+            worker handles a similar number of elements.  Afterwards,
+            the node series, the model series, and the final conditions
+            calculated by the workers are passed to the devices of the
+            actual process.  Note that series are only passed to sequences
+            with activated `ramflag` or `diskflag`.  Workers that cannot
+            inherit the models of the actual process (e.g. under Windows)
+            initialize their models, conditions and input series based on
+            the project files.
+          * threads: Call the `doit` methods of all models of the same
+            dependency level (see :attr:`~HydPy.elementlevels`) within
+            `nmb_workers` threads (by default, one thread per CPU) and
+            wait for all threads to finish before proceeding with the
+            next level.  Elements sharing an outlet node are always
+            handled by the same thread.  The complete time loop, including
+            the synchronisation of the threads, is performed by a
+            :class:`~hydpy.cythons.networkutils.NetworkRunner` object in
+            C (see :attr:`~HydPy.networkrunner`), which starts the threads
+            only once.  This mode requires cythonized models and no node
+            series handled on disk in block mode.  Otherwise, the `serial`
+            mode is applied.  The models are only called concurrently when
+            option `fastcython` is enabled.
+          * batched: Simulate the complete simulation period for one
+            element after another, following the :attr:`~HydPy.deviceorder`.
+            Each element reads its inflow from the complete series of its
+            inlet nodes, which are held in RAM, so that the data of each
+            model stays in the CPU caches during its whole time loop.  For
+            cythonized models, each time loop is performed by a
+            :class:`~hydpy.cythons.networkutils.NetworkRunner` object.
+            This mode requires that no element has receiver or sender
+            nodes.  Otherwise, the `serial` mode is applied.
+
+        In `serial` mode, a checkpoint file (see method
+        :func:`~HydPy.checkpoint`) is written to `checkpointpath` after
+        every `checkpointstep` simulation steps, if both arguments are
+        given.  The other modes do not support checkpoints.
+
+        In the modes `serial` and `threads`, the external data of lazily
+        loaded input series (see method :func:`~HydPy.prepare_inputseries`)
+        is loaded and the data of streamed flux and state series (see
+        method :func:`~HydPy.prepare_fluxseries`) is written window by
+        window during the simulation run.  The modes `processes` and
+        `batched` do not support such series, so the `serial` mode is
+        applied instead.  The same holds for mode `processes` and
+        aggregated or selectively recorded flux and state series (see
+        the methods :func:`~HydPy.prepare_fluxseries` and
+        :func:`~hydpy.core.sequencetools.ModelIOSequence.activate_recording`),
+        and for both modes and series handling ensemble members (see
+        method :func:`~HydPy.doit_ensemble`).
+
+        If option `profiling` is enabled, the computation times of the
+        individual model methods are recorded (see property
+        :attr:`~HydPy.profile`).  In `processes` mode, the times recorded
+        by the worker processes are not collected.
+        """
+        self._prepare_profiling()
+        if (checkpointpath is not None) and (mode != 'serial'):
+            raise ValueError(
+                'Method `doit` of class `HydPy` supports writing checkpoints '
+                'in simulation mode `serial` only, but mode `%s` is selected.'
+                % mode)
+        if (checkpointpath is not None) and self._ensemble:
+            raise RuntimeError(
+                'Checkpoint files cannot store series handling ensemble '
+                'members.')
+        if mode == 'serial':
+            self._doit_serial(None, checkpointpath, checkpointstep)
+        elif mode == 'processes':
+            self._doit_processes(nmb_workers)
+        elif mode == 'threads':
+            self._doit_threads(nmb_workers)
+        elif mode == 'batched':
+            self._doit_batched()
+        else:
+            raise ValueError(
+                'Method `doit` of class `HydPy` does not support the '
+                'simulation mode `%s`.  Please choose one of the following '
+                'modes: `serial`, `processes`, `threads`, and `batched`.'
+                % mode)
+        self._idx_next = self.simindices[1]
+
+    def _prepare_profiling(self):
+        for element in self.elements:
+            if pub.options.profiling:
+                profiletools.activate(element.model)
+            else:
+                profiletools.deactivate(element.model)
+
+    @property
+    def profile(self):
+        """A :class:`~hydpy.core.profiletools.ProfileReport` object
+        containing the computation times and numbers of calls of the
+        methods of all models recorded while option `profiling` was
+        enabled (see module :mod:`~hydpy.core.profiletools`)."""
+        rows = []
+        for element in self.elements:
+            model = element.model
+            for record in profiletools.get_records(model):
+                rows.append((element.name, objecttools.modulename(model)) +
+                            record)
+        return profiletools.ProfileReport(rows)
+
+    def resetprofile(self):
+        """Reset the computation times and numbers of calls recorded
+        for the models of all elements."""
+        for element in self.elements:
+            profiletools.reset(element.model)
+
+    def _doit_serial(self, idx_start=None,
+                     checkpointpath=None, checkpointstep=None, keep=False):
+        if idx_start is None:
+            idx_start = self.simindices[0]
+        idx_end = self.simindices[1]
+        if checkpointpath is None:
+            checkpointstep = None
+        self.openfiles(idx_start)
+        runner = None
+        if pub.options.usenetworkrunner:
+            runner = self.networkrunner
+        loader = seriestools.WindowLoader(
+            self._windowsequences(), idx_start, idx_end,
+            step=checkpointstep, keep=keep)
+        if runner is None:
+            funcorder = self.funcorder
+            for idx in magictools.progressbar(loader):
+                for func in funcorder:
+                    func(idx)
+                if (checkpointstep and (idx+1 < idx_end) and
+                        not (idx+1-idx_start) % checkpointstep):
+                    self._checkpoint_during_simulation(
+                        checkpointpath, idx+1, loader)
+        else:
+            for (idx0, idx1) in loader.windows():
+                runner.simulate(idx0, idx1)
+                if (checkpointstep and (idx1 < idx_end) and
+                        not (idx1-idx_start) % checkpointstep):
+                    self._checkpoint_during_simulation(
+                        checkpointpath, idx1, loader)
+        self.closefiles()
+
+    def _checkpoint_during_simulation(self, path, idx, loader):
+        """Write a checkpoint file, after writing all streamed values
+        and closing (and thereby flushing) all files handling internal
+        series, and reopen them afterwards."""
+        loader.flush()
+        self.closefiles()
+        self.checkpoint(path, idx)
+        self.openfiles(idx)
+
+    def _doit_threads(self, nmb_workers):
+        if nmb_workers is None:
+            nmb_workers = multiprocessing.cpu_count()
         idx_start, idx_end = self.simindices
         self.openfiles(idx_start)
-        funcorder = self.funcorder
-        for idx in magictools.progressbar(range(idx_start, idx_end)):
-            for func in funcorder:
-                func(idx)
+        runner = self._getnetworkrunner(nmb_workers)
+        if runner is None:
+            self.closefiles()
+            self._doit_serial()
+            return
+        loader = seriestools.WindowLoader(
+            self._windowsequences(), idx_start, idx_end)
+        for (idx0, idx1) in loader.windows():
+            runner.simulate(idx0, idx1)
         self.closefiles()
 
+    def _doit_batched(self):
+        if self._lazy or self._ensemble:
+            self._doit_serial()
+            return
+        for element in self.elements:
+            if element.receivers or element.senders:
+                self._doit_serial()
+                return
+        addresses = self._functionaddresses
+        idx_start, idx_end = self.simindices
+        nmb_init = len(pub.timegrids.init)
+        entryarrays, exitarrays = {}, {}
+        for node in self.nodes:
+            sequences = node.sequences
+            if node.deploy_mode != 'oldsim':
+                if sequences.fastaccess._sim_ramflag:
+                    entryarray = sequences.fastaccess._sim_array
+                elif sequences.fastaccess._sim_diskflag:
+                    entryarray = numpy.array(sequences.sim.series,
+                                             dtype=float)
+                else:
+                    entryarray = numpy.zeros(nmb_init)
+                entryarray[idx_start:idx_end] = 0.
+                entryarrays[node] = entryarray
+            if node.deploy_mode == 'newsim':
+                exitarrays[node] = entryarrays[node]
+            else:
+                seq = getattr(sequences, node.deploy_mode[-3:])
+                if (((node.deploy_mode == 'oldsim') or seq.use_ext) and
+                        hasmemory(seq)):
+                    exitarrays[node] = numpy.asarray(seq.series, dtype=float)
+                else:
+                    exitarrays[node] = numpy.full(
+                        nmb_init, float(seq.value), dtype=float)
+        elements = [device for device in self.deviceorder
+                    if isinstance(device, devicetools.Element)]
+        for element in magictools.progressbar(elements):
+            loads, saves = [], []
+            for node in element.inlets:
+                if node in exitarrays:
+                    loads.append((node.get_double_via_exits(),
+                                  exitarrays[node]))
+            for node in element.outlets:
+                if node in entryarrays:
+                    double = node.get_double_via_entries()
+                    loads.append((double, entryarrays[node]))
+                    saves.append((double, entryarrays[node]))
+            element.model.sequences.openfiles(idx_start)
+            if addresses is None:
+                doit = element.model.doit
+                for idx in range(idx_start, idx_end):
+                    for (double, array) in loads:
+                        double[0] = array[idx]
+                    doit(idx)
+                    for (double, array) in saves:
+                        array[idx] = double[0]
+            else:
+                runner = networkutils.NetworkRunner(pub.options.fastcython)
+                for (double, array) in loads:
+                    runner.add_load(double, array)
+                cymodel = element.model.cymodel
+                runner.add_call(
+                    addresses[type(cymodel).__module__]['doit'], cymodel)
+                for (double, array) in saves:
+                    runner.add_save(double, array)
+                runner.simulate(idx_start, idx_end)
+            element.model.sequences.closefiles()
+        for (node, entryarray) in entryarrays.items():
+            sim = node.sequences.sim
+            if not sim.ramflag:
+                if sim.diskflag:
+                    sim.series = entryarray
+                sim.value = entryarray[idx_end-1]
+
+    def _doit_processes(self, nmb_workers):
+        if self._lazy or self._reduced or self._ensemble:
+            self._doit_serial()
+            return
+        networks = sorted(self.distinct_networks,
+                          key=lambda network: -len(network.elements))
+        if nmb_workers is None:
+            nmb_workers = multiprocessing.cpu_count()
+        nmb_workers = max(min(nmb_workers, len(networks)), 1)
+        groups = [[devicetools.Nodes(), devicetools.Elements()]
+                  for dummy in range(nmb_workers)]
+        for network in networks:
+            group = min(groups, key=lambda group: len(group[1]))
+            group[0] += network.nodes
+            group[1] += network.elements
+        pubstate = _get_pubstate()
+        jobs = []
+        for (nodes, elements) in groups:
+            deploymodes = dict((node.name, node.deploy_mode)
+                               for node in nodes)
+            jobs.append((pubstate, nodes.names, elements.names,
+                         deploymodes, get_seriesflags(nodes, elements)))
+        pool = multiprocessing.Pool(nmb_workers)
+        try:
+            results = pool.map(_simulate_networks, jobs)
+        finally:
+            pool.close()
+            pool.join()
+        for (allseries, conditions) in results:
+            for (key, series) in allseries.items():
+                get_sequence(self.nodes, self.elements, key).series = series
+            set_conditions(self.elements, conditions)
+
+    def doit_ensemble(self, members, mode='serial', nmb_workers=None):
+        """Perform one simulation run for each given parameter set and
+        store the results of all runs as the series of ensemble members
+        (see method
+        :func:`~hydpy.core.sequencetools.IOSequence.activate_ensemble`).
+
+        Each member is a dictionary mapping element names to dictionaries,
+        which map the names of control parameters to their new values.
+        All members share the same devices, models and input series.
+        Before each run, all control parameters modified by any member
+        are reset to their original values, the values of the actual
+        member are assigned, all derived parameters are updated, the
+        initial conditions are restored, and the actual member is
+        selected (see method
+        :func:`~hydpy.core.sequencetools.IOSubSequences.setmember`).
+        Each run is performed by method :func:`~HydPy.doit` with the
+        given `mode` and `nmb_workers` arguments.  The modes `processes`
+        and `batched` do not support ensembles, so the `serial` mode is
+        applied instead.
+
+        The `sim` series of all nodes not using them as input and all
+        flux and state series handling their internal data in RAM are
+        prepared for one member per parameter set.  Sequences already
+        handling ensembles of this size keep their member series, which
+        allows for perturbing input series, for example.  Afterwards,
+        property `series` of all these sequences returns the results
+        of all members, while the original control parameters, derived
+        parameters and initial conditions are restored.  Series handled
+        on disk, loaded lazily or streamed are not supported.
+        """
+        for seq in self._iosequences():
+            if hasmemory(seq) and ((not seq.ramflag) or seq.window):
+                raise RuntimeError(
+                    'Method `doit_ensemble` of class `HydPy` requires all '
+                    'internal series to be handled in RAM completely, but '
+                    'sequence `%s` of device `%s` does not.'
+                    % (seq.name, objecttools.devicename(seq)))
+        sequences = [node.sequences.sim for node in self.nodes
+                     if node.deploy_mode != 'oldsim']
+        sequences.extend(self._modelsequences('fluxes'))
+        sequences.extend(self._modelsequences('states'))
+        for seq in sequences:
+            if seq.ramflag:
+                seq.activate_ensemble(len(members))
+        originals = {}
+        for member in members:
+            for (elementname, values) in member.items():
+                model = getattr(self.elements, elementname).model
+                for name in values.keys():
+                    if (elementname, name) not in originals:
+                        par = getattr(model.parameters.control, name)
+                        originals[(elementname, name)] = \
+                            copy.deepcopy(par.values)
+        conditions = get_conditions(self.elements)
+        try:
+            for (idx, member) in enumerate(magictools.progressbar(members)):
+                _set_parameters(self.elements, originals)
+                _set_parameters(
+                    self.elements,
+                    dict(((elementname, name), value)
+                         for (elementname, values) in member.items()
+                         for (name, value) in values.items()))
+                set_conditions(self.elements, conditions)
+                self._setmember(idx)
+                with pub.options.printprogress(False):
+                    self.doit(mode, nmb_workers)
+        finally:
+            self._setmember(0)
+            _set_parameters(self.elements, originals)
+            set_conditions(self.elements, conditions)
+
+    def _setmember(self, member):
+        """Select the given ensemble member for all devices."""
+        for node in self.nodes:
+            node.sequences.setmember(member)
+        for element in self.elements:
+            element.model.sequences.setmember(member)
+
+    def resimulate(self, elements=None):
+        """Repeat the last simulation run performed by this method for
+        all elements affected by changes since then.
+
+        The first call performs a complete simulation run via method
+        :func:`~HydPy.doit` and memorizes the initial conditions and the
+        control parameter values of all models.  Each subsequent call
+        determines the elements with changed control parameter values
+        (and additionally treats the given `elements` as changed, e.g.
+        after modifying their input series) and simulates them together
+        with all elements downstream, starting from the memorized initial
+        conditions.  Elements sharing an outlet node with a resimulated
+        element are resimulated as well.  The nodes feeding the
+        resimulated elements from unchanged upstream elements deploy the
+        `sim` series of the last run temporarily in mode `oldsim`.  Hence,
+        these series must be handled in RAM or on disk.  Otherwise, the
+        respective upstream elements are resimulated, too.  A complete
+        simulation run is performed again whenever the simulation period
+        or the devices have changed.
+        """
+        cache = self._resimulationcache
+        if ((cache is None) or
+                (cache['simindices'] != self.simindices) or
+                (cache['nodenames'] != tuple(self.nodes.names)) or
+                (cache['elementnames'] != tuple(self.elements.names))):
+            conditions = get_conditions(self.elements)
+            self.doit()
+            self._resimulationcache = {
+                'simindices': self.simindices,
+                'nodenames': tuple(self.nodes.names),
+                'elementnames': tuple(self.elements.names),
+                'memorynodes': set(node for node in self.nodes
+                                   if hasmemory(node.sequences.sim)),
+                'conditions': conditions,
+                'controls': dict((element, _get_controlvalues(element))
+                                 for element in self.elements)}
+            return
+        changed = set(devicetools.Elements(elements) if elements else ())
+        for element in self.elements:
+            if not _equal_controlvalues(cache['controls'][element],
+                                        _get_controlvalues(element)):
+                changed.add(element)
+        if not changed:
+            return
+        subelements = self._get_downstream_elements(changed,
+                                                    cache['memorynodes'])
+        subnodes = devicetools.Nodes()
+        for element in subelements:
+            for connections in (element.inlets, element.outlets,
+                                element.receivers, element.senders):
+                for node in connections:
+                    if node in self.nodes:
+                        subnodes += node
+        boundaries, backups = [], {}
+        for node in subnodes:
+            entries = [element for element in node.entries
+                       if element in self.elements]
+            if entries and not any(element in subelements
+                                   for element in entries):
+                if node.deploy_mode == 'newsim':
+                    boundaries.append(node)
+                elif hasmemory(node.sequences.sim):
+                    backups[node] = node.sequences.sim.series.copy()
+        nodes, elements, graph = self.nodes, self.elements, self._graph
+        deviceorder, idx_next = self.deviceorder, self._idx_next
+        try:
+            for node in boundaries:
+                node.deploy_mode = 'oldsim'
+            set_conditions(subelements, dict(
+                (element.name, cache['conditions'][element.name])
+                for element in subelements
+                if element.name in cache['conditions']))
+            self.updatedevices(selectiontools.Selection(
+                'resimulation', subnodes, subelements))
+            self.doit()
+        finally:
+            for node in boundaries:
+                node.deploy_mode = 'newsim'
+            for (node, series) in backups.items():
+                node.sequences.sim.series = series
+            self.nodes, self.elements, self._graph = nodes, elements, graph
+            self.deviceorder, self._idx_next = deviceorder, idx_next
+        for element in subelements:
+            cache['controls'][element] = _get_controlvalues(element)
+
+    def _get_downstream_elements(self, elements, memorynodes):
+        """Return an :class:`~hydpy.core.devicetools.Elements` object
+        containing the given elements, all elements downstream, all
+        elements sharing an outlet or sender node with one of these
+        elements, and all elements upstream of inlet or receiver nodes
+        not contained in the given collection of `memorynodes`.
+
+        Only the connections via nodes of deploy mode `newsim` are
+        followed, as the other modes deploy external data.
+        """
+        selected = devicetools.Elements(elements)
+        stack = list(selected)
+        while stack:
+            element = stack.pop()
+            others = []
+            for connections in (element.outlets, element.senders):
+                for node in connections:
+                    if (node in self.nodes) and (node.deploy_mode != 'oldsim'):
+                        others.extend(node.entries)
+                        if node.deploy_mode == 'newsim':
+                            others.extend(node.exits)
+            for connections in (element.inlets, element.receivers):
+                for node in connections:
+                    if ((node in self.nodes) and
+                            (node.deploy_mode == 'newsim') and
+                            (node not in memorynodes)):
+                        others.extend(node.entries)
+            for other in others:
+                if (other in self.elements) and (other not in selected):
+                    selected += other
+                    stack.append(other)
+        return selected
+
     @magictools.printprogress
     def prepare_modelseries(self, ramflag=True):
-        for element in magictools.progressbar(self.elements):
-            element.prepare_allseries(ramflag)
+        with seriestools.Cache():
+            for element in magictools.progressbar(self.elements):
+                element.prepare_allseries(ramflag)
 
     @magictools.printprogress
-    def prepare_inputseries(self, ramflag=True):
-        for element in magictools.progressbar(self.elements):
-            element.prepare_inputseries(ramflag)
+    def prepare_inputseries(self, ramflag=True, nmb_workers=1, window=None):
+        """Prepare the series of the input sequences of all models and
+        load their external data.
+
+        By default, the external data files are read one after another.
+        If `nmb_workers` is larger than one (or `None`, meaning one thread
+        per CPU), they are read within a pool of threads instead (see
+        function :func:`~hydpy.core.seriestools.load`).  In both cases,
+        input sequences handled in RAM and loading the same external data
+        file share their internal data (see property
+        :attr:`~hydpy.core.sequencetools.InputSequence.shared`).
+
+        If `window` is given, either as a number of simulation steps or
+        as a :class:`~hydpy.core.timetools.Period` object or string (e.g.
+        `'365d'`), the external data is loaded lazily in windows of the
+        given length and handled in RAM, and argument `ramflag` is
+        ignored.  Only the first window is loaded immediately, the other
+        ones are loaded in the background during simulation runs (see
+        method :func:`~hydpy.core.sequencetools.IOSequence.activate_lazy`
+        and class :class:`~hydpy.core.seriestools.WindowLoader`).  Method
+        :func:`~HydPy.doit` then applies the `serial` mode instead of the
+        modes `processes` and `batched`.
+        """
+        if window is not None:
+            window = self._windowsize(window)
+            for seq in magictools.progressbar(
+                    self._modelsequences('inputs')):
+                seq.activate_lazy(window)
+        elif nmb_workers == 1:
+            with seriestools.Cache():
+                for element in magictools.progressbar(self.elements):
+                    element.prepare_inputseries(ramflag)
+        else:
+            seriestools.load(
+                self._modelsequences('inputs'), ramflag, nmb_workers)
+
+    def _modelsequences(self, name_subseqs):
+        """Return a list of the sequences of the given subgroup of all
+        models."""
+        sequences = []
+        for element in self.elements:
+            subseqs = getattr(element.model.sequences, name_subseqs, None)
+            if subseqs:
+                sequences.extend(seq for (name, seq) in subseqs)
+        return sequences
+
+    def _iosequences(self):
+        """Return a list of the sequences of all nodes and the input, flux
+        and state sequences of all models."""
+        sequences = [seq for node in self.nodes
+                     for (name, seq) in node.sequences]
+        for name_subseqs in ('inputs', 'fluxes', 'states'):
+            sequences.extend(self._modelsequences(name_subseqs))
+        return sequences
+
+    def _windowsequences(self):
+        """Return a list of all lazily loaded and streamed sequences."""
+        return [seq for name_subseqs in ('inputs', 'fluxes', 'states')
+                for seq in self._modelsequences(name_subseqs) if seq.window]
+
+    @property
+    def _lazy(self):
+        """`True`, if the series of any sequence is loaded lazily or
+        streamed."""
+        return bool(self._windowsequences())
+
+    @property
+    def _ensemble(self):
+        """`True`, if the series of any sequence handles ensemble members."""
+        return any(seq.ensemble for seq in self._iosequences())
+
+    @property
+    def _reduced(self):
+        """`True`, if the series of any sequence is aggregated or recorded
+        selectively."""
+        return any(seq.aggregation or (seq.recordshape != seq.shape)
+                   for name_subseqs in ('fluxes', 'states')
+                   for seq in self._modelsequences(name_subseqs))
+
+    @staticmethod
+    def _windowsize(window):
+        """Return the given window size, defined as a number of simulation
+        steps or as a :class:`~hydpy.core.timetools.Period` object or
+        string, as a number of simulation steps."""
+        if isinstance(window, int):
+            return window
+        return int(timetools.Period(window)/pub.timegrids.stepsize)
 
     @magictools.printprogress
-    def prepare_fluxseries(self, ramflag=True):
-        for element in magictools.progressbar(self.elements):
-            element.prepare_fluxseries(ramflag)
+    def prepare_fluxseries(self, ramflag=True, window=None,
+                           aggregation=None):
+        """Prepare the series of the flux sequences of all models.
+
+        If `window` is given (see method :func:`~HydPy.prepare_inputseries`),
+        the series are written into their external data files window by
+        window in the background during simulation runs (see method
+        :func:`~hydpy.core.sequencetools.IOSequence.activate_stream`), and
+        argument `ramflag` is ignored.  Method
+        :func:`~HydPy.save_fluxseries` then skips these series.
+
+        If `aggregation` is given, as a tuple containing an aggregation
+        mode and a step size (e.g. `('mean', '1d')`), the series are
+        aggregated during simulation runs (see method
+        :func:`~hydpy.core.sequencetools.ModelIOSequence.activate_aggregation`).
+        Aggregated series cannot be streamed.
+        """
+        if window is None:
+            for element in magictools.progressbar(self.elements):
+                element.prepare_fluxseries(ramflag, aggregation)
+        else:
+            self._checkstreamable(aggregation)
+            self._prepare_streams('fluxes', window)
 
     @magictools.printprogress
-    def prepare_stateseries(self, ramflag=True):
-        for element in magictools.progressbar(self.elements):
-            element.prepare_stateseries(ramflag)
+    def prepare_stateseries(self, ramflag=True, window=None,
+                            aggregation=None):
+        """Prepare the series of the state sequences of all models.
+
+        See method :func:`~HydPy.prepare_fluxseries` for the meaning of
+        the arguments `window` and `aggregation`.
+        """
+        if window is None:
+            for element in magictools.progressbar(self.elements):
+                element.prepare_stateseries(ramflag, aggregation)
+        else:
+            self._checkstreamable(aggregation)
+            self._prepare_streams('states', window)
+
+    @staticmethod
+    def _checkstreamable(aggregation):
+        if aggregation is not None:
+            raise ValueError(
+                'Series cannot be streamed and aggregated at the same time.')
+
+    def _prepare_streams(self, name_subseqs, window):
+        window = self._windowsize(window)
+        overwrite = pub.sequencemanager.outputoverwrite
+        for seq in magictools.progressbar(
+                self._modelsequences(name_subseqs)):
+            if overwrite or not os.path.exists(seq.filepath_ext):
+                seq.deactivate_aggregation()
+                seq.activate_stream(window)
+            else:
+                seq.deactivate_disk()
+                seq.deactivate_ram()
+                self._warn_overwrite(seq.filepath_ext)
 
     @magictools.printprogress
     def prepare_nodeseries(self, ramflag=True):
@@ -306,13 +1219,15 @@ class HydPy(object):
 
     @magictools.printprogress
     def prepare_simseries(self, ramflag=True):
-        for node in magictools.progressbar(self.nodes):
-            node.prepare_simseries(ramflag)
+        with seriestools.Cache():
+            for node in magictools.progressbar(self.nodes):
+                node.prepare_simseries(ramflag)
 
     @magictools.printprogress
     def prepare_obsseries(self, ramflag=True):
-        for node in magictools.progressbar(self.nodes):
-            node.prepare_obsseries(ramflag)
+        with seriestools.Cache():
+            for node in magictools.progressbar(self.nodes):
+                node.prepare_obsseries(ramflag)
 
     @magictools.printprogress
     def save_modelseries(self):
@@ -333,18 +1248,7 @@ class HydPy(object):
         self._save_modelseries('states', pub.sequencemanager.outputoverwrite)
 
     def _save_modelseries(self, name_subseqs, overwrite):
-        for element in magictools.progressbar(self.elements):
-            sequences = element.model.sequences
-            subseqs = getattr(sequences, name_subseqs, ())
-            for (name, seq) in subseqs:
-                if seq.memoryflag:
-                    if overwrite or not os.path.exists(seq.filepath_ext):
-                        seq.save_ext()
-                    else:
-                        warnings.warn('Due to the argument `overwrite` beeing '
-                                      '`False` it is not allowed to overwrite '
-                                      'the already existing file `%s`.'
-                                      % seq.filepath_ext)
+        self._save_series(self._modelsequences(name_subseqs), overwrite)
 
     @magictools.printprogress
     def save_nodeseries(self):
@@ -360,16 +1264,269 @@ class HydPy(object):
         self._save_nodeseries('obs', pub.sequencemanager.obsoverwrite)
 
     def _save_nodeseries(self, seqname, overwrite):
-        for node in magictools.progressbar(self.nodes):
-            seq = getattr(node.sequences, seqname)
-            if seq.memoryflag:
-                if overwrite or not os.path.exists(seq.filepath_ext):
-                    seq.save_ext()
-                else:
-                    warnings.warn('Due to the argument `overwrite` beeing '
-                                  '`False` it is not allowed to overwrite '
-                                  'the already existing file `%s`.'
-                                  % seq.filepath_ext)
+        self._save_series(
+            [getattr(node.sequences, seqname) for node in self.nodes],
+            overwrite)
+
+    @staticmethod
+    def _save_series(sequences, overwrite):
+        """Write the series of the given sequences into their external data
+        files.  Sequences with external file type `store` are collected and
+        written into their consolidated series files at once (see module
+        :mod:`~hydpy.core.seriestools`).  Streamed sequences are skipped,
+        as their external data files have been written during the last
+        simulation run (see method
+        :func:`~hydpy.core.sequencetools.IOSequence.activate_stream`)."""
+        sequences = [seq for seq in sequences
+                     if seq.memoryflag and not seq.stream]
+        stored = [seq for seq in sequences if seq.filetype_ext == 'store']
+        skipped = seriestools.save(stored, overwrite)
+        for seq in magictools.progressbar(sequences):
+            if seq.filetype_ext == 'store':
+                continue
+            if overwrite or not os.path.exists(seq.filepath_ext):
+                seq.save_ext()
+            else:
+                skipped.append(seq.filepath_ext)
+        for filepath in skipped:
+            HydPy._warn_overwrite(filepath)
+
+    @staticmethod
+    def _warn_overwrite(filepath):
+        warnings.warn('Due to the argument `overwrite` beeing '
+                      '`False` it is not allowed to overwrite '
+                      'the already existing file `%s`.' % filepath)
+
+
+def _group_by_outlets(elements):
+    """Return a list of lists, each one containing all of the given
+    elements (in the given order) which are connected via shared outlet
+    nodes, directly or indirectly."""
+    groups = {}
+    node2key = {}
+    for element in elements:
+        group = [element]
+        nodes = set(element.outlets)
+        for node in list(nodes):
+            key = node2key.get(node)
+            if key in groups:
+                (group_old, nodes_old) = groups.pop(key)
+                group = group_old + group
+                nodes.update(nodes_old)
+        for node in nodes:
+            node2key[node] = element
+        groups[element] = (group, nodes)
+    return [group for (group, nodes) in groups.values()]
+
+
+def hasmemory(seq):
+    """Return `True`, if the `ramflag` or the `diskflag` of the given
+    :class:`~hydpy.core.sequencetools.IOSequence` object is activated,
+    meaning that it handles its complete internal series in RAM or on
+    disk, otherwise `False`.
+
+    In contrast to the flags of the sequence object itself, function
+    :func:`hasmemory` takes the values of its
+    :class:`~hydpy.core.sequencetools.FastAccess` object into account,
+    which are the ones relevant during simulation runs."""
+    return bool(getattr(seq.fastaccess, '_%s_ramflag' % seq.name, False) or
+                getattr(seq.fastaccess, '_%s_diskflag' % seq.name, False))
+
+
+def get_sequence(nodes, elements, key):
+    """Return the :class:`~hydpy.core.sequencetools.IOSequence` object
+    of the given devices addressed by the given tuple containing the name
+    of a device, the name of a sequence subgroup (`nodes` for node
+    sequences), and the name of the sequence itself, e.g.
+    `('out1', 'nodes', 'sim')` or `('e1', 'states', 'qjoints')`."""
+    (devicename, subseqs_name, name) = key
+    if subseqs_name == 'nodes':
+        subseqs = getattr(nodes, devicename).sequences
+    else:
+        model = getattr(elements, devicename).model
+        subseqs = getattr(model.sequences, subseqs_name)
+    return getattr(subseqs, name)
+
+
+def get_seriesflags(nodes, elements):
+    """Return a dictionary, mapping the keys of all sequences of the given
+    devices handling internal series (see the functions :func:`hasmemory`
+    and :func:`get_sequence`) to their `ramflag`.
+
+    Hence, all values are `True` if all these series are handled in RAM
+    and at least one value is `False` if some are handled on disk."""
+    seriesflags = {}
+    for node in nodes:
+        for (name, seq) in node.sequences:
+            if hasmemory(seq):
+                seriesflags[(node.name, 'nodes', name)] = seq.ramflag
+    for element in elements:
+        if element.model is not None:
+            for subseqs_name in ('inputs', 'fluxes', 'states'):
+                subseqs = getattr(element.model.sequences, subseqs_name, ())
+                for (name, seq) in subseqs:
+                    if hasmemory(seq):
+                        seriesflags[(element.name, subseqs_name, name)] = \
+                            seq.ramflag
+    return seriesflags
+
+
+def get_conditions(elements):
+    """Return a dictionary, mapping the names of the given elements to
+    dictionaries containing copies of the values of all condition
+    sequences of their models.
+
+    Elements without a model are ignored.  Use function
+    :func:`set_conditions` to restore the returned conditions, e.g.
+    to start multiple simulation runs with the same initial states."""
+    conditions = {}
+    for element in elements:
+        if element.model is not None:
+            conditions[element.name] = dict(
+                (name, copy.deepcopy(seq.values))
+                for (name, seq) in element.model.sequences.conditions)
+    return conditions
+
+
+def set_conditions(elements, conditions):
+    """Assign the condition values returned by function
+    :func:`get_conditions` to the models of the given elements.
+
+    For state sequences, the new values are also passed to the `old`
+    values relevant for the first simulation step."""
+    for (elementname, values) in conditions.items():
+        model = getattr(elements, elementname).model
+        if model is not None:
+            for (name, seq) in model.sequences.conditions:
+                seq.values = values[name]
+                if hasattr(seq, 'new2old'):
+                    seq.new2old()
+
+
+def _set_parameters(elements, values):
+    """Assign the given values, addressed by tuples containing the name
+    of an element and the name of a control parameter, to the models of
+    the given elements and update their derived parameters."""
+    models = set()
+    for ((elementname, name), value) in values.items():
+        model = getattr(elements, elementname).model
+        getattr(model.parameters.control, name).values = value
+        models.add(model)
+    for model in models:
+        model.parameters.update()
+
+
+def _get_nodearray(fastaccess, name):
+    """Return the internal series of the given node sequence, which is
+    the series of the selected member for ensembles (see method
+    :func:`~hydpy.core.sequencetools.IOSequence.activate_ensemble`)."""
+    if getattr(fastaccess, '_%s_ensembleflag' % name, False):
+        return getattr(fastaccess, '_%s_ensemble' % name)[fastaccess._member]
+    return getattr(fastaccess, '_%s_array' % name)
+
+
+def _get_controlvalues(element):
+    """Return a dictionary, mapping the names of all control parameters
+    of the model of the given element to copies of their values (or
+    to their string representations, if they do not provide values)."""
+    controlvalues = {}
+    if element.model is not None:
+        for (name, par) in element.model.parameters.control:
+            try:
+                controlvalues[name] = copy.deepcopy(par.values)
+            except AttributeError:
+                controlvalues[name] = repr(par)
+    return controlvalues
+
+
+def _equal_controlvalues(controlvalues1, controlvalues2):
+    """Return `True`, if both dictionaries returned by function
+    :func:`_get_controlvalues` agree (including `nan` values)."""
+    if sorted(controlvalues1.keys()) != sorted(controlvalues2.keys()):
+        return False
+    for (name, values1) in controlvalues1.items():
+        values2 = controlvalues2[name]
+        if isinstance(values1, str) or isinstance(values2, str):
+            if values1 != values2:
+                return False
+            continue
+        values1 = numpy.asarray(values1)
+        values2 = numpy.asarray(values2)
+        if values1.shape != values2.shape:
+            return False
+        equal = values1 == values2
+        if values1.dtype.kind == 'f':
+            equal |= numpy.isnan(values1) & numpy.isnan(values2)
+        if not numpy.all(equal):
+            return False
+    return True
+
+
+def _get_pubstate():
+    """Return the information of module :mod:`~hydpy.pub` required by the
+    worker processes of method :func:`HydPy.doit`."""
+    options = {}
+    for (name, option) in vars(optiontools.Options).items():
+        if isinstance(option, optiontools._Option):
+            options[name] = option.value
+    managers = {}
+    for name in ('filemanager', 'networkmanager', 'controlmanager',
+                 'conditionmanager', 'sequencemanager'):
+        managers[name] = getattr(pub, name, None)
+    return (pub.projectname, pub.timegrids, options, managers)
+
+
+def _set_pubstate(pubstate):
+    """Restore the information of module :mod:`~hydpy.pub` returned by
+    function :func:`_get_pubstate`."""
+    (pub.projectname, pub.timegrids, options, managers) = pubstate
+    for (name, value) in options.items():
+        setattr(pub.options, name, value)
+    for (name, manager) in managers.items():
+        setattr(pub, name, manager)
+
+
+def _simulate_networks(job):
+    """Simulate the nodes and elements of the given job within a worker
+    process of method :func:`HydPy.doit` and return the resulting series
+    and final conditions."""
+    (pubstate, nodenames, elementnames, deploymodes, seriesflags) = job
+    _set_pubstate(pubstate)
+    pub.options.printprogress = False
+    registered = devicetools.Element.registered_names()
+    if any(name not in registered for name in elementnames):
+        if pub.networkmanager is None:
+            raise RuntimeError(
+                'The worker process of method `doit` of class `HydPy` is '
+                'not able to access the elements handled by the main '
+                'process and cannot load them, as no project has been '
+                'defined.')
+        pub.networkmanager.load()
+    nodes = devicetools.Nodes(*nodenames)
+    elements = devicetools.Elements(*elementnames)
+    for node in nodes:
+        if node.deploy_mode != deploymodes[node.name]:
+            node.deploy_mode = deploymodes[node.name]
+    for element in elements:
+        if element.model is None:
+            element.init_model()
+            element.model.parameters.update()
+            element.model.sequences.loadconditions()
+    for (key, ramflag) in seriesflags.items():
+        seq = get_sequence(nodes, elements, key)
+        if not hasmemory(seq):
+            if ramflag:
+                seq.activate_ram()
+            else:
+                seq.activate_disk()
+    hp = HydPy(_worker=True)
+    hp.updatedevices(selectiontools.Selection('worker', nodes, elements))
+    hp.doit()
+    allseries = {}
+    for key in seriesflags.keys():
+        if key[1] in ('nodes', 'fluxes', 'states') and key[2] != 'obs':
+            allseries[key] = get_sequence(nodes, elements, key).series
+    return allseries, get_conditions(elements)
 
 
 autodoctools.autodoc_module()
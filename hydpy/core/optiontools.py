@@ -101,12 +101,45 @@ class Options(object):
     0
     """
 
+    asccache = _Option(
+        True, None,
+        """True/False flag indicating whether the data of external ASCII
+        series files shall be cached in binary sidecar files (see module
+        :mod:`~hydpy.core.seriestools`).  The default is `True`.""")
+
     checkseries = _Option(
         True, None,
         """True/False flag indicating whether an error shall be raised
         when e.g. an incomplete input time series, not spanning the whole
         initialization time period, is loaded.""")
 
+    chunkcodec = _Option(
+        'zlib', None,
+        """Name of the codec for compressing the chunks of external data
+        files of type `chunked`, either `zlib` or `lzma` (see class
+        :class:`~hydpy.core.seriestools.ChunkedFile`).  The default is
+        `zlib`.""")
+
+    chunkshuffle = _Option(
+        True, None,
+        """True/False flag indicating whether the bytes of the values of
+        external data files of type `chunked` shall be shuffled before
+        compression, which usually improves the compression ratio of
+        smooth series.  The default is `True`.""")
+
+    chunksize = _Option(
+        1024, None,
+        """Number of time steps per chunk of external data files of type
+        `chunked`.  The default is 1024.""")
+
+    diskblocksize = _Option(
+        0, None,
+        """Number of simulation time steps read from or written to the
+        internal data files of sequences handled on disk at once.  The
+        default value zero means to map the complete files into memory
+        instead.  Positive values are helpful when memory mapping is
+        not suitable, e.g. on networked file systems.""")
+
     ellipsis = _Option(
         -999, -999,
         """Ellipsis points are used to shorten the string representations
@@ -137,6 +170,14 @@ class Options(object):
         """True/False flag indicating whether information shall be printed
         in color eventually or not. The default is `True`.""")
 
+    profiling = _Option(
+        False, None,
+        """True/False flag indicating whether method `doit` of class
+        `HydPy` shall record the computation times of the individual
+        model methods (see module :mod:`~hydpy.core.profiletools`).  The
+        default is `False`.  Cython models support profiling only if the
+        flag is `True` when they are cythonized.""")
+
     reprcomments = _Option(
         True, None,
         """True/False flag indicationg whether comments shall be included
@@ -149,6 +190,14 @@ class Options(object):
         numbers, defined as the minimum number of digits to be reproduced
         by the string representation (see function :func:`repr_`).""")
 
+    singleprecision = _Option(
+        False, None,
+        """True/False flag indicating whether the internal time series of
+        model sequences shall be stored in single precision (see property
+        :attr:`~hydpy.core.sequencetools.ModelIOSequence.singleflag`).
+        The model calculations are always performed in double precision.
+        The default is `False`.""")
+
     skipdoctests = _Option(
         False, None,
         """True/False flag indicating whether documetation tests shall be
@@ -166,6 +215,17 @@ class Options(object):
         """True/False flag indicating whether parameters values shall be
         initialized with standard values or not.""")
 
+    usenetworkrunner = _Option(
+        False, None,
+        """True/False flag indicating whether method
+        :func:`~hydpy.core.hydpytools.HydPy.doit` shall perform the
+        complete time loop within a compiled
+        :class:`~hydpy.cythons.networkutils.NetworkRunner` object or not.
+        This requires all models to be cythonized and all node series to
+        be handled in RAM or, if :attr:`diskblocksize` is zero, on disk.
+        Otherwise, the usual Python loop is applied.
+        The default is `False`.""")
+
     dirverbose = _Option(
         False, None,
         """True/False flag indicationg whether the listboxes for the member
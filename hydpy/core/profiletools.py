@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""This module implements features for measuring the computation times of
+the individual methods of the models handled by different elements.
+
+Profiling is disabled by default.  Set option
+:attr:`~hydpy.core.optiontools.Options.profiling` to `True` to let method
+:func:`~hydpy.core.hydpytools.HydPy.doit` record the cumulative computation
+time and the number of calls of the methods `loaddata`, `savedata`,
+`solve`, `new2old`, and of all "run methods", "inlet update methods",
+"outlet update methods", "receiver update methods", and "sender update
+methods" of each model.  Afterwards, property
+:attr:`~hydpy.core.hydpytools.HydPy.profile` returns the results in
+form of a :class:`ProfileReport` object.
+
+In pure Python mode, the relevant methods are wrapped at runtime.  Cython
+models need to be compiled with profiling support, which
+:class:`~hydpy.cythons.modelutils.PyxWriter` adds if option
+:attr:`~hydpy.core.optiontools.Options.profiling` is `True` when the
+respective model is cythonized.  Changing this option before importing
+a model triggers its recompilation.  Compiled models measure processor
+time (via the C function `clock`), which is equal to wall-clock time for
+single-threaded simulations on most systems.
+"""
+# import...
+# ...from the Python standard library
+from __future__ import division, print_function
+import importlib
+import timeit
+import warnings
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy.core import objecttools
+from hydpy.core import autodoctools
+
+TIMED_METHODS = ('loaddata', 'savedata', 'solve', 'new2old')
+"""Names of the model methods, whose computation times are recorded."""
+TIMED_GROUPS = ('_INLET_METHODS', '_RUN_METHODS', '_OUTLET_METHODS',
+                '_RECEIVER_METHODS', '_SENDER_METHODS')
+"""Names of the model method groups, whose members' computation times
+are recorded individually."""
+_MISSING = object()
+
+
+def iscythonized(model):
+    """Return `True` if the given model works in Cython mode and `False`
+    if it works in pure Python mode."""
+    return not isinstance(model.cymodel, objecttools.FastAccess)
+
+
+def activate(model):
+    """Prepare the given model for recording computation times.
+
+    For Python models, function :func:`activate` wraps all relevant
+    methods.  Calling it repeatedly does not wrap them multiple times.
+    For Cython models, it only checks whether they have been compiled
+    with profiling support and emits a warning otherwise.
+    """
+    if iscythonized(model):
+        if not hasattr(model.cymodel, 'profile_times'):
+            warnings.warn(
+                'The Cython model of element `%s` has been compiled without '
+                'profiling support.  Set option `profiling` to `True` '
+                'before importing the model to trigger its recompilation.'
+                % objecttools.devicename(model))
+        return
+    if vars(model).get('_profile') is not None:
+        return
+    model._profile = {}
+    model._unprofiled = {}
+    for name in TIMED_METHODS:
+        method = getattr(model, name, None)
+        if method is not None:
+            model._unprofiled[name] = vars(model).get(name, _MISSING)
+            setattr(model, name, _timed(model._profile, name, method))
+    for group in TIMED_GROUPS:
+        functions = getattr(model, group, ())
+        if functions:
+            model._unprofiled[group] = vars(model).get(group, _MISSING)
+            setattr(model, group,
+                    tuple(_timed(model._profile, function.__name__, function)
+                          for function in functions))
+
+
+def deactivate(model):
+    """Remove all wrappers added by function :func:`activate` (and keep
+    the recorded computation times)."""
+    unprofiled = vars(model).get('_unprofiled')
+    if unprofiled is None:
+        return
+    for (name, value) in unprofiled.items():
+        if value is _MISSING:
+            delattr(model, name)
+        else:
+            setattr(model, name, value)
+    model._unprofiled = None
+    model._profile = None
+
+
+def _timed(profile, name, function):
+    """Wrap the given function so that it adds its computation time and
+    the number of its calls to the given profile dictionary."""
+    record = profile.setdefault(name, [0., 0])
+    timer = timeit.default_timer
+
+    def timed(*args):
+        time = timer()
+        result = function(*args)
+        record[0] += timer()-time
+        record[1] += 1
+        return result
+
+    timed.__name__ = name
+    return timed
+
+
+def get_records(model):
+    """Return a list of tuples, each one containing the name, the
+    cumulative computation time (in seconds), and the number of calls
+    of a method of the given model, that has been called at least once
+    since the last reset."""
+    if iscythonized(model):
+        cymodel = model.cymodel
+        if not hasattr(cymodel, 'profile_times'):
+            return []
+        module = importlib.import_module(type(cymodel).__module__)
+        times = numpy.asarray(cymodel.profile_times)
+        calls = numpy.asarray(cymodel.profile_calls)
+        return [(name, float(times[idx]), int(calls[idx]))
+                for (idx, name) in enumerate(module.PROFILENAMES)
+                if calls[idx]]
+    profile = vars(model).get('_profile') or {}
+    return [(name, time, calls) for (name, (time, calls))
+            in sorted(profile.items()) if calls]
+
+
+def reset(model):
+    """Reset all computation times and numbers of calls recorded for the
+    given model to zero."""
+    if iscythonized(model):
+        if hasattr(model.cymodel, 'profile_times'):
+            numpy.asarray(model.cymodel.profile_times)[:] = 0.
+            numpy.asarray(model.cymodel.profile_calls)[:] = 0
+    else:
+        for record in (vars(model).get('_profile') or {}).values():
+            record[:] = [0., 0]
+
+
+class ProfileReport(object):
+    """Sortable table of computation times.
+
+    Each row consists of the name of an element, the name of the model
+    of the element, the name of a method of the model, the cumulative
+    computation time of the method (in seconds), and the number of its
+    calls:
+
+    >>> from hydpy.core.profiletools import ProfileReport
+    >>> report = ProfileReport(
+    ...     [('e1', 'hstream_v1', 'calc_qjoints_v1', .5, 10),
+    ...      ('e1', 'hstream_v1', 'loaddata', .1, 10),
+    ...      ('e2', 'lstream_v1', 'solve', 2., 10),
+    ...      ('e3', 'hstream_v1', 'calc_qjoints_v1', 1., 10)])
+
+    The string representation lists all rows in descending order of their
+    computation times by default:
+
+    >>> report
+    element  model       method             time [s]   calls  share [%]
+    e2       lstream_v1  solve              2.000000      10       55.6
+    e3       hstream_v1  calc_qjoints_v1    1.000000      10       27.8
+    e1       hstream_v1  calc_qjoints_v1    0.500000      10       13.9
+    e1       hstream_v1  loaddata           0.100000      10        2.8
+
+    Use method :func:`~ProfileReport.sort` to sort by another column
+    (`element`, `model`, `method`, `time`, or `calls`):
+
+    >>> report.sort('element', reverse=False)
+    element  model       method             time [s]   calls  share [%]
+    e1       hstream_v1  calc_qjoints_v1    0.500000      10       13.9
+    e1       hstream_v1  loaddata           0.100000      10        2.8
+    e2       lstream_v1  solve              2.000000      10       55.6
+    e3       hstream_v1  calc_qjoints_v1    1.000000      10       27.8
+
+    Methods :func:`~ProfileReport.per_element` and
+    :func:`~ProfileReport.per_method` aggregate the rows of the same
+    elements and of the same model methods, respectively:
+
+    >>> report.per_element()
+    element  model       method    time [s]   calls  share [%]
+    e2       lstream_v1  -         2.000000      10       55.6
+    e3       hstream_v1  -         1.000000      10       27.8
+    e1       hstream_v1  -         0.600000      20       16.7
+    >>> report.per_method()
+    element  model       method             time [s]   calls  share [%]
+    -        lstream_v1  solve              2.000000      10       55.6
+    -        hstream_v1  calc_qjoints_v1    1.500000      20       41.7
+    -        hstream_v1  loaddata           0.100000      10        2.8
+
+    The share column relates to the total computation time of all rows:
+
+    >>> report.total
+    3.6
+    """
+
+    COLUMNS = ('element', 'model', 'method', 'time', 'calls')
+
+    def __init__(self, rows=()):
+        self.rows = [tuple(row) for row in rows]
+        self.sort()
+
+    @property
+    def total(self):
+        """The total computation time of all rows."""
+        return sum(row[3] for row in self.rows)
+
+    def sort(self, column='time', reverse=True):
+        """Sort the rows by the given column and return the report."""
+        try:
+            idx = self.COLUMNS.index(column)
+        except ValueError:
+            raise ValueError(
+                'The given column name `%s` is not available.  Please '
+                'choose one of the following: %s.'
+                % (column, ', '.join(self.COLUMNS)))
+        self.rows.sort(key=lambda row: (row[idx], row[:3]), reverse=reverse)
+        return self
+
+    def per_element(self):
+        """Return a new report, aggregating all rows of each element."""
+        return self._aggregate(lambda row: (row[0], row[1], '-'))
+
+    def per_method(self):
+        """Return a new report, aggregating all rows of each method of
+        each model type."""
+        return self._aggregate(lambda row: ('-', row[1], row[2]))
+
+    def _aggregate(self, getkey):
+        sums = {}
+        for row in self.rows:
+            record = sums.setdefault(getkey(row), [0., 0])
+            record[0] += row[3]
+            record[1] += row[4]
+        return ProfileReport(key+tuple(record)
+                             for (key, record) in sums.items())
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        total = self.total
+        widths = [max([len(self.COLUMNS[idx])] +
+                      [len(str(row[idx])) for row in self.rows])
+                  for idx in range(3)]
+        lines = ['%s  %s  %s  %10s  %6s  %9s'
+                 % (self.COLUMNS[0].ljust(widths[0]),
+                    self.COLUMNS[1].ljust(widths[1]),
+                    self.COLUMNS[2].ljust(widths[2]),
+                    'time [s]', 'calls', 'share [%]')]
+        for row in self.rows:
+            share = 100.*row[3]/total if total else 0.
+            lines.append('%s  %s  %s  %10.6f  %6d  %9.1f'
+                         % (str(row[0]).ljust(widths[0]),
+                            str(row[1]).ljust(widths[1]),
+                            str(row[2]).ljust(widths[2]),
+                            row[3], row[4], share))
+        return '\n'.join(lines)
+
+    def __dir__(self):
+        return objecttools.dir_(self)
+
+
+autodoctools.autodoc_module()
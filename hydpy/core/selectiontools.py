@@ -10,6 +10,7 @@ import os
 from hydpy import pub
 from hydpy.core import objecttools
 from hydpy.core import devicetools
+from hydpy.core import graphtools
 from hydpy.core import autodoctools
 
 
@@ -198,52 +199,13 @@ class Selection(object):
               :class:`~hydpy.core.devicetools.Element`): Lowest point
               to be selected.
         """
-        nodes = devicetools.Nodes()
-        elements = devicetools.Elements()
-        if isinstance(device, devicetools.Node):
-            nodes, elements = self._nextnode(device, nodes, elements)
-        elif isinstance(device, devicetools.Element):
-            nodes, elements = self._nextelement(device, nodes, elements)
-        else:
+        if not isinstance(device, (devicetools.Node, devicetools.Element)):
             raise AttributeError('Pass either a `Node` or an `Element` '
                                  'instance to the function.  The given '
                                  '`device` value `%s` is of type `%s`.'
                                  % (device, type(device)))
-        return nodes, elements
-
-    def _nextnode(self, node, nodes, elements):
-        """First recursion method for :func:`~Selection.getupstreamnetwork`.
-
-        Arguments:
-            * node (:class:`~hydpy.core.devicetools.Node`): The node which
-              is selected currently.
-            * nodes (:class:`~hydpy.core.devicetools.Nodes`): All nodes
-            which have been selected so far.
-            * elements (:class:`~hydpy.core.devicetools.Elements`): All
-            elements which have been selected so far.
-        """
-        if (node not in nodes) and (node in self.nodes):
-            nodes += node
-            for element in node.entries:
-                nodes, elements = self._nextelement(element, nodes, elements)
-        return nodes, elements
-
-    def _nextelement(self, element, nodes, elements):
-        """Second recursion method for :func:`~Selection.getupstreamnetwork`.
-
-        Arguments:
-            * element (:class:`~hydpy.core.devicetools.Element`): The
-              element which is selected currently.
-            * nodes (:class:`~hydpy.core.devicetools.Nodes`): All nodes
-            which have been selected so far.
-            * elements (:class:`~hydpy.core.devicetools.Elements`): All
-            elements which have been selected so far.
-        """
-        if (element not in elements) and (element in self.elements):
-            elements += element
-            for node in element.inlets:
-                nodes, elements = self._nextnode(node, nodes, elements)
-        return nodes, elements
+        graph = graphtools.NetworkGraph(self.nodes, self.elements)
+        return graph.upstream(device)
 
     def select_modelclasses(self, *modelclass):
         """Limits the current selection to all elements containing the
@@ -8,7 +8,6 @@ from __future__ import division, print_function
 import os
 import sys
 import copy
-import struct
 import warnings
 # ...from site-packages
 import numpy
@@ -16,9 +15,20 @@ import numpy
 from hydpy import pub
 from hydpy.core import timetools
 from hydpy.core import objecttools
+from hydpy.core import seriestools
 from hydpy.cythons import pointerutils
 from hydpy.core import autodoctools
 
+AGGREGATIONMODES = ('last', 'sum', 'mean', 'min', 'max')
+"""Names of the available modes for aggregating the internal data of
+flux and state sequences during simulation runs (see method
+:func:`~ModelIOSequence.activate_aggregation`)."""
+_AGGREGATORS = (None,
+                lambda old, new, rdx: old+new,
+                lambda old, new, rdx: old+(new-old)/(rdx+1),
+                lambda old, new, rdx: numpy.minimum(old, new),
+                lambda old, new, rdx: numpy.maximum(old, new))
+
 
 class Sequences(object):
     """Base class for handling all sequences of a specific model."""
@@ -87,6 +97,11 @@ class Sequences(object):
             if hasattr(subseqs, 'reset'):
                 subseqs.reset()
 
+    def setmember(self, member):
+        for (name, subseqs) in self:
+            if hasattr(subseqs, 'setmember'):
+                subseqs.setmember(member)
+
     def __iter__(self):
         for name in self._names_subseqs:
             subseqs = getattr(self, name, None)
@@ -329,7 +344,7 @@ class IOSubSequences(SubSequences):
     _SEQCLASSES = ()
 
     def openfiles(self, idx=0):
-        self.fastaccess.openfiles(idx)
+        self.fastaccess.openfiles(idx, pub.options.diskblocksize)
 
     def closefiles(self):
         self.fastaccess.closefiles()
@@ -350,6 +365,14 @@ class IOSubSequences(SubSequences):
         for (name, seq) in self:
             seq.deactivate_disk()
 
+    def activate_aggregation(self, mode, stepsize):
+        for (name, seq) in self:
+            seq.activate_aggregation(mode, stepsize)
+
+    def deactivate_aggregation(self):
+        for (name, seq) in self:
+            seq.deactivate_aggregation()
+
     def ram2disk(self):
         for (name, seq) in self:
             seq.ram2disk()
@@ -358,6 +381,20 @@ class IOSubSequences(SubSequences):
         for (name, seq) in self:
             seq.disk2ram()
 
+    def activate_ensemble(self, nmb_members):
+        for (name, seq) in self:
+            seq.activate_ensemble(nmb_members)
+
+    def deactivate_ensemble(self):
+        for (name, seq) in self:
+            seq.deactivate_ensemble()
+
+    def setmember(self, member):
+        """Select the ensemble member whose internal data is read and
+        written during simulation runs (see method
+        :func:`~IOSequence.activate_ensemble`)."""
+        self.fastaccess._member = int(member)
+
 
 class InputSequences(IOSubSequences):
     """Base class for handling input sequences."""
@@ -457,7 +494,15 @@ class Sequence(objecttools.ValueMath):
         self.diskflag = False
         self.ramflag = False
         try:
-            self._connect_subattr('file', '')
+            self._connect_subattr('file', None)
+        except AttributeError:
+            pass
+        try:
+            self._connect_subattr('offset', 0)
+        except AttributeError:
+            pass
+        try:
+            self._connect_subattr('ensembleflag', False)
         except AttributeError:
             pass
         self._initvalues()
@@ -631,6 +676,13 @@ class IOSequence(Sequence):
         self._dirpath_int = None
         self._filepath_ext = None
         self._filepath_int = None
+        self._window = None
+        self._stream = False
+        self._aggregation = None
+        self._weights = None
+        self._reduced = False
+        self._shared = False
+        self._ensemble = None
 
     def _getfiletype_ext(self):
         """Ending of the external data file."""
@@ -668,6 +720,8 @@ class IOSequence(Sequence):
         """Complete filename of the external data file."""
         if self._filename_ext:
             return self._filename_ext
+        elif self.filetype_ext == 'store':
+            return '.'.join((self.storename, self.filetype_ext))
         else:
             return '.'.join((self.rawfilename, self.filetype_ext))
 
@@ -814,23 +868,88 @@ class IOSequence(Sequence):
 
     memoryflag = property(_getmemoryflag)
 
+    @property
+    def _arrayname(self):
+        if getattr(self.fastaccess, '_%s_single' % self.name, False):
+            return '_%s_array32' % self.name
+        return '_%s_array' % self.name
+
+    @property
+    def _dtype(self):
+        if getattr(self.fastaccess, '_%s_single' % self.name, False):
+            return numpy.float32
+        return float
+
     def _getarray(self):
-        array = getattr(self.fastaccess, '_%s_array' % self.name, None)
+        if self._ensemble:
+            array = numpy.asarray(
+                getattr(self.fastaccess, '_%s_ensemble' % self.name))
+            if self._reduced:
+                return array[:, :, 0]
+            return array
+        array = getattr(self.fastaccess, self._arrayname, None)
         if array is not None:
+            if self._reduced:
+                return numpy.asarray(array)[:, 0]
+            if self._shared:
+                array = numpy.asarray(array).view()
+                array.flags.writeable = False
+                return array
             return numpy.asarray(array)
         else:
             raise RuntimeError('The `ram array` of sequence `%s` has '
                                'not been set yet.' % self.name)
 
     def _setarray(self, values):
-        values = numpy.array(values, dtype=float)
-        setattr(self.fastaccess, '_%s_array' % self.name,  values)
+        if self._ensemble:
+            shape = (self._ensemble,)+self.seriesshape
+            array = numpy.empty(shape, dtype=float)
+            array[:] = values
+            if self._reduced:
+                array = array.reshape(shape+(1,))
+            self._connect_subattr('ensemble', array)
+            return
+        values = numpy.array(values, dtype=self._dtype)
+        if self._reduced:
+            values = values.reshape(-1, 1)
+        setattr(self.fastaccess, self._arrayname,  values)
+        self._shared = False
+
+    @property
+    def seriestimegrid(self):
+        """Time grid of the internal data, which is the initialization
+        time grid or, for aggregated series, a coarser one (see method
+        :func:`~ModelIOSequence.activate_aggregation`)."""
+        if self._aggregation is None:
+            return pub.timegrids.init
+        init = pub.timegrids.init
+        return timetools.Timegrid(
+            init.firstdate, init.lastdate, self._aggregation[1])
+
+    @property
+    def aggregation(self):
+        """Name of the aggregation mode and step size of the internal
+        data or `None` (see method
+        :func:`~ModelIOSequence.activate_aggregation`)."""
+        return self._aggregation
+
+    @property
+    def recordshape(self):
+        """Shape of the internal data of a single time step, which agrees
+        with :attr:`~Sequence.shape` except for sequences recording only
+        some of their values or weighted sums of them (see method
+        :func:`~ModelIOSequence.activate_recording`)."""
+        if self._weights is None:
+            return self.shape
+        if self._reduced:
+            return ()
+        return (len(self._weights),)
 
     @property
     def seriesshape(self):
         """Shape of the whole time series (time beeing the first dimension)."""
-        seriesshape = [len(pub.timegrids.init)]
-        seriesshape.extend(self.shape)
+        seriesshape = [len(self.seriestimegrid)]
+        seriesshape.extend(self.recordshape)
         return tuple(seriesshape)
 
     @property
@@ -862,6 +981,8 @@ class IOSequence(Sequence):
 
     def _setseries(self, values):
         series = self.series
+        if self._shared:
+            series = series.copy()
         series[:] = values
         if self.diskflag:
             self._save_int(series)
@@ -876,18 +997,151 @@ class IOSequence(Sequence):
         if self.diskflag:
             os.remove(self.filepath_int)
         elif self.ramflag:
-            setattr(self.fastaccess, '_%s_array' % self.name, None)
+            setattr(self.fastaccess, self._arrayname, None)
+            self._shared = False
+            self._dropensemble()
+            self._connect_subattr('offset', 0)
+            self._window = None
+            self._stream = False
 
     series = property(_getseries, _setseries, _delseries)
 
+    @property
+    def window(self):
+        """Number of time steps of the windows of lazily loaded external
+        data (see method :func:`~IOSequence.activate_lazy`) or of
+        streamed internal data (see method
+        :func:`~IOSequence.activate_stream`) or `None`."""
+        return self._window
+
+    @property
+    def stream(self):
+        """`True`, if the internal data is streamed into the external
+        data file (see method :func:`~IOSequence.activate_stream`)."""
+        return self._stream
+
+    @property
+    def ensemble(self):
+        """Number of the ensemble members handled by the internal data
+        (see method :func:`~IOSequence.activate_ensemble`) or `None`."""
+        return self._ensemble
+
+    def activate_ensemble(self, nmb_members):
+        """Demand handling the internal data of `nmb_members` ensemble
+        members instead of a single series, e.g. for simulating different
+        parameter sets (see method
+        :func:`~hydpy.core.hydpytools.HydPy.doit_ensemble`).
+
+        Property :attr:`~IOSequence.series` then returns an array of shape
+        `(nmb_members,)+seriesshape`, with the ensemble members as the
+        leading axis.  Each member starts with a copy of the actual
+        internal data.  During simulation runs, the methods
+        :func:`~FastAccess.loaddata` and :func:`~FastAccess.savedata`
+        read and write the series of the member selected via method
+        :func:`~IOSubSequences.setmember`.  The internal data of all
+        members is handled in RAM and in double precision.  Activating an
+        ensemble with the actual number of members changes nothing, and
+        deactivating the `ramflag` discards the ensemble.
+        """
+        nmb_members = int(nmb_members)
+        if nmb_members < 1:
+            raise ValueError(
+                'The number of ensemble members of sequence `%s` of device '
+                '`%s` must be positive, but `%d` is given.'
+                % (self.name, objecttools.devicename(self), nmb_members))
+        if (not self.ramflag) or self.window:
+            raise RuntimeError(
+                'Sequence `%s` of device `%s` does not handle its complete '
+                'internal data in RAM and thus cannot handle the internal '
+                'data of ensemble members.'
+                % (self.name, objecttools.devicename(self)))
+        if nmb_members == self._ensemble:
+            return
+        self.deactivate_ensemble()
+        values = self._getarray()
+        setattr(self.fastaccess, self._arrayname, None)
+        self._shared = False
+        self._ensemble = nmb_members
+        self._setarray(values)
+        self._connect_subattr('ensembleflag', True)
+
+    def deactivate_ensemble(self):
+        """Demand handling a single series again, which is the internal
+        data of the first ensemble member."""
+        if self._ensemble:
+            values = self._getarray()[0]
+            self._dropensemble()
+            self._setarray(values)
+
+    def _dropensemble(self):
+        self._ensemble = None
+        self._connect_subattr('ensembleflag', False)
+        self._connect_subattr('ensemble', None)
+
     def load_ext(self):
         """Load the external data series in accordance with
         :attr:`~IOSequence.timegrid_init` and store it as internal data.
+
+        Data already read by function :func:`~hydpy.core.seriestools.load`
+        is not read again (see function
+        :func:`~hydpy.core.seriestools.getloaded`).
+        """
+        data = seriestools.getloaded(self)
+        if data is None:
+            data = self.read_ext()
+        self.apply_ext(*data)
+
+    def read_ext(self, timegrid=None):
+        """Read the external data file and return the time grid of the
+        data and the data itself.
+
+        If a time grid is given, binary numpy files are mapped into memory
+        and consolidated and chunked series files only read for the given
+        time grid, so that only the relevant data needs to be copied.
         """
         if self.filetype_ext == 'npy':
-            timegrid_data, values = self._load_npy()
+            return self._load_npy(None if timegrid is None else 'r')
+        elif self.filetype_ext == 'store':
+            return self._load_store(timegrid)
+        elif self.filetype_ext == 'chunked':
+            return self._load_chunked(timegrid)
         else:
-            timegrid_data, values = self._load_asc()
+            return self._load_asc()
+
+    def apply_ext(self, timegrid_data, values):
+        """Check the given external data, adjust it to the initialization
+        time grid, and store it as internal data."""
+        values = self._adjust_ext(timegrid_data, values)
+        if self.diskflag:
+            self._save_int(values)
+        elif self.ramflag:
+            self._setarray(values)
+        else:
+            raise RuntimeError(
+                'Sequence `%s` of element `%s`is not requested to make '
+                'any internal data available the the user.'
+                % (self.name, objecttools.devicename(self)))
+
+    def _adjust_ext(self, timegrid_data, values):
+        """Check the given external data and return the values of the
+        initialization time grid."""
+        self._check_ext(timegrid_data, values)
+        if pub.timegrids.init not in timegrid_data:
+            if pub.options.checkseries:
+                raise RuntimeError(
+                    'For sequence `%s` of element `%s` the initialization '
+                    'time grid (%s) does not define a subset of the time '
+                    'grid of the external data file %s (%s).'
+                    % (self.name, objecttools.devicename(self),
+                       pub.timegrids.init, self.filepath_ext, timegrid_data))
+            return self.adjust_short_series(timegrid_data, values)
+        idx1 = timegrid_data[pub.timegrids.init.firstdate]
+        idx2 = timegrid_data[pub.timegrids.init.lastdate]
+        return values[idx1:idx2]
+
+    def _check_ext(self, timegrid_data, values):
+        """Check the shape and the time step of the given external
+        data."""
         if self.shape != values.shape[1:]:
             raise RuntimeError(
                 'The shape of sequence `%s` of element `%s` is `%s`, but '
@@ -901,29 +1155,48 @@ class IOSequence(Sequence):
                 'simulation time step is `%s`.'
                 % (self.filepath_ext, self.name, objecttools.devicename(self),
                    timegrid_data.stepsize, pub.timegrids.init.stepsize))
-        elif pub.timegrids.init not in timegrid_data:
-            if pub.options.checkseries:
-                raise RuntimeError(
-                    'For sequence `%s` of element `%s` the initialization '
-                    'time grid (%s) does not define a subset of the time '
-                    'grid of the external data file %s (%s).'
-                    % (self.name, objecttools.devicename(self),
-                       pub.timegrids.init, self.filepath_ext, timegrid_data))
-            else:
-                values = self.adjust_short_series(timegrid_data, values)
-        else:
-            idx1 = timegrid_data[pub.timegrids.init.firstdate]
-            idx2 = timegrid_data[pub.timegrids.init.lastdate]
-            values = values[idx1:idx2]
-        if self.diskflag:
-            self._save_int(values)
-        elif self.ramflag:
-            self._setarray(values)
+
+    def read_window(self, idx0, idx1):
+        """Read the external data of the time steps between the given
+        indices of the initialization time grid and return it.
+
+        Binary numpy files and consolidated series files are only read
+        partly (see method :func:`~IOSequence.read_ext`).  ASCII files are
+        parsed completely (or taken from their sidecar files, see function
+        :func:`~hydpy.core.seriestools.load_asc`).
+        """
+        init = pub.timegrids.init
+        window = timetools.Timegrid(init[idx0], init[idx1], init.stepsize)
+        timegrid_data, values = self.read_ext(window)
+        self._check_ext(timegrid_data, values)
+        if window in timegrid_data:
+            jdx = timegrid_data[window.firstdate]
+            values = values[jdx:jdx+idx1-idx0]
         else:
-            raise RuntimeError(
-                'Sequence `%s` of element `%s`is not requested to make '
-                'any internal data available the the user.'
-                % (self.name, objecttools.devicename(self)))
+            values = self._adjust_ext(timegrid_data, values)[idx0:idx1]
+        return numpy.array(values, dtype=float)
+
+    def inwindow(self, idx0, idx1):
+        """Return `True`, if the actual window of the lazily loaded
+        external data covers the time steps between the given indices."""
+        if not self.window:
+            return False
+        offset = getattr(self.fastaccess, '_%s_offset' % self.name)
+        return offset <= idx0 and idx1 <= offset+len(self.series)
+
+    def set_window(self, idx0, values):
+        """Replace the actual window of the lazily loaded external data
+        by the given values, starting at the given index of the
+        initialization time grid."""
+        self._setarray(values)
+        self._connect_subattr('offset', idx0)
+
+    def load_window(self, idx0, idx1):
+        """Read and apply the external data of the time steps between
+        the given indices of the initialization time grid (see methods
+        :func:`~IOSequence.read_window` and :func:`~IOSequence.set_window`).
+        """
+        self.set_window(idx0, self.read_window(idx0, idx1))
 
     def adjust_short_series(self, timegrid, values):
         """Adjust a short time series to a longer timegrid.
@@ -1017,21 +1290,36 @@ class IOSequence(Sequence):
         return values
 
     def save_ext(self):
-        """Write the internal data into an external data file."""
+        """Write the internal data into an external data file.
+
+        The internal data of ensemble members (see method
+        :func:`~IOSequence.activate_ensemble`) cannot be written."""
+        if self._ensemble:
+            raise RuntimeError(
+                'Sequence `%s` of device `%s` handles the internal data of '
+                '%d ensemble members, which cannot be written into a single '
+                'external data file.'
+                % (self.name, objecttools.devicename(self), self._ensemble))
+        timegrid = self.seriestimegrid
         if self.filetype_ext == 'npy':
-            series = pub.timegrids.init.array2series(self.series)
+            series = timegrid.array2series(self.series)
             numpy.save(self.filepath_ext, series)
+        elif self.filetype_ext == 'store':
+            self._save_store()
+        elif self.filetype_ext == 'chunked':
+            seriestools.ChunkedFile.write(
+                self.filepath_ext, timegrid, self.series)
         else:
             with open(self.filepath_ext, 'w') as file_:
-                file_.write(repr(pub.timegrids.init) + '\n')
+                file_.write(repr(timegrid) + '\n')
                 numpy.savetxt(file_, self.series, delimiter='\t')
 
-    def _load_npy(self):
+    def _load_npy(self, mmap_mode=None):
         """Return the data timegrid and the complete external data from a
         binary numpy file.
         """
         try:
-            data = numpy.load(self.filepath_ext)
+            data = numpy.load(self.filepath_ext, mmap_mode=mmap_mode)
         except BaseException:
             prefix = ('While trying to load the external data of sequence '
                       '`%s` from file `%s`' % (self.name, self.filepath_ext))
@@ -1045,17 +1333,60 @@ class IOSequence(Sequence):
             objecttools.augmentexcmessage(prefix)
         return timegrid_data, data[13:]
 
+    def _load_store(self, timegrid=None):
+        """Return the data timegrid and the external data of the actual
+        device from a consolidated series file (see module
+        :mod:`~hydpy.core.seriestools`), restricted to the given or the
+        initialization time period if possible."""
+        if timegrid is None:
+            timegrid = pub.timegrids.init
+        return seriestools.getfile(self.filepath_ext).read(
+            objecttools.devicename(self), timegrid)
+
+    def _load_chunked(self, timegrid=None):
+        """Return the data timegrid and the external data from a chunked
+        series file (see class :class:`~hydpy.core.seriestools.ChunkedFile`),
+        restricted to the given or the initialization time period if
+        possible."""
+        if timegrid is None:
+            timegrid = pub.timegrids.init
+        try:
+            return seriestools.ChunkedFile(self.filepath_ext).read(timegrid)
+        except BaseException:
+            objecttools.augmentexcmessage(
+                'While trying to load the external data of sequence `%s` '
+                'from file `%s`' % (self.name, self.filepath_ext))
+
+    def _save_store(self):
+        """Write the internal data of the actual device into a consolidated
+        series file (see module :mod:`~hydpy.core.seriestools`)."""
+        if not os.path.exists(self.filepath_ext):
+            seriestools.save([self])
+            return
+        seriesfile = seriestools.getfile(self.filepath_ext)
+        if seriesfile.timegrid != self.seriestimegrid:
+            raise RuntimeError(
+                'The time grid of the consolidated series file `%s` (%s) '
+                'does not agree with the time grid of the internal data '
+                '(%s), so the series of sequence `%s` of device `%s` cannot '
+                'be added.'
+                % (self.filepath_ext, seriesfile.timegrid,
+                   self.seriestimegrid, self.name,
+                   objecttools.devicename(self)))
+        seriesfile.update(objecttools.devicename(self), self.series)
+
     def _load_asc(self):
-        with open(self.filepath_ext) as file_:
-            header = '\n'.join([file_.readline() for idx in range(3)])
-        timegrid_data = eval(header, {}, {'Timegrid': timetools.Timegrid})
-        values = numpy.loadtxt(self.filepath_ext, skiprows=3,
-                               ndmin=self.NDIM+1)
+        """Return the data timegrid and the complete external data from
+        an ASCII file (see function :func:`~hydpy.core.seriestools.load_asc`).
+        """
+        timegrid_data, values = seriestools.load_asc(self.filepath_ext)
+        if (not self.recordshape) and (values.shape[1] == 1):
+            values = values[:, 0]
         return timegrid_data, values
 
     def _load_int(self):
         """Load internal data from file and return it."""
-        values = numpy.fromfile(self.filepath_int)
+        values = numpy.fromfile(self.filepath_int, dtype=self._dtype)
         if self.NDIM > 0:
             values = values.reshape(self.seriesshape)
         return values
@@ -1073,7 +1404,7 @@ class IOSequence(Sequence):
                                % self.name)
 
     def _save_int(self, values):
-        values.tofile(self.filepath_int)
+        numpy.asarray(values, dtype=self._dtype).tofile(self.filepath_int)
 
     def activate_disk(self):
         """Demand reading/writing internal data from/to hard disk."""
@@ -1109,6 +1440,72 @@ class IOSequence(Sequence):
             del self.series
             self.ramflag = False
 
+    def activate_lazy(self, window):
+        """Demand loading the external data lazily, in windows of
+        `window` time steps, instead of loading the complete series
+        in advance.
+
+        The internal data is handled in RAM, but it only covers the
+        actual window.  The window starting with the simulation period
+        is loaded immediately.  During simulation runs, class
+        :class:`~hydpy.core.seriestools.WindowLoader` loads the following
+        windows.
+        """
+        window = self._checkwindow(window)
+        self.deactivate_disk()
+        self.deactivate_ram()
+        self.ramflag = True
+        self._window = window
+        idx0 = pub.timegrids.init[pub.timegrids.sim.firstdate]
+        self.load_window(idx0, min(idx0+window, len(pub.timegrids.init)))
+        self.update_fastaccess()
+
+    def activate_stream(self, window):
+        """Demand writing the internal data into the external data file
+        window by window during simulation runs, instead of keeping the
+        complete series in memory.
+
+        The internal data is handled in RAM, but it only covers the
+        actual window of `window` time steps.  During simulation runs,
+        class :class:`~hydpy.core.seriestools.WindowLoader` passes each
+        completed window to a :class:`~hydpy.core.seriestools.SeriesWriter`
+        object, which writes it within a background thread.  Hence, the
+        external data file is complete after each simulation run, and
+        saving the series afterwards is not necessary.  Only the external
+        file types `npy` and `asc` are supported.
+        """
+        window = self._checkwindow(window)
+        if self.aggregation is not None:
+            raise RuntimeError(
+                'The internal data of sequence `%s` of device `%s` is '
+                'aggregated and thus cannot be streamed into its external '
+                'data file.' % (self.name, objecttools.devicename(self)))
+        if self.filetype_ext not in ('npy', 'asc'):
+            raise RuntimeError(
+                'The internal data of sequence `%s` of device `%s` cannot '
+                'be streamed into an external data file of type `%s`.  '
+                'Please choose `npy` or `asc`.'
+                % (self.name, objecttools.devicename(self),
+                   self.filetype_ext))
+        self.deactivate_disk()
+        self.deactivate_ram()
+        self.ramflag = True
+        self._window = window
+        self._stream = True
+        self.set_window(pub.timegrids.init[pub.timegrids.sim.firstdate],
+                        numpy.zeros((window,)+self.recordshape))
+        self.update_fastaccess()
+
+    def _checkwindow(self, window):
+        window = int(window)
+        if window < 1:
+            raise ValueError(
+                'The window size for handling the series of sequence `%s` '
+                'of device `%s` must be a positive number of time steps, '
+                'but `%d` is given.'
+                % (self.name, objecttools.devicename(self), window))
+        return window
+
     def disk2ram(self):
         """Move internal data from disk to RAM."""
         values = self.series
@@ -1118,7 +1515,9 @@ class IOSequence(Sequence):
         self.update_fastaccess()
 
     def ram2disk(self):
-        """Move internal data from RAM to disk."""
+        """Move internal data from RAM to disk (and thereby deactivate
+        the ensemble, see method :func:`~IOSequence.deactivate_ensemble`)."""
+        self.deactivate_ensemble()
         values = self.series
         self.deactivate_ram()
         self.diskflag = True
@@ -1134,6 +1533,195 @@ class IOSequence(Sequence):
 
 class ModelIOSequence(IOSequence):
 
+    def connect(self, subseqs):
+        super(ModelIOSequence, self).connect(subseqs)
+        self._connect_subattr('single', bool(pub.options.singleprecision))
+        self._connect_subattr('aggfactor', 1)
+        self._connect_subattr('aggmode', 0)
+        if self.NDIM == 1:
+            self._connect_subattr('weighted', False)
+            self._connect_subattr('weights', None)
+
+    def update_fastaccess(self):
+        super(ModelIOSequence, self).update_fastaccess()
+        if self.NDIM == 1:
+            weights = self._weights
+            if (weights is not None) and (weights.shape[1] != self.shape[0]):
+                self._weights, self._reduced = None, False
+                weights = None
+            self._connect_subattr('weighted', weights is not None)
+            self._connect_subattr('weights', weights)
+            if weights is None:
+                self._connect_subattr('reclength', self.shape[0])
+            else:
+                self._connect_subattr('reclength', len(weights))
+
+    def _getsingleflag(self):
+        """Store the internal time series in single instead of double
+        precision?
+
+        Single precision halves the memory and disk requirements of the
+        internal time series.  Only the stored values are affected; all
+        model calculations are still performed in double precision.
+        The default is given by option `singleprecision` of module
+        :mod:`~hydpy.core.optiontools`.  Changing the flag converts
+        already available series data.
+        """
+        return bool(getattr(self.fastaccess, '_%s_single' % self.name))
+
+    def _setsingleflag(self, value):
+        value = bool(value)
+        if value == self.singleflag:
+            return
+        series = self.series if self.memoryflag else None
+        if self.ramflag:
+            setattr(self.fastaccess, self._arrayname, None)
+        self._connect_subattr('single', value)
+        if self.diskflag:
+            self._save_int(series)
+        elif self.ramflag:
+            self._setarray(series)
+
+    singleflag = property(_getsingleflag, _setsingleflag)
+
+    def activate_aggregation(self, mode, stepsize):
+        """Demand aggregating the internal data to the given step size
+        during simulation runs, instead of storing the values of each
+        simulation step.
+
+        Argument `mode` must be one of the :const:`AGGREGATIONMODES`.
+        Argument `stepsize` must be a multiple of the simulation step
+        size and the initialization period must be a multiple of it.
+        Each simulation step updates the value of its aggregation
+        interval incrementally, so the internal data requires only a
+        fraction of the memory or disk space.  Method
+        :func:`~IOSequence.save_ext` writes the aggregated series together
+        with its coarser time grid (see property
+        :attr:`~IOSequence.seriestimegrid`).  Note that the values of
+        intervals only partly covered by a simulation period are
+        incomplete.
+
+        Already available internal data is reset to zero.  Input
+        sequences cannot be aggregated.
+        """
+        if isinstance(self, InputSequence):
+            raise RuntimeError(
+                'The internal data of input sequence `%s` of device `%s` '
+                'cannot be aggregated.'
+                % (self.name, objecttools.devicename(self)))
+        if self.stream:
+            raise RuntimeError(
+                'The internal data of sequence `%s` of device `%s` is '
+                'streamed into its external data file and thus cannot be '
+                'aggregated.' % (self.name, objecttools.devicename(self)))
+        if mode not in AGGREGATIONMODES:
+            raise ValueError(
+                'The given aggregation mode `%s` is not available.  Please '
+                'choose one of the following: %s.'
+                % (mode, ', '.join(AGGREGATIONMODES)))
+        stepsize = timetools.Period(stepsize)
+        init = pub.timegrids.init
+        factor = stepsize/init.stepsize
+        try:
+            if (factor < 1.) or (factor % 1.):
+                raise ValueError(
+                    'The aggregation step size `%s` is not a multiple of '
+                    'the simulation step size `%s`.'
+                    % (stepsize, init.stepsize))
+            timetools.Timegrid(init.firstdate, init.lastdate, stepsize)
+        except BaseException:
+            objecttools.augmentexcmessage(
+                'While trying to activate the aggregation of the internal '
+                'data of sequence `%s` of device `%s`'
+                % (self.name, objecttools.devicename(self)))
+        self._aggregation = (mode, stepsize)
+        self._connect_subattr('aggfactor', int(factor))
+        self._connect_subattr('aggmode', AGGREGATIONMODES.index(mode))
+        self._reset_series()
+
+    def deactivate_aggregation(self):
+        """Demand storing the values of each simulation step again.
+
+        Already available internal data is reset to zero."""
+        if self._aggregation is not None:
+            self._aggregation = None
+            self._connect_subattr('aggfactor', 1)
+            self._connect_subattr('aggmode', 0)
+            self._reset_series()
+
+    def activate_recording(self, indices=None, weights=None):
+        """Demand recording only the values of the given indices or
+        weighted sums of all values during simulation runs, instead of
+        all values of a 1-dimensional sequence.
+
+        Pass either the indices of the entries to be recorded or their
+        weights.  A 1-dimensional weight vector results in recording
+        the weighted sum only, so that the internal data is
+        1-dimensional (time).  A 2-dimensional weight matrix results
+        in recording one weighted sum for each of its rows.  A typical
+        example is weighting the zone values of a model by their
+        relative areas, to record subbasin averages only.  The reduction
+        takes place within method
+        :func:`~FastAccess.savedata`, so only the reduced series
+        is held in memory or on disk (see property
+        :attr:`~IOSequence.recordshape`).
+
+        Already available internal data is reset to zero.  Changing the
+        shape of the sequence deactivates the recording.  Input sequences
+        cannot be recorded selectively.
+        """
+        if isinstance(self, InputSequence) or (self.NDIM != 1):
+            raise RuntimeError(
+                'Sequence `%s` of device `%s` is not a 1-dimensional flux '
+                'or state sequence, so its values cannot be recorded '
+                'selectively.' % (self.name, objecttools.devicename(self)))
+        if (indices is None) == (weights is None):
+            raise ValueError(
+                'For recording the values of sequence `%s` of device `%s` '
+                'selectively, pass either their indices or their weights.'
+                % (self.name, objecttools.devicename(self)))
+        length = self.shape[0]
+        try:
+            if indices is None:
+                weights = numpy.array(weights, dtype=float)
+                if (weights.ndim not in (1, 2)) or \
+                        (weights.shape[-1] != length):
+                    raise ValueError(
+                        'The shape of the given weights is `%s`, but a '
+                        'vector of length %d or a matrix with %d columns is '
+                        'required.' % (objecttools.repr_tuple(weights.shape),
+                                       length, length))
+                reduced = weights.ndim == 1
+                weights = numpy.atleast_2d(weights)
+            else:
+                weights = numpy.eye(length)[numpy.array(indices, dtype=int)]
+                reduced = False
+                if weights.ndim != 2:
+                    raise ValueError(
+                        'The indices must be given as a list of integers.')
+        except BaseException:
+            objecttools.augmentexcmessage(
+                'While trying to activate the selective recording of '
+                'sequence `%s` of device `%s`'
+                % (self.name, objecttools.devicename(self)))
+        self._weights, self._reduced = weights, reduced
+        self.update_fastaccess()
+        self._reset_series()
+
+    def deactivate_recording(self):
+        """Demand recording all values again.
+
+        Already available internal data is reset to zero."""
+        if self._weights is not None:
+            self._weights, self._reduced = None, False
+            self.update_fastaccess()
+            self._reset_series()
+
+    def _reset_series(self):
+        if self.memoryflag:
+            self.zero_int()
+            self.update_fastaccess()
+
     def _getrawfilename(self):
         """Filename without ending for external and internal date files."""
         if self._rawfilename:
@@ -1160,10 +1748,67 @@ class ModelIOSequence(IOSequence):
 
     rawfilename = property(_getrawfilename, _setrawfilename, _delrawfilename)
 
+    @property
+    def storename(self):
+        """Filename without ending of the consolidated series file shared
+        by the sequences of the same type of all elements."""
+        return '%s_%s' % (objecttools.classname(self.subseqs)[:-9].lower(),
+                          self.name)
+
 
 class InputSequence(ModelIOSequence):
     """ """
 
+    @property
+    def sharekey(self):
+        """Key for sharing the internal data with other input sequences
+        loading the same external data file (see function
+        :func:`~hydpy.core.seriestools.getshared`)."""
+        return (os.path.abspath(self.filepath_ext), self.filetype_ext,
+                repr(pub.timegrids.init), numpy.dtype(self._dtype).str,
+                self.shape)
+
+    @property
+    def shared(self):
+        """`True`, if the internal data is shared with other input
+        sequences.
+
+        Within a :class:`~hydpy.core.seriestools.Cache` context (as
+        applied by method
+        :func:`~hydpy.core.hydpytools.HydPy.prepare_inputseries` and
+        function :func:`~hydpy.core.seriestools.load`), input
+        sequences handled in RAM and loading the same external data file
+        share a single internal data array, so that each file is read
+        and stored only once.  Property :attr:`~IOSequence.series` then
+        returns read-only views of this array.  Setting new series
+        values replaces the shared array with a private one.
+        """
+        return self._shared
+
+    def load_ext(self):
+        if not self._loadshared():
+            super(InputSequence, self).load_ext()
+
+    def apply_ext(self, timegrid_data, values):
+        if self._loadshared():
+            return
+        if not self.ramflag:
+            super(InputSequence, self).apply_ext(timegrid_data, values)
+            return
+        values = numpy.array(self._adjust_ext(timegrid_data, values),
+                             dtype=self._dtype)
+        setattr(self.fastaccess, self._arrayname, values)
+        self._shared = seriestools.register(self.sharekey, values)
+
+    def _loadshared(self):
+        if self.ramflag:
+            values = seriestools.getshared(self.sharekey)
+            if values is not None:
+                setattr(self.fastaccess, self._arrayname, values)
+                self._shared = True
+                return True
+        return False
+
 
 class FluxSequence(ModelIOSequence):
     """ """
@@ -1449,6 +2094,13 @@ class NodeSequence(IOSequence):
 
     rawfilename = property(_getrawfilename, _setrawfilename, _delrawfilename)
 
+    @property
+    def storename(self):
+        """Filename without ending of the consolidated series file shared
+        by the sequences of the same type of all nodes handling the same
+        variable."""
+        return '%s_%s' % (self.name, self.subseqs.node.variable.lower())
+
     def _initvalues(self):
         setattr(self.fastaccess, self.name, pointerutils.Double(0.))
 
@@ -1574,7 +2226,43 @@ class FastAccess(object):
       * _seq1_ramflag (:class:`bool`): Handle internal data in RAM?
       * _seq1_diskflag (:class:`bool`): Handle internal data on disk?
       * _seq1_path (:class:`str`): Path of the internal data file.
-      * _seq1_file (:class:`file`): Object handling the internal data file.
+      * _seq1_array (:class:`~numpy.ndarray`): The internal data series,
+        either held in RAM or mapped into memory from the internal data
+        file (see :class:`~numpy.memmap`), or a buffer for a block of
+        time steps of the internal data file.
+      * _seq1_single (:class:`bool`): Handle internal data in single
+        precision?  (Model sequences only.)
+      * _seq1_array32 (:class:`~numpy.ndarray`): Replaces `_seq1_array`
+        when `_seq1_single` is `True`.
+      * _seq1_file (:class:`file`): Object handling the internal data
+        file in block mode (otherwise `None`).
+      * _seq1_offset (:class:`int`): Index of the first buffered time step
+        or of the first time step of the window of a lazily loaded or
+        streamed series held in RAM (otherwise zero).
+      * _seq1_nmb (:class:`int`): Number of buffered time steps.
+      * _seq1_dirty (:class:`bool`): Buffer not written to disk yet?
+      * _seq1_aggfactor (:class:`int`): Number of simulation time steps
+        aggregated to a single time step of the internal data (model
+        sequences only).
+      * _seq1_aggmode (:class:`int`): Index of the aggregation mode (see
+        :const:`AGGREGATIONMODES`).
+      * _seq1_ensembleflag (:class:`bool`): Handle the internal data of
+        ensemble members?
+      * _seq1_ensemble (:class:`~numpy.ndarray`): The internal data series
+        of all ensemble members, replacing `_seq1_array` when
+        `_seq1_ensembleflag` is `True`.
+
+    Additionally, the attribute `_member` (:class:`int`) selects the
+    ensemble member whose series are read and written.
+
+    1-dimensional model sequences additionally define:
+
+      * _seq1_reclength (:class:`int`): Number of recorded values per
+        time step.
+      * _seq1_weighted (:class:`bool`): Record weighted sums of the
+        sequence values instead of the values themselves?
+      * _seq1_weights (:class:`~numpy.ndarray`): Weights of all sequence
+        values for each recorded value.
 
     Note that all these dynamical attributes and the following methods are
     initialised, changed or applied by the respective :class:`SubSequences`
@@ -1582,84 +2270,169 @@ class FastAccess(object):
     and thus not recommended.
     """
 
-    def openfiles(self, idx):
-        """Open all files with an activated disk flag."""
+    _member = 0
+
+    def openfiles(self, idx, blocksize=0):
+        """Prepare the internal data files of all sequences with an
+        activated disk flag.
+
+        If `blocksize` is zero, the complete files are mapped into memory
+        (see :class:`~numpy.memmap`).  The mapped arrays replace the RAM
+        arrays, so that method :func:`~FastAccess.loaddata` and
+        :func:`~FastAccess.savedata` handle both cases the same way.
+        Otherwise, the files are opened and buffer arrays for `blocksize`
+        time steps are prepared, which are read and written in bulk (see
+        method :func:`~FastAccess.loadvalues` and
+        :func:`~FastAccess.savevalues`).  Argument `idx` defines the
+        first time step to be buffered.
+        """
         for name in self:
             if getattr(self, '_%s_diskflag' % name):
+                shape = []
+                for idim in range(getattr(self, '_%s_ndim' % name)):
+                    shape.append(getattr(self, '_%s_length_%d' % (name, idim)))
+                if len(shape) == 1:
+                    shape[0] = getattr(self, '_%s_reclength' % name, shape[0])
                 path = getattr(self, '_%s_path' % name)
-                file_ = open(path, 'rb+')
-                ndim = getattr(self, '_%s_ndim' % name)
-                position = 8*idx
-                for idim in range(ndim):
-                    length = getattr(self, '_%s_length_%d' % (name, idim))
-                    position *= length
-                file_.seek(position)
-                setattr(self, '_%s_file' % name, file_)
+                dtype = self._dtype(name)
+                if blocksize:
+                    array = numpy.zeros([blocksize]+shape, dtype=dtype)
+                    setattr(self, '_%s_file' % name, open(path, 'rb+'))
+                    factor = getattr(self, '_%s_aggfactor' % name, 1)
+                    setattr(self, '_%s_offset' % name, idx//max(factor, 1))
+                    setattr(self, '_%s_nmb' % name, 0)
+                    setattr(self, '_%s_dirty' % name, False)
+                else:
+                    array = numpy.memmap(path, dtype=dtype, mode='r+')
+                    array = array.reshape([-1]+shape)
+                    setattr(self, '_%s_offset' % name, 0)
+                setattr(self, self._arrayname(name), array)
 
     def closefiles(self):
-        """Close all files with an activated disk flag."""
+        """Release all memory mapped internal data files or write the
+        remaining buffered values to and close all opened internal data
+        files."""
         for name in self:
             if getattr(self, '_%s_diskflag' % name):
                 file_ = getattr(self, '_%s_file' % name)
-                file_.close()
+                if file_ is not None:
+                    self._flushblock(name)
+                    file_.close()
+                    setattr(self, '_%s_file' % name, None)
+                setattr(self, self._arrayname(name), None)
 
     def loaddata(self, idx):
-        """Load the internal data of all sequences.  Load from file if the
-        corresponding disk flag is activated, otherwise load from RAM."""
+        """Load the internal data of all sequences with an activated flag
+        (see method :func:`~FastAccess.loadvalues`)."""
         for name in self:
-            ndim = getattr(self, '_%s_ndim' % name)
-            diskflag = getattr(self, '_%s_diskflag' % name)
-            ramflag = getattr(self, '_%s_ramflag' % name)
-            if diskflag:
-                file_ = getattr(self, '_%s_file' % name)
-                length_tot = 1
-                shape = []
-                for idx in range(ndim):
-                    length = getattr(self, '_%s_length_%s' % (name, idx))
-                    length_tot *= length
-                    shape.append(length)
-                raw = file_.read(length_tot*8)
-                values = struct.unpack(length_tot*'d', raw)
-                if ndim:
-                    values = numpy.array(values).reshape(shape)
-                else:
-                    values = values[0]
-            elif ramflag:
-                array = getattr(self, '_%s_array' % name)
-                values = array[idx]
-            if (diskflag or ramflag):
-                if ndim == 0:
+            if (getattr(self, '_%s_diskflag' % name) or
+                    getattr(self, '_%s_ramflag' % name)):
+                values = self.loadvalues(name, idx)
+                if getattr(self, '_%s_ndim' % name) == 0:
                     setattr(self, name, values)
                 else:
                     getattr(self, name)[:] = values
 
     def savedata(self, idx):
-        """Save the internal data of all sequences with an activated flag.
-        Write to file if the corresponding disk flag is activated; store
-        in working memory if the corresponding ram flag is activated."""
+        """Save the internal data of all sequences with an activated flag
+        (see method :func:`~FastAccess.savevalues`)."""
         for name in self:
-            actual = getattr(self, name)
-            diskflag = getattr(self, '_%s_diskflag' % name)
-            ramflag = getattr(self, '_%s_ramflag' % name)
-            if diskflag:
-                file_ = getattr(self, '_%s_file' % name)
-                ndim = getattr(self, '_%s_ndim' % name)
-                length_tot = 1
-                for idx in range(ndim):
-                    length = getattr(self, '_%s_length_%s' % (name, idx))
-                    length_tot *= length
-                if ndim:
-                    raw = struct.pack(length_tot*'d', *actual.flatten())
-                else:
-                    raw = struct.pack('d', actual)
-                file_.write(raw)
-            elif ramflag:
-                array = getattr(self, '_%s_array' % name)
-                array[idx] = actual
+            if (getattr(self, '_%s_diskflag' % name) or
+                    getattr(self, '_%s_ramflag' % name)):
+                self.savevalues(name, idx, getattr(self, name))
+
+    def loadvalues(self, name, idx):
+        """Return the internal data of the given sequence and time step,
+        taken from the RAM array, the memory mapped internal data file, or
+        the buffer array.  If the buffer array does not contain the
+        requested time step, the next block is read from the internal
+        data file.  RAM arrays of lazily loaded series only cover a
+        window of the initialization period starting at time step
+        `_seq1_offset`.  Series of ensemble members are taken from
+        the member selected by `_member`."""
+        if getattr(self, '_%s_ensembleflag' % name, False):
+            return getattr(self, '_%s_ensemble' % name)[self._member, idx]
+        array = getattr(self, self._arrayname(name))
+        jdx = idx-getattr(self, '_%s_offset' % name, 0)
+        if getattr(self, '_%s_file' % name, None) is None:
+            return array[jdx]
+        if not 0 <= jdx < getattr(self, '_%s_nmb' % name):
+            self._loadblock(name, idx)
+            jdx = 0
+        return array[jdx]
+
+    def savevalues(self, name, idx, values):
+        """Store the given values of the given sequence and time step in
+        the RAM array, the memory mapped internal data file, or the buffer
+        array.  If the buffer array is full, its content is written to
+        the internal data file first.  For aggregated series, the given
+        values are combined with the already stored values of the same
+        aggregation interval (see method
+        :func:`~ModelIOSequence.activate_aggregation`).  For weighted
+        recordings, the weighted sums of the given values are stored
+        instead (see method :func:`~ModelIOSequence.activate_recording`).
+        Series of ensemble members are written into the member selected
+        by `_member`."""
+        if getattr(self, '_%s_weighted' % name, False):
+            values = numpy.dot(getattr(self, '_%s_weights' % name), values)
+        factor = getattr(self, '_%s_aggfactor' % name, 1)
+        if factor > 1:
+            idx, rdx = divmod(idx, factor)
+        else:
+            rdx = 0
+        if getattr(self, '_%s_ensembleflag' % name, False):
+            array = getattr(self, '_%s_ensemble' % name)[self._member]
+            jdx = idx
+        else:
+            array = getattr(self, self._arrayname(name))
+            jdx = idx-getattr(self, '_%s_offset' % name, 0)
+        if getattr(self, '_%s_file' % name, None) is not None:
+            if not 0 <= jdx < len(array):
+                self._flushblock(name)
+                setattr(self, '_%s_offset' % name, idx)
+                setattr(self, '_%s_nmb' % name, 0)
+                jdx = 0
+            setattr(self, '_%s_nmb' % name,
+                    max(getattr(self, '_%s_nmb' % name), jdx+1))
+            setattr(self, '_%s_dirty' % name, True)
+        mode = getattr(self, '_%s_aggmode' % name, 0)
+        if rdx and mode:
+            values = _AGGREGATORS[mode](array[jdx], values, rdx)
+        array[jdx] = values
+
+    def _loadblock(self, name, idx):
+        self._flushblock(name)
+        array = getattr(self, self._arrayname(name))
+        file_ = getattr(self, '_%s_file' % name)
+        length = array[0].size
+        file_.seek(array.itemsize*length*idx)
+        values = numpy.fromfile(file_, dtype=array.dtype, count=array.size)
+        nmb = len(values)//length
+        array[:nmb] = values[:nmb*length].reshape(array[:nmb].shape)
+        setattr(self, '_%s_offset' % name, idx)
+        setattr(self, '_%s_nmb' % name, nmb)
+
+    def _flushblock(self, name):
+        if getattr(self, '_%s_dirty' % name):
+            array = getattr(self, self._arrayname(name))
+            file_ = getattr(self, '_%s_file' % name)
+            file_.seek(array[0].nbytes*getattr(self, '_%s_offset' % name))
+            file_.write(array[:getattr(self, '_%s_nmb' % name)].tobytes())
+            setattr(self, '_%s_dirty' % name, False)
+
+    def _arrayname(self, name):
+        if getattr(self, '_%s_single' % name, False):
+            return '_%s_array32' % name
+        return '_%s_array' % name
+
+    def _dtype(self, name):
+        if getattr(self, '_%s_single' % name, False):
+            return numpy.float32
+        return float
 
     def __iter__(self):
         """Iterate over all sequence names."""
-        for key in vars(self).keys():
+        for key in list(vars(self).keys()):
             if not key.startswith('_'):
                 yield key
 
@@ -0,0 +1,1487 @@
+# -*- coding: utf-8 -*-
+"""This module implements a consolidated file format for the external
+time series of many devices.
+
+Instead of writing one file per sequence and device, class
+:class:`SeriesFile` handles a single binary file for each type of
+sequence (e.g. all input sequences `p` of all elements).  The file starts
+with a short header, defining the covered time grid, the names of the
+devices, and the shapes of their sequences, followed by a single array
+with the time as its first and the devices as its second axis.  Hence,
+the values of all devices for a specific time window are stored
+contiguously and can be read at once, without reading the whole file.
+
+Sequences with different shapes (e.g. zone sequences of elements with
+different numbers of zones) are stored in an array of the largest
+shape, with unused entries being `nan`.
+
+Module :mod:`~hydpy.core.sequencetools` applies the features of this
+module when the external file type of a sequence is `store` (see class
+:class:`~hydpy.core.filetools.SequenceManager`).  To avoid reading the
+header and the data of the same file repeatedly, class :class:`Cache`
+allows to keep the relevant time window of each file in memory as long
+as a bulk operation is in progress.  Additionally, input sequences
+loading the same external data file within a :class:`Cache` context
+share a single array of internal data (see function :func:`getshared`).
+
+Additionally, function :func:`load` allows to read the external data
+files of many sequences concurrently, and class :class:`WindowLoader`
+allows to load the external data of long simulation periods window by
+window in the background, while a simulation is running.
+
+Class :class:`ChunkedFile` implements a compressed file format for the
+series of single sequences.  Its chunks, each one covering a number of
+consecutive time steps, can be decompressed independently, so that reading
+a time window does not require decompressing the whole file.
+
+Function :func:`load_asc` reads the ASCII files written by method
+:func:`~hydpy.core.sequencetools.IOSequence.save_ext`.  It parses the
+time grid header without calling :func:`eval` and the data block by
+block (see function :func:`parse_asc`).  Additionally, it stores the parsed
+data in binary sidecar files, kept in the subdirectory
+:const:`ASCCACHEDIRECTORY` of the directory of the respective ASCII
+file, if option `asccache` is enabled.  Later calls read the sidecar
+file instead of parsing the ASCII file again, as long as the size and
+the modification time of the ASCII file did not change.  Functions
+:func:`warm_asccache` and :func:`clear_asccache` allow to prepare and
+remove sidecar files in advance.
+"""
+# import...
+# ...from standard library
+from __future__ import division, print_function
+import collections
+import json
+import multiprocessing
+import multiprocessing.pool
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import warnings
+import zlib
+try:
+    import lzma
+except ImportError:
+    lzma = None
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy import pub
+from hydpy.core import autodoctools
+from hydpy.core import objecttools
+from hydpy.core import timetools
+
+MAGIC = b'HYDPYSTR'
+"""Identifier of consolidated series files."""
+ALIGNMENT = 64
+"""The data of consolidated series files starts at multiples of this
+number of bytes."""
+CHUNKMAGIC = b'HYDPYCNK'
+"""Identifier of chunked series files."""
+CODECS = ('zlib', 'lzma') if lzma is not None else ('zlib',)
+"""Names of the available codecs for compressing chunked series files."""
+ASCCACHEDIRECTORY = '_asccache'
+"""Name of the subdirectories containing the sidecar files of ASCII
+series files."""
+ASCBLOCKSIZE = 2**20
+"""Number of characters of ASCII series files parsed at once."""
+
+_CACHE = None
+_SHARED = None
+_LOADED = {}
+
+
+class SeriesFile(object):
+    """Consolidated file containing the series of a single sequence type
+    for many devices.
+
+    We write the time series of three devices for a period of five days
+    to a temporary file.  The series of device `b` is shorter than the
+    ones of the other devices:
+
+    >>> import os, tempfile
+    >>> filepath = os.path.join(tempfile.mkdtemp(), 'flux_q.store')
+    >>> from hydpy import Timegrid
+    >>> timegrid = Timegrid('01.01.2000', '06.01.2000', '1d')
+    >>> import numpy
+    >>> from hydpy.core.seriestools import SeriesFile
+    >>> SeriesFile.write(filepath, timegrid, ['a', 'b', 'c'],
+    ...                  [numpy.arange(10.).reshape(5, 2),
+    ...                   numpy.ones((5, 1)),
+    ...                   numpy.zeros((5, 2))])
+
+    Initialising a :class:`SeriesFile` object reads the header only:
+
+    >>> seriesfile = SeriesFile(filepath)
+    >>> seriesfile.timegrid
+    Timegrid('2000.01.01 00:00:00',
+             '2000.01.06 00:00:00',
+             '1d')
+    >>> seriesfile.names
+    ('a', 'b', 'c')
+    >>> seriesfile.shapes
+    ((2,), (1,), (2,))
+
+    Method :func:`~SeriesFile.read` returns the time grid and the series
+    of the requested device.  If another time grid is given, only the
+    corresponding time window is read from disk:
+
+    >>> tg, values = seriesfile.read('a')
+    >>> tg == timegrid
+    True
+    >>> values[:, 1]
+    array([ 1.,  3.,  5.,  7.,  9.])
+    >>> tg, values = seriesfile.read(
+    ...     'b', Timegrid('02.01.2000', '04.01.2000', '1d'))
+    >>> tg
+    Timegrid('2000.01.02 00:00:00',
+             '2000.01.04 00:00:00',
+             '1d')
+    >>> values
+    array([[ 1.],
+           [ 1.]])
+
+    Time grids not lying completely within the stored time grid result in
+    the complete series, to be adjusted by the calling sequence object:
+
+    >>> tg, values = seriesfile.read(
+    ...     'c', Timegrid('02.01.2000', '08.01.2000', '1d'))
+    >>> tg == timegrid
+    True
+
+    Method :func:`~SeriesFile.update` changes the values of a single
+    device or adds a new device:
+
+    >>> seriesfile.update('b', numpy.full((5, 1), 2.))
+    >>> seriesfile.update('d', numpy.full((5, 3), 3.))
+    >>> seriesfile = SeriesFile(filepath)
+    >>> seriesfile.names
+    ('a', 'b', 'c', 'd')
+    >>> seriesfile.read('b')[1][0], seriesfile.read('d')[1][0]
+    (array([ 2.]), array([ 3.,  3.,  3.]))
+    >>> seriesfile.read('a')[1][0]
+    array([ 0.,  1.])
+
+    Requesting an unknown device results in the following error:
+
+    >>> try:
+    ...     seriesfile.read('e')
+    ... except IOError as exc:
+    ...     print(exc)
+    The consolidated series file `...flux_q.store` does not contain a \
+series for device `e`.
+
+    >>> import shutil
+    >>> shutil.rmtree(os.path.dirname(filepath))
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, 'rb') as file_:
+            magic = file_.read(len(MAGIC))
+            if magic != MAGIC:
+                raise IOError(
+                    'File `%s` is not a consolidated series file.'
+                    % filepath)
+            length = struct.unpack('<Q', file_.read(8))[0]
+            header = json.loads(file_.read(length).decode('utf-8'))
+        self.timegrid = timetools.Timegrid.fromarray(
+            numpy.array(header['timegrid']))
+        self.names = tuple(header['names'])
+        self.shapes = tuple(tuple(shape) for shape in header['shapes'])
+        self.shape = tuple(header['shape'])
+        self.offset = _dataoffset(length)
+        self._indices = dict((name, idx) for (idx, name)
+                             in enumerate(self.names))
+        self._window = None
+
+    @classmethod
+    def write(cls, filepath, timegrid, names, series):
+        """Write the given series of the devices with the given names
+        into a new consolidated file."""
+        series = [numpy.asarray(values, dtype=float) for values in series]
+        nmb_steps = len(timegrid)
+        for (name, values) in zip(names, series):
+            if len(values) != nmb_steps:
+                raise ValueError(
+                    'The series of device `%s` contains %d values, but the '
+                    'time grid `%s` requires %d values.'
+                    % (name, len(values), timegrid, nmb_steps))
+        shapes = [values.shape[1:] for values in series]
+        maxshape = [max(lengths) for lengths in zip(*shapes)]
+        shape = [nmb_steps, len(series)] + maxshape
+        array = numpy.full(shape, numpy.nan)
+        for (idx, values) in enumerate(series):
+            array[(slice(None), idx) + _slices(values.shape[1:])] = values
+        header = json.dumps(
+            {'timegrid': list(timegrid.toarray()),
+             'names': list(names),
+             'shapes': [list(shape_) for shape_ in shapes],
+             'shape': shape}).encode('utf-8')
+        with open(filepath, 'wb') as file_:
+            file_.write(MAGIC)
+            file_.write(struct.pack('<Q', len(header)))
+            file_.write(header)
+            file_.write(b' '*(_dataoffset(len(header))-file_.tell()))
+            file_.write(array.astype('<f8').tobytes())
+
+    def _memmap(self, mode='r'):
+        return numpy.memmap(self.filepath, dtype='<f8', mode=mode,
+                            offset=self.offset, shape=self.shape)
+
+    def read(self, name, timegrid=None):
+        """Return the time grid and the values of the series of the given
+        device, restricted to the given time grid if possible.
+
+        If the :class:`SeriesFile` object is used within a :class:`Cache`
+        context, the whole time window of all devices is read once and
+        kept in memory, otherwise only the values of the requested
+        device are read.
+        """
+        idx = self._indices.get(name)
+        if idx is None:
+            raise IOError(
+                'The consolidated series file `%s` does not contain a '
+                'series for device `%s`.' % (self.filepath, name))
+        timegrid, slice_ = _slice(self.timegrid, timegrid)
+        if _CACHE is not None:
+            if (self._window is None) or (self._window[0] != slice_):
+                self._window = slice_, numpy.array(self._memmap()[slice_])
+            array = self._window[1]
+        else:
+            array = self._memmap()[slice_]
+        selection = (slice(None), idx) + _slices(self.shapes[idx])
+        return timegrid, numpy.array(array[selection], dtype=float)
+
+    def update(self, name, values):
+        """Write the given values of the given device into the file.
+
+        Values of known devices are overwritten in place if their shape
+        did not change.  Otherwise, the file is rewritten completely.
+        """
+        values = numpy.asarray(values, dtype=float)
+        if len(values) != self.shape[0]:
+            raise ValueError(
+                'The series of device `%s` contains %d values, but the '
+                'time grid `%s` of the consolidated series file `%s` '
+                'requires %d values.'
+                % (name, len(values), self.timegrid, self.filepath,
+                   self.shape[0]))
+        idx = self._indices.get(name)
+        if (idx is not None) and (values.shape[1:] == self.shapes[idx]):
+            array = self._memmap('r+')
+            array[(slice(None), idx) + _slices(self.shapes[idx])] = values
+            array.flush()
+            del array
+        else:
+            names = list(self.names)
+            series = [self.read(name_)[1] for name_ in names]
+            if idx is None:
+                names.append(name)
+                series.append(values)
+            else:
+                series[idx] = values
+            self.write(self.filepath, self.timegrid, names, series)
+            self.__init__(self.filepath)
+        self._window = None
+
+    def __dir__(self):
+        return objecttools.dir_(self)
+
+
+def _dataoffset(length):
+    offset = len(MAGIC)+8+length
+    return ALIGNMENT*((offset+ALIGNMENT-1)//ALIGNMENT)
+
+
+def _slice(stored, timegrid):
+    """Return the given time grid and the slice selecting its time steps
+    from the stored time grid or, if the given time grid is `None` or not
+    completely within the stored one, the stored time grid and a slice
+    selecting all its time steps."""
+    if (timegrid is None) or (timegrid not in stored):
+        return stored, slice(0, len(stored))
+    idx1 = stored[timegrid.firstdate]
+    idx2 = stored[timegrid.lastdate]
+    return (timetools.Timegrid(timegrid.firstdate, timegrid.lastdate,
+                               stored.stepsize),
+            slice(idx1, idx2))
+
+
+def _slices(shape):
+    return tuple(slice(0, length) for length in shape)
+
+
+class ChunkedFile(object):
+    """Compressed file containing the series of a single sequence of a
+    single device, split into chunks of consecutive time steps.
+
+    The file starts with a short header, defining the time grid, the
+    shape of the series, the applied codec, and the position of each
+    chunk.  Each chunk contains the values of
+    :attr:`~hydpy.core.optiontools.Options.chunksize` time steps,
+    compressed by a codec of the standard library (`zlib` or `lzma`,
+    see option :attr:`~hydpy.core.optiontools.Options.chunkcodec`).
+    Optionally, the bytes of the values are shuffled before compression
+    (see option :attr:`~hydpy.core.optiontools.Options.chunkshuffle`), so
+    that the (mostly similar) leading bytes of the values of smooth
+    series are stored contiguously.
+
+    We write a smooth series of a period of ten days to a temporary file,
+    using chunks of three time steps:
+
+    >>> import os, tempfile
+    >>> filepath = os.path.join(tempfile.mkdtemp(), 'sim_q.chunked')
+    >>> from hydpy import pub, Timegrid
+    >>> timegrid = Timegrid('01.01.2000', '11.01.2000', '1d')
+    >>> import numpy
+    >>> from hydpy.core.seriestools import ChunkedFile
+    >>> values = numpy.linspace(1., 2., 20).reshape(10, 2)
+    >>> with pub.options.chunksize(3):
+    ...     ChunkedFile.write(filepath, timegrid, values)
+
+    Initialising a :class:`ChunkedFile` object reads the header only:
+
+    >>> chunkedfile = ChunkedFile(filepath)
+    >>> chunkedfile.timegrid
+    Timegrid('2000.01.01 00:00:00',
+             '2000.01.11 00:00:00',
+             '1d')
+    >>> chunkedfile.shape
+    (10, 2)
+    >>> print(chunkedfile.codec, chunkedfile.shuffle, chunkedfile.chunksize)
+    zlib True 3
+    >>> len(chunkedfile.chunks)
+    4
+
+    Method :func:`~ChunkedFile.read` returns the time grid and the series.
+    If another time grid is given, only the chunks covering the
+    corresponding time window are decompressed:
+
+    >>> tg, series = chunkedfile.read()
+    >>> tg == timegrid
+    True
+    >>> numpy.array_equal(series, values)
+    True
+    >>> tg, series = chunkedfile.read(
+    ...     Timegrid('03.01.2000', '05.01.2000', '1d'))
+    >>> tg
+    Timegrid('2000.01.03 00:00:00',
+             '2000.01.05 00:00:00',
+             '1d')
+    >>> numpy.array_equal(series, values[2:4])
+    True
+    >>> chunkedfile.indices(Timegrid('03.01.2000', '05.01.2000', '1d'))
+    (0, 2)
+
+    Time grids not lying completely within the stored time grid result in
+    the complete series, to be adjusted by the calling sequence object:
+
+    >>> tg, series = chunkedfile.read(
+    ...     Timegrid('02.01.2000', '18.01.2000', '1d'))
+    >>> tg == timegrid
+    True
+
+    Tuple :const:`CODECS` lists all available codecs.  Codec `lzma` is
+    available if the standard library provides module :mod:`lzma`
+    (not the case for Python 2):
+
+    >>> results = set()
+    >>> for codec in CODECS:
+    ...     with pub.options.chunkcodec(codec):
+    ...         with pub.options.chunkshuffle(False):
+    ...             ChunkedFile.write(filepath, timegrid, values)
+    ...     chunkedfile = ChunkedFile(filepath)
+    ...     results.add((chunkedfile.codec == codec, chunkedfile.shuffle,
+    ...                  chunkedfile.chunksize,
+    ...                  numpy.array_equal(chunkedfile.read()[1], values)))
+    >>> results == {(True, False, 1024, True)}
+    True
+
+    Unknown codecs and wrong file formats result in the following errors:
+
+    >>> try:
+    ...     with pub.options.chunkcodec('bz2'):
+    ...         ChunkedFile.write(filepath, timegrid, values)
+    ... except ValueError as exc:
+    ...     print(exc)
+    The codec `bz2` for compressing chunked series files is not \
+available.  Please choose one of the following: zlib...
+    >>> with open(filepath, 'wb') as file_:
+    ...     _ = file_.write(b'no chunks')
+    >>> try:
+    ...     ChunkedFile(filepath)
+    ... except IOError as exc:
+    ...     print(exc)
+    File `...sim_q.chunked` is not a chunked series file.
+
+    >>> import shutil
+    >>> shutil.rmtree(os.path.dirname(filepath))
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, 'rb') as file_:
+            magic = file_.read(len(CHUNKMAGIC))
+            if magic != CHUNKMAGIC:
+                raise IOError(
+                    'File `%s` is not a chunked series file.' % filepath)
+            length = struct.unpack('<Q', file_.read(8))[0]
+            header = json.loads(file_.read(length).decode('utf-8'))
+        self.timegrid = timetools.Timegrid.fromarray(
+            numpy.array(header['timegrid']))
+        self.shape = tuple(header['shape'])
+        self.chunksize = header['chunksize']
+        self.codec = str(header['codec'])
+        self.shuffle = header['shuffle']
+        self.chunks = tuple(tuple(chunk) for chunk in header['chunks'])
+        self.offset = len(CHUNKMAGIC)+8+length
+
+    @classmethod
+    def write(cls, filepath, timegrid, values):
+        """Write the given series into a new chunked file, following
+        the options :attr:`~hydpy.core.optiontools.Options.chunksize`,
+        :attr:`~hydpy.core.optiontools.Options.chunkcodec`, and
+        :attr:`~hydpy.core.optiontools.Options.chunkshuffle`."""
+        values = numpy.asarray(values, dtype='<f8')
+        if len(values) != len(timegrid):
+            raise ValueError(
+                'The series contains %d values, but the time grid `%s` '
+                'requires %d values.'
+                % (len(values), timegrid, len(timegrid)))
+        chunksize = max(int(pub.options.chunksize), 1)
+        codec = str(pub.options.chunkcodec)
+        shuffle = bool(pub.options.chunkshuffle)
+        compress = _getcodec(codec)[0]
+        chunks, blobs, position = [], [], 0
+        for idx in range(0, len(values), chunksize):
+            data = numpy.ascontiguousarray(values[idx:idx+chunksize])
+            if shuffle:
+                data = data.view(numpy.uint8).reshape(-1, 8).T
+            blob = compress(data.tobytes())
+            chunks.append([position, len(blob)])
+            blobs.append(blob)
+            position += len(blob)
+        header = json.dumps(
+            {'timegrid': list(timegrid.toarray()),
+             'shape': list(values.shape),
+             'chunksize': chunksize,
+             'codec': codec,
+             'shuffle': shuffle,
+             'chunks': chunks}).encode('utf-8')
+        with open(filepath, 'wb') as file_:
+            file_.write(CHUNKMAGIC)
+            file_.write(struct.pack('<Q', len(header)))
+            file_.write(header)
+            for blob in blobs:
+                file_.write(blob)
+
+    def indices(self, timegrid=None):
+        """Return the indices of the first and the last chunk (excluded)
+        to be decompressed for reading the given time grid."""
+        slice_ = _slice(self.timegrid, timegrid)[1]
+        return (slice_.start//self.chunksize,
+                (slice_.stop+self.chunksize-1)//self.chunksize)
+
+    def read(self, timegrid=None):
+        """Return the time grid and the values of the series, restricted
+        to the given time grid if possible."""
+        timegrid, slice_ = _slice(self.timegrid, timegrid)
+        jdx0, jdx1 = self.indices(timegrid)
+        decompress = _getcodec(self.codec)[1]
+        arrays = []
+        with open(self.filepath, 'rb') as file_:
+            for (position, nbytes) in self.chunks[jdx0:jdx1]:
+                file_.seek(self.offset+position)
+                data = numpy.frombuffer(decompress(file_.read(nbytes)),
+                                        dtype=numpy.uint8)
+                if self.shuffle:
+                    data = numpy.ascontiguousarray(data.reshape(8, -1).T)
+                arrays.append(data.view('<f8').reshape(
+                    (-1,)+self.shape[1:]))
+        if arrays:
+            array = numpy.concatenate(arrays)
+        else:
+            array = numpy.zeros((0,)+self.shape[1:])
+        idx0 = slice_.start-jdx0*self.chunksize
+        idx1 = slice_.stop-jdx0*self.chunksize
+        return timegrid, numpy.array(array[idx0:idx1], dtype=float)
+
+    def __dir__(self):
+        return objecttools.dir_(self)
+
+
+def _getcodec(codec):
+    """Return the compression and the decompression function of the
+    given codec."""
+    if codec == 'zlib':
+        return zlib.compress, zlib.decompress
+    if (codec == 'lzma') and (lzma is not None):
+        return lzma.compress, lzma.decompress
+    raise ValueError(
+        'The codec `%s` for compressing chunked series files is not '
+        'available.  Please choose one of the following: %s.'
+        % (codec, ', '.join(CODECS)))
+
+
+class Cache(object):
+    """Context manager keeping all :class:`SeriesFile` objects requested
+    via function :func:`getfile` (and the time windows of their data)
+    in memory and registering the internal data shared by input sequences
+    (see function :func:`getshared`).
+
+    >>> from hydpy.core import seriestools
+    >>> with seriestools.Cache():
+    ...     print(seriestools._CACHE, seriestools._SHARED)
+    {} {}
+    >>> print(seriestools._CACHE, seriestools._SHARED)
+    None None
+
+    Nested contexts share the same cache.
+    """
+
+    def __init__(self):
+        self._outer = False
+
+    def __enter__(self):
+        global _CACHE, _SHARED
+        self._outer = _CACHE is None
+        if self._outer:
+            _CACHE = {}
+            _SHARED = {}
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        global _CACHE, _SHARED
+        if self._outer:
+            _CACHE = None
+            _SHARED = None
+
+
+def getfile(filepath):
+    """Return a :class:`SeriesFile` object for the given file path, taken
+    from the active :class:`Cache`, if possible."""
+    if _CACHE is None:
+        return SeriesFile(filepath)
+    filepath = os.path.abspath(filepath)
+    seriesfile = _CACHE.get(filepath)
+    if seriesfile is None:
+        seriesfile = SeriesFile(filepath)
+        _CACHE[filepath] = seriesfile
+    return seriesfile
+
+
+def getshared(key):
+    """Return the internal data registered under the given key via
+    function :func:`register` or `None`.
+
+    Method :func:`~hydpy.core.sequencetools.InputSequence.apply_ext`
+    registers the internal data of input sequences handled in RAM, using
+    the absolute path of the external data file, the initialization time
+    grid, the data type, and the shape of the sequence as the key
+    (see property :attr:`~hydpy.core.sequencetools.InputSequence.sharekey`).
+    Other input sequences loading the same file take the registered array
+    instead of reading and storing the file again.  The registry only
+    exists within a :class:`Cache` context:
+
+    >>> from hydpy.core import seriestools
+    >>> seriestools.register('key', [1.0, 2.0])
+    False
+    >>> print(seriestools.getshared('key'))
+    None
+    >>> with seriestools.Cache():
+    ...     seriestools.register('key', [1.0, 2.0])
+    ...     seriestools.getshared('key')
+    True
+    [1.0, 2.0]
+    """
+    if _SHARED is None:
+        return None
+    return _SHARED.get(key)
+
+
+def register(key, values):
+    """Register the given internal data under the given key and return
+    `True`, if a :class:`Cache` context is active (see function
+    :func:`getshared`)."""
+    if _SHARED is None:
+        return False
+    _SHARED[key] = values
+    return True
+
+
+def save(sequences, overwrite=True):
+    """Write the series of the given
+    :class:`~hydpy.core.sequencetools.IOSequence` objects, handled by
+    different devices, into consolidated series files.
+
+    Each sequence is written into the file defined by its attribute
+    :attr:`~hydpy.core.sequencetools.IOSequence.filepath_ext`, covering
+    the time grid of its internal data (see property
+    :attr:`~hydpy.core.sequencetools.IOSequence.seriestimegrid`).
+    Sequences sharing the same file are written at once, which requires
+    equal time grids.  Function :func:`save`
+    returns the paths of all files, which it did not write due to
+    `overwrite` being `False`.
+    """
+    groups = {}
+    for seq in sequences:
+        groups.setdefault(seq.filepath_ext, []).append(seq)
+    skipped = []
+    for (filepath, seqs) in sorted(groups.items()):
+        if os.path.exists(filepath) and not overwrite:
+            skipped.append(filepath)
+            continue
+        timegrid = seqs[0].seriestimegrid
+        for seq in seqs[1:]:
+            if seq.seriestimegrid != timegrid:
+                raise RuntimeError(
+                    'The series of the sequences written into the '
+                    'consolidated series file `%s` must share the same time '
+                    'grid, but the time grid of sequence `%s` of device '
+                    '`%s` (%s) differs from the first one (%s).'
+                    % (filepath, seq.name, objecttools.devicename(seq),
+                       seq.seriestimegrid, timegrid))
+        SeriesFile.write(
+            filepath, timegrid,
+            [objecttools.devicename(seq) for seq in seqs],
+            [seq.series for seq in seqs])
+        if _CACHE is not None:
+            _CACHE.pop(os.path.abspath(filepath), None)
+    return skipped
+
+
+def load(sequences, ramflag=True, nmb_workers=None):
+    """Load the external data of the given
+    :class:`~hydpy.core.sequencetools.IOSequence` objects and store it as
+    internal data, handled in RAM or on disk.
+
+    Function :func:`load` reads the external data files within a pool of
+    `nmb_workers` threads (by default, one thread per CPU).  Most of the
+    time required for reading and parsing the files is spent without
+    holding the global interpreter lock, so that the latencies of slow
+    file systems overlap.  As soon as a file is read, function
+    :func:`load` passes its data to all sequences loading this file, via
+    their methods :func:`~hydpy.core.sequencetools.IOSequence.activate_ram`
+    or :func:`~hydpy.core.sequencetools.IOSequence.activate_disk` (see
+    function :func:`getloaded`), and then releases it.  Hence, at most
+    one file per thread is held in memory besides the internal data, and
+    errors (e.g. due to missing files) are handled as when activating
+    the sequences one after another.  Consolidated series files are read
+    one after another at the end, as each of them is shared by many
+    sequences.  Each file is read only once, even if it is shared by many
+    sequences, and input sequences handled in RAM share their internal
+    data (see function :func:`getshared`).
+    """
+    groups = collections.OrderedDict()
+    for seq in sequences:
+        key = None if seq.filetype_ext == 'store' else _readkey(seq)
+        groups.setdefault(key, []).append(seq)
+    stores = groups.pop(None, [])
+    keys = collections.deque(groups.keys())
+    if nmb_workers is None:
+        nmb_workers = multiprocessing.cpu_count()
+    nmb_workers = max(min(nmb_workers, len(keys)), 1)
+    results = queue.Queue()
+    pool = multiprocessing.pool.ThreadPool(nmb_workers)
+
+    def submit():
+        if keys:
+            key = keys.popleft()
+            pool.apply_async(_read, (key, groups[key][0]),
+                             callback=results.put)
+
+    try:
+        with Cache():
+            for dummy in range(nmb_workers):
+                submit()
+            for dummy in range(len(groups)):
+                key, data = results.get()
+                submit()
+                _LOADED[key] = data
+                try:
+                    _activate(groups.pop(key), ramflag)
+                finally:
+                    del _LOADED[key]
+            _activate(stores, ramflag)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _read(key, seq):
+    try:
+        return key, seq.read_ext()
+    except BaseException:
+        return key, sys.exc_info()[1]
+
+
+def _activate(sequences, ramflag):
+    for seq in sequences:
+        if ramflag:
+            seq.activate_ram()
+        else:
+            seq.activate_disk()
+
+
+def getloaded(seq):
+    """Return the time grid and the values of the external data file of
+    the given :class:`~hydpy.core.sequencetools.IOSequence` object, if
+    function :func:`load` has already read it, otherwise `None`.
+
+    Errors raised while reading the file are raised again:
+
+    >>> from hydpy.core import seriestools
+    >>> class Sequence(object):
+    ...     filepath_ext, filetype_ext = 'test.asc', 'asc'
+    >>> print(seriestools.getloaded(Sequence()))
+    None
+    >>> key = seriestools._readkey(Sequence())
+    >>> seriestools._LOADED[key] = RuntimeError('file `test.asc` is bad')
+    >>> seriestools.getloaded(Sequence())
+    Traceback (most recent call last):
+    ...
+    RuntimeError: file `test.asc` is bad
+    >>> seriestools._LOADED[key] = ('timegrid', 'values')
+    >>> seriestools.getloaded(Sequence())
+    ('timegrid', 'values')
+    >>> del seriestools._LOADED[key]
+    """
+    if not _LOADED:
+        return None
+    data = _LOADED.get(_readkey(seq))
+    if isinstance(data, BaseException):
+        raise data
+    return data
+
+
+def _readkey(seq):
+    return os.path.abspath(seq.filepath_ext), seq.filetype_ext
+
+
+class WindowLoader(object):
+    """Iterable over the time step indices of a simulation run, loading
+    the external data of lazily loaded sequences and writing the data
+    of streamed sequences window by window.
+
+    Each sequence with a defined
+    :attr:`~hydpy.core.sequencetools.IOSequence.window` size (see the
+    methods :func:`~hydpy.core.sequencetools.IOSequence.activate_lazy`
+    and :func:`~hydpy.core.sequencetools.IOSequence.activate_stream`) is
+    handled, all other sequences are ignored.  The smallest window size
+    of all handled sequences applies.  While the time steps of one window
+    are simulated, a background thread reads the data of the next window
+    (see method :func:`~hydpy.core.sequencetools.IOSequence.read_window`).
+    The data is passed to the sequences in the main thread, when the
+    iteration reaches the next window.  Hence, at most two windows per
+    sequence are held in memory at once.  Streamed sequences receive an
+    empty array at the start of each window, which is passed to a
+    :class:`SeriesWriter` object at the end of each window.
+
+    We prepare two sequences (with lazy data loading activated for one
+    of them), which fake the relevant methods of class
+    :class:`~hydpy.core.sequencetools.IOSequence` by printing the windows
+    to be read and set:
+
+    >>> from hydpy.core.seriestools import WindowLoader
+    >>> class Sequence(object):
+    ...     def __init__(self, name, window):
+    ...         self.name, self.window = name, window
+    ...         self.stream = False
+    ...     def inwindow(self, idx0, idx1):
+    ...         return idx0 == 2
+    ...     def read_window(self, idx0, idx1):
+    ...         return list(range(idx0, idx1))
+    ...     def set_window(self, idx0, values):
+    ...         print('set', self.name, idx0, values)
+    >>> loader = WindowLoader(
+    ...     [Sequence('a', 3), Sequence('b', None)], 2, 9)
+
+    A :class:`WindowLoader` object supports the progress bar of module
+    :mod:`~hydpy.core.magictools`, as it knows its length:
+
+    >>> len(loader)
+    7
+
+    The first window is not read again, as it is already available:
+
+    >>> for idx in loader:
+    ...     print(idx)
+    2
+    3
+    4
+    set a 5 [5, 6, 7]
+    5
+    6
+    7
+    set a 8 [8]
+    8
+
+    Method :func:`~WindowLoader.windows` iterates over the first and the
+    last (excluded) index of each window:
+
+    >>> list(loader.windows())
+    set a 5 [5, 6, 7]
+    set a 8 [8]
+    [(2, 5), (5, 8), (8, 9)]
+
+    Without any lazily loaded or streamed sequence, there is only one
+    window covering the complete period:
+
+    >>> list(WindowLoader([Sequence('b', None)], 2, 9).windows())
+    [(2, 9)]
+
+    Argument `step` defines additional window boundaries, e.g. the
+    indices at which to write checkpoint files (see method
+    :func:`~hydpy.core.hydpytools.HydPy.checkpoint`):
+
+    >>> WindowLoader([Sequence('a', 3)], 2, 9, step=4).bounds
+    [(2, 5), (5, 6), (6, 8), (8, 9)]
+    >>> WindowLoader([Sequence('b', None)], 2, 9, step=4).bounds
+    [(2, 6), (6, 9)]
+
+    At the end of a window, method :func:`~WindowLoader.flush` writes
+    the data of the streamed sequences immediately, instead of when the
+    next window is requested.  Argument `keep` is passed to the
+    :class:`SeriesWriter` object (see the documentation on class
+    :class:`SeriesWriter`).
+    """
+
+    def __init__(self, sequences, idx_start, idx_end, step=None,
+                 keep=False):
+        sequences = [seq for seq in sequences if seq.window]
+        self.sequences = [seq for seq in sequences if not seq.stream]
+        self.streams = [seq for seq in sequences if seq.stream]
+        self.idx_start = idx_start
+        self.idx_end = idx_end
+        self.step = step
+        self.keep = keep
+        self._writer = None
+        self._idx_unwritten = None
+
+    @property
+    def bounds(self):
+        """Tuples containing the first and the last (excluded) index of
+        each window."""
+        if self.sequences or self.streams:
+            size = min(seq.window for seq in self.sequences + self.streams)
+        else:
+            size = max(self.idx_end-self.idx_start, 1)
+        indices = set(range(self.idx_start, self.idx_end, size))
+        if self.step:
+            indices.update(range(self.idx_start, self.idx_end, self.step))
+        indices = sorted(indices) + [self.idx_end]
+        return list(zip(indices[:-1], indices[1:]))
+
+    def windows(self):
+        """Load one window after another, yield its first and last
+        (excluded) index, and write the data of the streamed sequences
+        afterwards."""
+        bounds = self.bounds
+        pool, writer = None, None
+        try:
+            if self.sequences and bounds:
+                pool = multiprocessing.pool.ThreadPool(1)
+                sequences = [seq for seq in self.sequences
+                             if not seq.inwindow(*bounds[0])]
+                result = pool.apply_async(
+                    self._read, (sequences,) + bounds[0])
+            if self.streams and bounds:
+                writer = SeriesWriter(self.streams, self.idx_start,
+                                      self.idx_end, keep=self.keep)
+                self._writer = writer
+            for (jdx, (idx0, idx1)) in enumerate(bounds):
+                if pool is not None:
+                    data = result.get()
+                    if jdx+1 < len(bounds):
+                        result = pool.apply_async(
+                            self._read, (self.sequences,) + bounds[jdx+1])
+                    for (seq, values) in data:
+                        seq.set_window(idx0, values)
+                for seq in self.streams:
+                    seq.set_window(
+                        idx0, numpy.zeros((idx1-idx0,)+seq.recordshape))
+                self._idx_unwritten = idx0
+                yield idx0, idx1
+                self._write()
+            if writer is not None:
+                writer.close()
+                writer = None
+        finally:
+            self._writer = None
+            self._idx_unwritten = None
+            if pool is not None:
+                pool.close()
+                pool.join()
+            if writer is not None:
+                writer.abort()
+
+    def _write(self):
+        if (self._writer is not None) and (self._idx_unwritten is not None):
+            self._writer.write(self._idx_unwritten,
+                               [seq.series for seq in self.streams])
+        self._idx_unwritten = None
+
+    def flush(self):
+        """Write the data of the streamed sequences of the current window
+        and wait until the data of all windows is written."""
+        self._write()
+        if self._writer is not None:
+            self._writer.flush()
+
+    @staticmethod
+    def _read(sequences, idx0, idx1):
+        return [(seq, seq.read_window(idx0, idx1)) for seq in sequences]
+
+    def __iter__(self):
+        for (idx0, idx1) in self.windows():
+            for idx in range(idx0, idx1):
+                yield idx
+
+    def __len__(self):
+        return self.idx_end-self.idx_start
+
+    def __dir__(self):
+        return objecttools.dir_(self)
+
+
+class SeriesWriter(object):
+    """Write the series of the given
+    :class:`~hydpy.core.sequencetools.IOSequence` objects into their
+    external data files window by window, within a background thread.
+
+    Class :class:`SeriesWriter` supports the external file types `npy`
+    and `asc`.  The written files agree with those written by method
+    :func:`~hydpy.core.sequencetools.IOSequence.save_ext` and cover the
+    complete initialization time grid.  All values outside the period
+    between the given indices `idx_start` and `idx_end` are zero.  The
+    files are prepared immediately.  Method :func:`~SeriesWriter.write`
+    passes the values of a window to the background thread.  If more
+    than `maxsize` windows are waiting to be written, it blocks until
+    the oldest one is written, so that memory consumption stays bounded.
+    Method :func:`~SeriesWriter.close` waits until all windows are
+    written and closes the files.
+
+    We define a short initialization period and prepare two fake
+    sequences writing their data into an ASCII and a numpy file:
+
+    >>> from hydpy import pub, Timegrids, Timegrid
+    >>> pub.timegrids = Timegrids(Timegrid('2000.01.01',
+    ...                                    '2000.01.06',
+    ...                                    '1d'))
+    >>> import os, tempfile
+    >>> dirpath = tempfile.mkdtemp()
+    >>> class Sequence(object):
+    ...     def __init__(self, filetype, shape):
+    ...         self.filetype_ext, self.recordshape = filetype, shape
+    ...         self.filepath_ext = os.path.join(dirpath, 'test.' + filetype)
+    >>> asc, npy = Sequence('asc', ()), Sequence('npy', (2,))
+
+    We write the windows of the time steps with the indices 1 and 2 and
+    the index 3:
+
+    >>> import numpy
+    >>> from hydpy.core.seriestools import SeriesWriter
+    >>> writer = SeriesWriter([asc, npy], 1, 4)
+    >>> writer.write(1, [numpy.array([1., 2.]),
+    ...                  numpy.array([[1., 2.], [3., 4.]])])
+    >>> writer.write(3, [numpy.array([3.]), numpy.array([[5., 6.]])])
+    >>> writer.close()
+
+    Both files contain the time grid information and all values of the
+    initialization period:
+
+    >>> with open(asc.filepath_ext) as file_:
+    ...     print(file_.read().replace('\\t', ' '))
+    Timegrid('2000.01.01 00:00:00',
+             '2000.01.06 00:00:00',
+             '1d')
+    0.000000000000000000e+00
+    1.000000000000000000e+00
+    2.000000000000000000e+00
+    3.000000000000000000e+00
+    0.000000000000000000e+00
+    <BLANKLINE>
+    >>> series = numpy.load(npy.filepath_ext)
+    >>> Timegrid.fromarray(series)
+    Timegrid('2000.01.01 00:00:00',
+             '2000.01.06 00:00:00',
+             '1d')
+    >>> series[13:]
+    array([[ 0.,  0.],
+           [ 1.,  2.],
+           [ 3.,  4.],
+           [ 5.,  6.],
+           [ 0.,  0.]])
+
+    When continuing an interrupted simulation run, argument `keep`
+    allows to preserve the values written before index `idx_start`.
+    We write the time steps with the indices 3 and 4 into the existing
+    files, where the values of the indices 1 and 2 remain unchanged:
+
+    >>> writer = SeriesWriter([asc, npy], 3, 5, keep=True)
+    >>> writer.write(3, [numpy.array([7., 8.]),
+    ...                  numpy.array([[7., 8.], [9., 10.]])])
+    >>> writer.close()
+    >>> with open(asc.filepath_ext) as file_:
+    ...     print(file_.read().replace('\\t', ' '))
+    Timegrid('2000.01.01 00:00:00',
+             '2000.01.06 00:00:00',
+             '1d')
+    0.000000000000000000e+00
+    1.000000000000000000e+00
+    2.000000000000000000e+00
+    7.000000000000000000e+00
+    8.000000000000000000e+00
+    <BLANKLINE>
+    >>> numpy.load(npy.filepath_ext)[13:]
+    array([[  0.,   0.],
+           [  1.,   2.],
+           [  3.,   4.],
+           [  7.,   8.],
+           [  9.,  10.]])
+
+    Files not agreeing with the initialization period cannot be kept:
+
+    >>> pub.timegrids = Timegrids(Timegrid('2000.01.01',
+    ...                                    '2000.01.08',
+    ...                                    '1d'))
+    >>> SeriesWriter([asc], 3, 5, keep=True)
+    Traceback (most recent call last):
+    ...
+    RuntimeError: The values of the external data file `...test.asc` \
+cannot be kept, as the file does not agree with the initialization \
+period (from 2000.01.01 00:00:00 to 2000.01.08 00:00:00 in 1d steps) \
+or covers less than `3` time steps.
+    >>> SeriesWriter([npy], 3, 5, keep=True)
+    Traceback (most recent call last):
+    ...
+    RuntimeError: The values of the external data file `...test.npy` \
+cannot be kept, as the file does not agree with the initialization \
+period (from 2000.01.01 00:00:00 to 2000.01.08 00:00:00 in 1d steps) \
+or covers less than `3` time steps.
+
+    Other file types are not supported:
+
+    >>> SeriesWriter([Sequence('store', ())], 1, 4)
+    Traceback (most recent call last):
+    ...
+    RuntimeError: Writing the external data file `...test.store` window \
+by window is not supported for file type `store`.  Please choose `npy` or \
+`asc`.
+
+    >>> import shutil
+    >>> shutil.rmtree(dirpath)
+    """
+
+    def __init__(self, sequences, idx_start, idx_end, maxsize=2,
+                 keep=False):
+        self.sequences = list(sequences)
+        self.idx_start = idx_start
+        self.idx_end = idx_end
+        self.maxsize = maxsize
+        self.keep = keep
+        for seq in self.sequences:
+            if seq.filetype_ext not in ('npy', 'asc'):
+                raise RuntimeError(
+                    'Writing the external data file `%s` window by window '
+                    'is not supported for file type `%s`.  Please choose '
+                    '`npy` or `asc`.' % (seq.filepath_ext, seq.filetype_ext))
+        self._targets = []
+        self._pending = collections.deque()
+        self._pool = None
+        try:
+            for seq in self.sequences:
+                self._targets.append(self._open(seq))
+        except BaseException:
+            self.abort()
+            raise
+        self._pool = multiprocessing.pool.ThreadPool(1)
+
+    def _open(self, seq):
+        if self.keep:
+            return self._reopen(seq)
+        init = pub.timegrids.init
+        if seq.filetype_ext == 'npy':
+            target = numpy.lib.format.open_memmap(
+                seq.filepath_ext, mode='w+', dtype=float,
+                shape=(13+len(init),)+tuple(seq.recordshape))
+            target[:13] = numpy.nan
+            target[(slice(0, 13),)+len(seq.recordshape)*(0,)] = init.toarray()
+        else:
+            target = open(seq.filepath_ext, 'w')
+            target.write(repr(init) + '\n')
+            self._writezeros(target, seq, self.idx_start)
+        return target
+
+    def _reopen(self, seq):
+        init = pub.timegrids.init
+        if seq.filetype_ext == 'npy':
+            target = numpy.lib.format.open_memmap(seq.filepath_ext,
+                                                  mode='r+')
+            header = target[(slice(0, 13),)+len(seq.recordshape)*(0,)]
+            if ((target.shape == (13+len(init),)+tuple(seq.recordshape)) and
+                    numpy.all(header == init.toarray())):
+                target[13+self.idx_end:] = 0.
+                return target
+            del target
+        else:
+            target = open(seq.filepath_ext, 'rb+')
+            lines = [target.readline() for dummy in range(
+                repr(init).count('\n')+1+self.idx_start)]
+            header = b''.join(lines[:-self.idx_start or None])
+            if ((header == (repr(init)+'\n').encode()) and
+                    lines[-1].endswith(b'\n')):
+                target.seek(target.tell())
+                target.truncate()
+                return target
+            target.close()
+        raise RuntimeError(
+            'The values of the external data file `%s` cannot be kept, as '
+            'the file does not agree with the initialization period (%s) '
+            'or covers less than `%d` time steps.'
+            % (seq.filepath_ext, init, self.idx_start))
+
+    @staticmethod
+    def _writezeros(target, seq, nmb):
+        if nmb > 0:
+            numpy.savetxt(target, numpy.zeros((nmb,)+tuple(seq.recordshape)),
+                          delimiter='\t')
+
+    def write(self, idx0, arrays):
+        """Pass the given arrays, containing the values of all sequences
+        for the window starting at the given index, to the background
+        thread."""
+        while len(self._pending) >= self.maxsize:
+            self._pending.popleft().get()
+        self._pending.append(
+            self._pool.apply_async(self._write, (idx0, arrays)))
+
+    def _write(self, idx0, arrays):
+        for (target, values) in zip(self._targets, arrays):
+            if isinstance(target, numpy.memmap):
+                target[13+idx0:13+idx0+len(values)] = values
+            else:
+                numpy.savetxt(target, values, delimiter='\t')
+
+    def flush(self):
+        """Wait until all windows are written and flush all files."""
+        while self._pending:
+            self._pending.popleft().get()
+        for target in self._targets:
+            target.flush()
+
+    def close(self):
+        """Wait until all windows are written and close all files."""
+        try:
+            while self._pending:
+                self._pending.popleft().get()
+            for (seq, target) in zip(self.sequences, self._targets):
+                if not isinstance(target, numpy.memmap):
+                    self._writezeros(target, seq,
+                                     len(pub.timegrids.init)-self.idx_end)
+        finally:
+            self.abort()
+
+    def abort(self):
+        """Stop the background thread and close all files without
+        writing the pending windows."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self._pending.clear()
+        for target in self._targets:
+            if isinstance(target, numpy.memmap):
+                target.flush()
+            else:
+                target.close()
+        self._targets = []
+
+    def __dir__(self):
+        return objecttools.dir_(self)
+
+
+_QUOTED = re.compile('\'([^\']*)\'|"([^"]*)"')
+_INVALID = re.compile(r'[^0-9eE+\-.\snNaAiIfF]')
+
+
+def parse_asc(filepath):
+    """Read the time grid and the values of the given ASCII series file.
+
+    The first three lines must contain the string representation of a
+    :class:`~hydpy.core.timetools.Timegrid` object.  All other lines
+    must contain the same number of values, each line corresponding to
+    a single time step:
+
+    >>> import os, tempfile
+    >>> filepath = os.path.join(tempfile.mkdtemp(), 'test.asc')
+    >>> with open(filepath, 'w') as file_:
+    ...     _ = file_.write("Timegrid('01.01.2000 00:00:00',\\n"
+    ...                     "         '04.01.2000 00:00:00',\\n"
+    ...                     "         '1d')\\n"
+    ...                     "1.0\\t2.0\\n3.0\\t4.0\\n5.0\\t6.0\\n")
+    >>> from hydpy.core.seriestools import parse_asc
+    >>> timegrid, values = parse_asc(filepath)
+    >>> timegrid
+    Timegrid('01.01.2000 00:00:00',
+             '04.01.2000 00:00:00',
+             '1d')
+    >>> values
+    array([[ 1.,  2.],
+           [ 3.,  4.],
+           [ 5.,  6.]])
+
+    The data is parsed in blocks of :const:`ASCBLOCKSIZE` characters, so
+    that no list of strings containing all values needs to be created.
+    Values spanning two blocks are handled properly:
+
+    >>> from hydpy.core import seriestools
+    >>> blocksize = seriestools.ASCBLOCKSIZE
+    >>> seriestools.ASCBLOCKSIZE = 5
+    >>> numpy.array_equal(parse_asc(filepath)[1], values)
+    True
+    >>> seriestools.ASCBLOCKSIZE = blocksize
+
+    Inconsistent numbers of values result in the following error:
+
+    >>> with open(filepath, 'a') as file_:
+    ...     _ = file_.write('7.0\\n')
+    >>> parse_asc(filepath)
+    Traceback (most recent call last):
+    ...
+    ValueError: The number of values (7) of ASCII series file \
+`...test.asc` is not a multiple of the number of values in its first \
+data line (2).
+
+    Values that cannot be converted to floating point numbers and headers
+    other than the string representation of a time grid result in the
+    following errors:
+
+    >>> with open(filepath, 'a') as file_:
+    ...     _ = file_.write('7.0\\tx\\n')
+    >>> parse_asc(filepath)
+    Traceback (most recent call last):
+    ...
+    ValueError: ASCII series file `...test.asc` contains values that \
+cannot be converted to floating point numbers.
+    >>> with open(filepath, 'w') as file_:
+    ...     _ = file_.write("Timegrid('01.01.2000', '04.01.2000')\\n\\n\\n")
+    >>> parse_asc(filepath)
+    Traceback (most recent call last):
+    ...
+    ValueError: The first three lines of ASCII series file `...test.asc` \
+do not define a time grid in the form `Timegrid('first date', \
+'last date', 'step size')`.
+
+    >>> import shutil
+    >>> shutil.rmtree(os.path.dirname(filepath))
+    """
+    with open(filepath) as file_:
+        header = ''.join(file_.readline() for dummy in range(3))
+        timegrid = _parse_header(filepath, header)
+        rest = file_.readline()
+        nmb_columns = max(len(rest.split()), 1)
+        arrays = []
+        while True:
+            text = file_.read(ASCBLOCKSIZE)
+            if not text:
+                break
+            idx = max(text.rfind(' '), text.rfind('\t'), text.rfind('\n'))
+            if idx < 0:
+                rest += text
+            else:
+                arrays.append(_parse_values(filepath, rest+text[:idx]))
+                rest = text[idx:]
+        arrays.append(_parse_values(filepath, rest))
+    values = numpy.concatenate(arrays)
+    if len(values) % nmb_columns:
+        raise ValueError(
+            'The number of values (%d) of ASCII series file `%s` is not a '
+            'multiple of the number of values in its first data line (%d).'
+            % (len(values), filepath, nmb_columns))
+    return timegrid, values.reshape(-1, nmb_columns)
+
+
+def _parse_header(filepath, header):
+    """Return the time grid defined by the given header of an ASCII
+    series file."""
+    strings = [''.join(match) for match in _QUOTED.findall(header)]
+    if (len(strings) != 3) or not header.lstrip().startswith('Timegrid('):
+        raise ValueError(
+            'The first three lines of ASCII series file `%s` do not define '
+            'a time grid in the form `Timegrid(\'first date\', '
+            '\'last date\', \'step size\')`.' % filepath)
+    return timetools.Timegrid(*strings)
+
+
+def _parse_values(filepath, text):
+    """Return the values contained in the given text of an ASCII series
+    file as a flat array."""
+    if (not text) or text.isspace():
+        return numpy.zeros(0)
+    if _INVALID.search(text) is None:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                return numpy.fromstring(text, sep=' ')
+            except (ValueError, DeprecationWarning):
+                pass
+    raise ValueError(
+        'ASCII series file `%s` contains values that cannot be converted '
+        'to floating point numbers.' % filepath)
+
+
+def _sidecarpath(filepath):
+    dirpath, filename = os.path.split(os.path.abspath(filepath))
+    return os.path.join(dirpath, ASCCACHEDIRECTORY, filename + '.npz')
+
+
+def _key(filepath):
+    stat = os.stat(filepath)
+    return numpy.array([stat.st_size, stat.st_mtime])
+
+
+def load_asc(filepath):
+    """Return the time grid and the values of the given ASCII series file,
+    read from its sidecar file, if available and up to date, and parsed
+    by function :func:`parse_asc` otherwise.
+
+    Option `asccache` is enabled by default:
+
+    >>> import os, tempfile
+    >>> dirpath = tempfile.mkdtemp()
+    >>> filepath = os.path.join(dirpath, 'test.asc')
+    >>> with open(filepath, 'w') as file_:
+    ...     _ = file_.write("Timegrid('01.01.2000 00:00:00',\\n"
+    ...                     "         '03.01.2000 00:00:00',\\n"
+    ...                     "         '1d')\\n1.0\\n2.0\\n")
+    >>> from hydpy.core import seriestools
+    >>> seriestools.load_asc(filepath)[1]
+    array([[ 1.],
+           [ 2.]])
+
+    The first call creates the sidecar file, which is used by later calls:
+
+    >>> sorted(os.listdir(os.path.join(dirpath, '_asccache')))
+    ['test.asc.npz']
+    >>> from hydpy.core import seriestools
+    >>> parse_asc = seriestools.parse_asc
+    >>> seriestools.parse_asc = None
+    >>> seriestools.load_asc(filepath)[1]
+    array([[ 1.],
+           [ 2.]])
+
+    Modifications of the ASCII file render the sidecar file invalid:
+
+    >>> with open(filepath, 'a') as file_:
+    ...     _ = file_.write('3.0\\n')
+    >>> seriestools.parse_asc = parse_asc
+    >>> seriestools.load_asc(filepath)[1]
+    array([[ 1.],
+           [ 2.],
+           [ 3.]])
+
+    Function :func:`clear_asccache` removes all sidecar files of the
+    given directory and returns their number:
+
+    >>> seriestools.clear_asccache(dirpath)
+    1
+    >>> os.listdir(dirpath)
+    ['test.asc']
+
+    Function :func:`warm_asccache` prepares the sidecar files of all
+    given ASCII files, which are missing or out of date, and returns
+    their number:
+
+    >>> seriestools.warm_asccache([filepath])
+    1
+    >>> seriestools.warm_asccache([filepath])
+    0
+
+    With option `asccache` disabled, no sidecar files are used:
+
+    >>> seriestools.clear_asccache(dirpath)
+    1
+    >>> from hydpy import pub
+    >>> with pub.options.asccache(False):
+    ...     _ = seriestools.load_asc(filepath)
+    >>> os.listdir(dirpath)
+    ['test.asc']
+
+    >>> import shutil
+    >>> shutil.rmtree(dirpath)
+    """
+    if not pub.options.asccache:
+        return parse_asc(filepath)
+    data = _readsidecar(filepath)
+    if data is None:
+        data = parse_asc(filepath)
+        _writesidecar(filepath, *data)
+    return data
+
+
+def _readsidecar(filepath):
+    sidecarpath = _sidecarpath(filepath)
+    try:
+        with numpy.load(sidecarpath) as sidecar:
+            if numpy.array_equal(sidecar['key'], _key(filepath)):
+                return (timetools.Timegrid.fromarray(sidecar['timegrid']),
+                        sidecar['values'])
+    except (IOError, OSError, KeyError, ValueError):
+        pass
+    return None
+
+
+def _writesidecar(filepath, timegrid, values):
+    """Write the sidecar file of the given ASCII file, if possible.
+
+    Each sidecar file is first written to a temporary file and then
+    renamed, so that concurrent readers never see incomplete files.
+    Failures (e.g. due to missing write permissions) are ignored, as
+    they only affect the performance of later calls.
+    """
+    sidecarpath = _sidecarpath(filepath)
+    try:
+        dirpath = os.path.dirname(sidecarpath)
+        if not os.path.exists(dirpath):
+            os.makedirs(dirpath)
+        handle, temppath = tempfile.mkstemp(dir=dirpath, suffix='.npz')
+        with os.fdopen(handle, 'wb') as file_:
+            numpy.savez(file_, key=_key(filepath),
+                        timegrid=timegrid.toarray(), values=values)
+        getattr(os, 'replace', os.rename)(temppath, sidecarpath)
+    except (IOError, OSError):
+        pass
+
+
+def warm_asccache(filepaths):
+    """Prepare the sidecar files of the given ASCII series files, if
+    missing or out of date, and return their number."""
+    counter = 0
+    for filepath in filepaths:
+        if _readsidecar(filepath) is None:
+            _writesidecar(filepath, *parse_asc(filepath))
+            counter += 1
+    return counter
+
+
+def clear_asccache(dirpath):
+    """Remove all sidecar files of the ASCII series files of the given
+    directory and return their number."""
+    cachepath = os.path.join(dirpath, ASCCACHEDIRECTORY)
+    if not os.path.isdir(cachepath):
+        return 0
+    counter = len([filename for filename in os.listdir(cachepath)
+                   if filename.endswith('.npz')])
+    shutil.rmtree(cachepath)
+    return counter
+
+
+autodoctools.autodoc_module()
@@ -973,7 +973,7 @@ class Timegrid(object):
         for idx in range(1, series.ndim):
             slices.append(slice(0, 1))
             subshape.append(1)
-        series[slices] = self.toarray().reshape(subshape)
+        series[tuple(slices)] = self.toarray().reshape(subshape)
         series[13:] = array
         return series
 
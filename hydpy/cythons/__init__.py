@@ -5,7 +5,8 @@ import importlib
 _modulenames = ('pointerutils',
                 'annutils',
                 'configutils',
-                'smoothutils')
+                'smoothutils',
+                'networkutils')
 
 for modulename in _modulenames:
     module = importlib.import_module('hydpy.cythons.autogen.'+modulename)
@@ -27,6 +27,7 @@ from hydpy.core import parametertools
 from hydpy.core import sequencetools
 from hydpy.core import magictools
 from hydpy.core import autodoctools
+from hydpy.core import profiletools
 from hydpy.cythons import smoothutils
 
 
@@ -50,7 +51,8 @@ agreement with numpy's default integer type on the respective platform/system.
 NDIM2STR = {0: '',
             1: '[:]',
             2: '[:,:]',
-            3: '[:,:,:]'}
+            3: '[:,:,:]',
+            4: '[:,:,:,:]'}
 
 _nogil = ' nogil' if pub.options.fastcython else ''
 
@@ -210,11 +212,14 @@ class Cythonizer(object):
     @property
     def outdated(self):
         """True if at least one of the :attr:`~Cythonizer.pysourcefiles`
-        is newer than the compiled file under :attr:`~Cythonizer.cyfilepath`,
-        otherwise False.
+        is newer than the compiled file under :attr:`~Cythonizer.cyfilepath`
+        or if the :attr:`~Cythonizer.profiling` flag of the compiled file
+        disagrees with option `profiling`, otherwise False.
         """
         if not os.path.exists(self.cyfilepath):
             return True
+        if self.profiling != bool(pub.options.profiling):
+            return True
         cydate = os.stat(self.cyfilepath).st_mtime
         for pysourcefile in self.pysourcefiles:
             pydate = os.stat(pysourcefile).st_mtime
@@ -222,6 +227,19 @@ class Cythonizer(object):
                 return True
         return False
 
+    @property
+    def profiling(self):
+        """True if the pyx file under :attr:`~Cythonizer.cyfilepath` has
+        been written with profiling support (see module
+        :mod:`~hydpy.core.profiletools`), otherwise False."""
+        with open(self.cyfilepath) as pyxfile:
+            for line in pyxfile:
+                if not line.startswith('#'):
+                    break
+                if line.strip() == '#hydpy: profiling=True':
+                    return True
+        return False
+
     def compile_(self):
         """Translate cython code to C code and compile it."""
         from Cython import Build
@@ -319,6 +337,8 @@ class PyxWriter(object):
             pxf.write(repr(self.modelnumericfunctions))
             print('        %s' % '- additional functions')
             pxf.write(repr(self.modeluserfunctions))
+            print('    %s' % '* function addresses')
+            pxf.write(repr(self.functionaddresses))
 
     @property
     def cythonoptions(self):
@@ -327,12 +347,13 @@ class PyxWriter(object):
         return Lines('#!python',
                      '#cython: boundscheck=%s' % flag,
                      '#cython: wraparound=%s' % flag,
-                     '#cython: initializedcheck=%s' % flag)
+                     '#cython: initializedcheck=%s' % flag,
+                     '#hydpy: profiling=%s' % bool(pub.options.profiling))
 
     @property
     def cimports(self):
         """Import command lines."""
-        return Lines('import numpy',
+        lines = Lines('import numpy',
                      'cimport numpy',
                      'from libc.math cimport exp, fabs, log',
                      'from libc.stdio cimport *',
@@ -345,6 +366,10 @@ class PyxWriter(object):
                      'from hydpy.cythons.autogen cimport configutils',
                      'from hydpy.cythons.autogen cimport smoothutils',
                      'from hydpy.cythons.autogen cimport annutils')
+        if pub.options.profiling:
+            lines.add(0, 'from libc.time cimport clock, clock_t, '
+                         'CLOCKS_PER_SEC')
+        return lines
 
     @property
     def constants(self):
@@ -399,6 +424,8 @@ class PyxWriter(object):
             lines.add(0, '@cython.final')
             lines.add(0, 'cdef class %s(object):'
                          % objecttools.classname(subseqs))
+            if isinstance(subseqs, sequencetools.IOSubSequences):
+                lines.add(1, 'cdef public int _member')
             for (name2, seq) in subseqs:
                 ctype = 'double' + NDIM2STR[seq.NDIM]
                 if isinstance(subseqs, sequencetools.LinkSequences):
@@ -446,35 +473,111 @@ class PyxWriter(object):
         lines.add(1, 'cdef public bint _%s_diskflag' % seq.name)
         lines.add(1, 'cdef public str _%s_path' % seq.name)
         lines.add(1, 'cdef FILE *_%s_file' % seq.name)
+        lines.add(1, 'cdef public int _%s_offset' % seq.name)
+        lines.add(1, 'cdef public int _%s_nmb' % seq.name)
         lines.add(1, 'cdef public bint _%s_ramflag' % seq.name)
+        lines.add(1, 'cdef public bint _%s_single' % seq.name)
+        lines.add(1, 'cdef public int _%s_aggfactor' % seq.name)
+        lines.add(1, 'cdef public int _%s_aggmode' % seq.name)
+        if seq.NDIM == 1:
+            lines.add(1, 'cdef public int _%s_reclength' % seq.name)
+            lines.add(1, 'cdef public bint _%s_weighted' % seq.name)
+            lines.add(1, 'cdef public double[:,:] _%s_weights' % seq.name)
         ctype = 'double' + NDIM2STR[seq.NDIM+1]
         lines.add(1, 'cdef public %s _%s_array' % (ctype, seq.name))
+        ctype = 'float' + NDIM2STR[seq.NDIM+1]
+        lines.add(1, 'cdef public %s _%s_array32' % (ctype, seq.name))
+        lines.add(1, 'cdef public bint _%s_ensembleflag' % seq.name)
+        ctype = 'double' + NDIM2STR[seq.NDIM+2]
+        lines.add(1, 'cdef public %s _%s_ensemble' % (ctype, seq.name))
+        return lines
+
+    @staticmethod
+    def _arrays(seq):
+        """Name, data type, and item size of the single and the double
+        precision array of the given sequence."""
+        return (('_%s_array32' % seq.name, 'numpy.float32', 4),
+                ('_%s_array' % seq.name, 'float', 8))
+
+    @staticmethod
+    def _firstvalue(seq, array):
+        """Address of the first value of the given array of the given
+        sequence."""
+        return '&self.%s[%s]' % (array, ','.join((seq.NDIM+1)*'0'))
+
+    def _precisions(self, seq, indent, func):
+        """Statements of the given function for the single and the double
+        precision array, distinguished by the `single` flag."""
+        lines = Lines()
+        for (jdx, (array, dtype, itemsize)) in enumerate(self._arrays(seq)):
+            lines.add(indent, ('if self._%s_single:' % seq.name, 'else:')[jdx])
+            lines.extend(func(array, dtype, itemsize))
         return lines
 
     def openfiles(self, subseqs):
-        """Open file statements."""
+        """Memory mapping or file opening statements."""
         print('            . openfiles')
         lines = Lines()
-        lines.add(1, 'cpdef openfiles(self, int idx):')
+        lines.add(1, 'cpdef openfiles(self, int idx, int blocksize=0):')
         for (name, seq) in subseqs:
-            lines.add(2, 'if self._%s_diskflag:' % name)
-            lines.add(3, 'self._%s_file = fopen(str(self._%s_path).encode(), '
-                         '"rb+")' % (2*(name,)))
-            if seq.NDIM == 0:
-                lines.add(3, 'fseek(self._%s_file, idx*8, SEEK_SET)' % name)
+            if seq.NDIM == 1:
+                shape = ', self._%s_reclength' % name
             else:
-                lines.add(3, 'fseek(self._%s_file, idx*self._%s_length*8, '
-                             'SEEK_SET)' % (2*(name,)))
+                shape = ''.join(', self._%s_length_%d' % (name, idx)
+                                for idx in range(seq.NDIM))
+
+            def _open(array, dtype, itemsize):
+                lines_ = Lines()
+                lines_.add(4, 'if blocksize:')
+                lines_.add(5, 'self.%s = numpy.zeros((blocksize%s), '
+                              'dtype=%s)' % (array, shape, dtype))
+                lines_.add(5, 'self._%s_file = fopen(str(self._%s_path)'
+                              '.encode(), "rb+")' % (2*(name,)))
+                lines_.add(5, 'self._%s_offset = '
+                              'idx//max(self._%s_aggfactor, 1)' % (name, name))
+                lines_.add(5, 'self._%s_nmb = 0' % name)
+                lines_.add(4, 'else:')
+                lines_.add(5, 'self.%s = numpy.memmap(self._%s_path, '
+                              'dtype=%s, mode="r+").reshape((-1%s))'
+                              % (array, name, dtype, shape))
+                lines_.add(5, 'self._%s_offset = 0' % name)
+                return lines_
+
+            lines.add(2, 'if self._%s_diskflag:' % name)
+            lines.extend(self._precisions(seq, 3, _open))
         return lines
 
     def closefiles(self, subseqs):
-        """Close file statements."""
+        """Memory unmapping or file closing statements."""
         print('            . closefiles')
         lines = Lines()
         lines.add(1, 'cpdef inline closefiles(self):')
         for (name, seq) in sorted(subseqs):
             lines.add(2, 'if self._%s_diskflag:' % name)
-            lines.add(3, 'fclose(self._%s_file)' % name)
+            lines.add(3, 'if self._%s_file != NULL:' % name)
+            if not isinstance(subseqs, sequencetools.InputSequences):
+                lines.extend(self._precisions(
+                    seq, 4, lambda array, dtype, itemsize:
+                    self._flushblock(seq, array, itemsize, 5)))
+            lines.add(4, 'fclose(self._%s_file)' % name)
+            lines.add(4, 'self._%s_file = NULL' % name)
+            for (array, dtype, itemsize) in self._arrays(seq):
+                lines.add(3, 'self.%s = None' % array)
+        return lines
+
+    def _flushblock(self, seq, array, itemsize, indent):
+        """Statements for writing the buffered values of the given
+        sequence to its internal data file."""
+        lines = Lines()
+        length = '_%s_%s' % (seq.name,
+                             'reclength' if seq.NDIM == 1 else 'length')
+        lines.add(indent, 'fseek(self._%s_file, '
+                          '<long>self._%s_offset*self.%s*%d, SEEK_SET)'
+                          % (seq.name, seq.name, length, itemsize))
+        lines.add(indent, 'fwrite(%s, self.%s*%d, self._%s_nmb, '
+                          'self._%s_file)'
+                          % (self._firstvalue(seq, array), length, itemsize,
+                             seq.name, seq.name))
         return lines
 
     def loaddata(self, subseqs):
@@ -483,26 +586,55 @@ class PyxWriter(object):
         lines = Lines()
         lines.add(1, 'cpdef inline void loaddata(self, int idx) %s:' % _nogil)
         lines.add(2, 'cdef int jdx0, jdx1, jdx2, jdx3, jdx4, jdx5')
+        lines.add(2, 'cdef int kdx')
         for (name, seq) in subseqs:
-            lines.add(2, 'if self._%s_diskflag:' % name)
-            if seq.NDIM == 0:
-                lines.add(3, 'fread(&self.%s, 8, 1, self._%s_file)'
-                             % (2*(name,)))
-            else:
-                lines.add(3, 'fread(&self.%s[0], 8, self._%s_length, '
-                             'self._%s_file)' % (3*((name,))))
-            lines.add(2, 'elif self._%s_ramflag:' % name)
-            if seq.NDIM == 0:
-                lines.add(3, 'self.%s = self._%s_array[idx]' % (2*(name,)))
-            else:
-                indexing = ''
-                for idx in range(seq.NDIM):
-                    lines.add(3+idx, 'for jdx%d in range(self._%s_length_%d):'
-                                     % (idx, name, idx))
-                    indexing += 'jdx%d,' % idx
-                indexing = indexing[:-1]
-                lines.add(3+seq.NDIM, 'self.%s[%s] = self._%s_array[idx,%s]'
-                                      % (2*(name, indexing)))
+
+            def _load(array, dtype, itemsize):
+                lines_ = Lines()
+                lines_.add(4, 'if self._%s_file != NULL:' % name)
+                lines_.add(5, 'if (kdx < 0) or (kdx >= self._%s_nmb):'
+                              % name)
+                lines_.add(6, 'fseek(self._%s_file, '
+                              '<long>idx*self._%s_length*%d, SEEK_SET)'
+                              % (name, name, itemsize))
+                lines_.add(6, 'self._%s_nmb = fread(%s, self._%s_length*%d, '
+                              'self.%s.shape[0], self._%s_file)'
+                              % (name, self._firstvalue(seq, array), name,
+                                 itemsize, array, name))
+                lines_.add(6, 'self._%s_offset = idx' % name)
+                lines_.add(6, 'kdx = 0')
+                lines_.extend(self._fetch(
+                    seq, 4, lambda indexing: 'self.%s[kdx%s]'
+                    % (array, indexing)))
+                return lines_
+
+            lines.add(2, 'if self._%s_ensembleflag:' % name)
+            lines.extend(self._fetch(
+                seq, 3, lambda indexing:
+                'self._%s_ensemble[self._member,idx%s]' % (name, indexing)))
+            lines.add(2, 'elif self._%s_diskflag or self._%s_ramflag:'
+                         % (name, name))
+            lines.add(3, 'kdx = idx-self._%s_offset' % name)
+            lines.extend(self._precisions(seq, 3, _load))
+        return lines
+
+    @staticmethod
+    def _fetch(seq, indent, source):
+        """Statements for passing the values of the given source of the
+        internal data, defined by a function of the index string of the
+        sequence dimensions, to the given sequence."""
+        lines = Lines()
+        if seq.NDIM == 0:
+            lines.add(indent, 'self.%s = %s' % (seq.name, source('')))
+        else:
+            indexing = ''
+            for idx in range(seq.NDIM):
+                lines.add(indent+idx, 'for jdx%d in range(self._%s_length_%d):'
+                                      % (idx, seq.name, idx))
+                indexing += ',jdx%d' % idx
+            lines.add(indent+seq.NDIM, 'self.%s[%s] = %s'
+                                       % (seq.name, indexing[1:],
+                                          source(indexing)))
         return lines
 
     def savedata(self, subseqs):
@@ -511,26 +643,109 @@ class PyxWriter(object):
         lines = Lines()
         lines.add(1, 'cpdef inline void savedata(self, int idx) %s:' % _nogil)
         lines.add(2, 'cdef int jdx0, jdx1, jdx2, jdx3, jdx4, jdx5')
+        lines.add(2, 'cdef int adx, kdx, rdx')
+        lines.add(2, 'cdef double value')
         for (name, seq) in subseqs:
-            lines.add(2, 'if self._%s_diskflag:' % name)
-            if seq.NDIM == 0:
-                lines.add(3, 'fwrite(&self.%s, 8, 1, self._%s_file)'
-                             % (2*(name,)))
-            else:
-                lines.add(3, 'fwrite(&self.%s[0], 8, self._%s_length, '
-                             'self._%s_file)' % (3*(name,)))
-            lines.add(2, 'elif self._%s_ramflag:' % name)
-            if seq.NDIM == 0:
-                lines.add(3, 'self._%s_array[idx] = self.%s' % (2*(name,)))
-            else:
-                indexing = ''
-                for idx in range(seq.NDIM):
-                    lines.add(3+idx, 'for jdx%d in range(self._%s_length_%d):'
-                                     % (idx, name, idx))
-                    indexing += 'jdx%d,' % idx
-                indexing = indexing[:-1]
-                lines.add(3+seq.NDIM, 'self._%s_array[idx,%s] = self.%s[%s]'
-                                      % (2*(name, indexing)))
+
+            def _save(array, dtype, itemsize):
+                lines_ = Lines()
+                lines_.add(4, 'if self._%s_file != NULL:' % name)
+                lines_.add(5, 'if (kdx < 0) or (kdx >= self.%s.shape[0]):'
+                              % array)
+                lines_.extend(self._flushblock(seq, array, itemsize, 6))
+                lines_.add(6, 'self._%s_offset = adx' % name)
+                lines_.add(6, 'self._%s_nmb = 0' % name)
+                lines_.add(6, 'kdx = 0')
+                lines_.add(5, 'if kdx >= self._%s_nmb:' % name)
+                lines_.add(6, 'self._%s_nmb = kdx+1' % name)
+                lines_.extend(self._store(
+                    seq, 4, lambda indexing: 'self.%s[kdx%s]'
+                    % (array, indexing)))
+                return lines_
+
+            lines.add(2, 'if self._%s_ensembleflag:' % name)
+            lines.extend(self._aggindices(seq, 3))
+            lines.extend(self._store(
+                seq, 3, lambda indexing:
+                'self._%s_ensemble[self._member,adx%s]' % (name, indexing)))
+            lines.add(2, 'elif self._%s_diskflag or self._%s_ramflag:'
+                         % (name, name))
+            lines.extend(self._aggindices(seq, 3))
+            lines.add(3, 'kdx = adx-self._%s_offset' % name)
+            lines.extend(self._precisions(seq, 3, _save))
+        return lines
+
+    @staticmethod
+    def _aggindices(seq, indent):
+        """Statements for determining the index `adx` of the aggregation
+        interval of simulation step `idx` and the index `rdx` of `idx`
+        within this interval."""
+        lines = Lines()
+        lines.add(indent, 'if self._%s_aggfactor > 1:' % seq.name)
+        lines.add(indent+1, 'adx = idx//self._%s_aggfactor' % seq.name)
+        lines.add(indent+1, 'rdx = idx-adx*self._%s_aggfactor' % seq.name)
+        lines.add(indent, 'else:')
+        lines.add(indent+1, 'adx = idx')
+        lines.add(indent+1, 'rdx = 0')
+        return lines
+
+    def _store(self, seq, indent, target):
+        """Statements for passing the values of the given sequence to the
+        given target of the internal data, defined by a function of the
+        index string of the sequence dimensions (see method
+        :func:`~PyxWriter._aggregate`)."""
+        name = seq.name
+        lines = Lines()
+        if seq.NDIM == 0:
+            lines.extend(self._aggregate(
+                seq, indent, target(''), 'self.%s' % name))
+        elif seq.NDIM == 1:
+            lines.add(indent, 'if self._%s_weighted:' % name)
+            lines.add(indent+1, 'for jdx0 in range(self._%s_reclength):'
+                                % name)
+            lines.add(indent+2, 'value = 0.')
+            lines.add(indent+2, 'for jdx1 in range(self._%s_length_0):'
+                                % name)
+            lines.add(indent+3, 'value += self._%s_weights[jdx0,jdx1]'
+                                '*self.%s[jdx1]' % (name, name))
+            lines.extend(self._aggregate(
+                seq, indent+2, target(',jdx0'), 'value'))
+            lines.add(indent, 'else:')
+            lines.add(indent+1, 'for jdx0 in range(self._%s_length_0):'
+                                % name)
+            lines.extend(self._aggregate(
+                seq, indent+2, target(',jdx0'), 'self.%s[jdx0]' % name))
+        else:
+            indexing = ''
+            for idx in range(seq.NDIM):
+                lines.add(indent+idx, 'for jdx%d in range(self._%s_length_%d):'
+                                      % (idx, name, idx))
+                indexing += ',jdx%d' % idx
+            lines.extend(self._aggregate(
+                seq, indent+seq.NDIM, target(indexing),
+                'self.%s[%s]' % (name, indexing[1:])))
+        return lines
+
+    @staticmethod
+    def _aggregate(seq, indent, target, value):
+        """Statements for passing the given value to the given target
+        of the internal data array, following the aggregation mode of the
+        given sequence (see constant
+        :const:`~hydpy.core.sequencetools.AGGREGATIONMODES`)."""
+        lines = Lines()
+        mode = 'self._%s_aggmode' % seq.name
+        lines.add(indent, 'if (rdx == 0) or (%s == 0):' % mode)
+        lines.add(indent+1, '%s = %s' % (target, value))
+        lines.add(indent, 'elif %s == 1:' % mode)
+        lines.add(indent+1, '%s += %s' % (target, value))
+        lines.add(indent, 'elif %s == 2:' % mode)
+        lines.add(indent+1, '%s += (%s-%s)/(rdx+1)' % (target, value, target))
+        lines.add(indent, 'elif %s == 3:' % mode)
+        lines.add(indent+1, 'if %s < %s:' % (value, target))
+        lines.add(indent+2, '%s = %s' % (target, value))
+        lines.add(indent, 'elif %s == 4:' % mode)
+        lines.add(indent+1, 'if %s > %s:' % (value, target))
+        lines.add(indent+2, '%s = %s' % (target, value))
         return lines
 
     def setpointer(self, subseqs):
@@ -617,6 +832,8 @@ class PyxWriter(object):
     def modeldeclarations(self):
         """Attribute declarations of the model class."""
         lines = Lines()
+        if pub.options.profiling:
+            lines.add(0, 'PROFILENAMES = %s' % repr(tuple(self.profilenames)))
         lines.add(0, '@cython.final')
         lines.add(0, 'cdef class Model(object):')
         lines.add(1, 'cdef public int idx_sim')
@@ -626,8 +843,50 @@ class PyxWriter(object):
             lines.add(1, 'cdef public NumConsts numconsts')
         if hasattr(self.model, 'numvars'):
             lines.add(1, 'cdef public NumVars numvars')
+        if pub.options.profiling:
+            nmb = len(self.profilenames)
+            lines.add(1, 'cdef public double[:] profile_times')
+            lines.add(1, 'cdef public %s[:] profile_calls' % TYPE2STR[int])
+            lines.add(1, 'def __init__(self):')
+            lines.add(2, 'self.profile_times = numpy.zeros(%d)' % nmb)
+            lines.add(2, 'self.profile_calls = numpy.zeros(%d, dtype=int)'
+                         % nmb)
         return lines
 
+    @property
+    def profilenames(self):
+        """Names of all model methods, whose computation times are
+        recorded in profiling mode (see module
+        :mod:`~hydpy.core.profiletools`)."""
+        names = [name for name in profiletools.TIMED_METHODS
+                 if hasattr(self.model, name)]
+        for group in profiletools.TIMED_GROUPS:
+            for method in getattr(self.model, group):
+                if method.__name__ not in names:
+                    names.append(method.__name__)
+        return names
+
+    def _timed(self, name):
+        """True if the computation time of the model method with the
+        given name is to be recorded."""
+        return bool(pub.options.profiling) and (name in self.profilenames)
+
+    def _add_call(self, lines, indent, name, call=None):
+        """Add the call of the model method with the given name to the
+        given lines and, in profiling mode, the lines recording its
+        computation time (requiring the declaration `cdef clock_t t0`)."""
+        if call is None:
+            call = 'self.%s()' % name
+        if self._timed(name):
+            idx = self.profilenames.index(name)
+            lines.add(indent, 't0 = clock()')
+            lines.add(indent, call)
+            lines.add(indent, 'self.profile_times[%d] += '
+                              '<double>(clock()-t0)/CLOCKS_PER_SEC' % idx)
+            lines.add(indent, 'self.profile_calls[%d] += 1' % idx)
+        else:
+            lines.add(indent, call)
+
     @property
     def modelstandardfunctions(self):
         """Standard functions of the model class."""
@@ -668,22 +927,24 @@ class PyxWriter(object):
         print('                . doit')
         lines = Lines()
         lines.add(1, 'cpdef inline void doit(self, int idx) %s:' % _nogil)
+        if pub.options.profiling:
+            lines.add(2, 'cdef clock_t t0')
         lines.add(2, 'self.idx_sim = idx')
         if getattr(self.model.sequences, 'inputs', None) is not None:
-            lines.add(2, 'self.loaddata()')
+            self._add_call(lines, 2, 'loaddata')
         if self.model._INLET_METHODS:
             lines.add(2, 'self.update_inlets()')
         if hasattr(self.model, 'solve'):
-            lines.add(2, 'self.solve()')
+            self._add_call(lines, 2, 'solve')
         else:
             lines.add(2, 'self.run()')
             if getattr(self.model.sequences, 'states', None) is not None:
-                lines.add(2, 'self.new2old()')
+                self._add_call(lines, 2, 'new2old')
         if self.model._OUTLET_METHODS:
             lines.add(2, 'self.update_outlets()')
         if ((getattr(self.model.sequences, 'fluxes', None) is not None) or
                 (getattr(self.model.sequences, 'states', None) is not None)):
-            lines.add(2, 'self.savedata()')
+            self._add_call(lines, 2, 'savedata')
         return lines
 
     @property
@@ -750,11 +1011,13 @@ class PyxWriter(object):
             lines.add(1, method_header(name,
                                        nogil=True,
                                        idx_as_arg=idx_as_arg))
+            if any(self._timed(method.__name__) for method in methods):
+                lines.add(2, 'cdef clock_t t0')
             if idx_as_arg:
                 lines.add(2, 'self.idx_sim = idx')
             anything = False
             for method in methods:
-                lines.add(2, 'self.%s()' % method.__name__)
+                self._add_call(lines, 2, method.__name__)
                 anything = True
             if not anything:
                 lines.add(2, 'pass')
@@ -1053,6 +1316,28 @@ class PyxWriter(object):
         return lines
 
 
+    @property
+    def functionaddresses(self):
+        """C wrapper functions for the model methods required by class
+        :class:`~hydpy.cythons.networkutils.NetworkRunner` and the
+        module function `functionaddresses`, which returns the memory
+        addresses of these wrappers."""
+        lines = Lines()
+        names = [name for name in ('doit', 'update_receivers',
+                                   'update_senders')
+                 if hasattr(self.model, name)]
+        for name in names:
+            lines.add(0, 'cdef void _%s(void *model, int idx) %s:'
+                         % (name, _nogil))
+            lines.add(1, '(<Model>model).%s(idx)' % name)
+        lines.add(0, 'def functionaddresses():')
+        lines.add(1, 'return {')
+        for name in names:
+            lines.add(2, '"%s": <size_t>&_%s,' % (name, name))
+        lines.add(1, '}')
+        return lines
+
+
 class FuncConverter(object):
 
     def __init__(self, model, funcname, func):
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""This module defines the Cython declarations related to module
+:mod:`~hydpy.cythons.networkutils`.
+"""
+
+cimport numpy
+from hydpy.cythons.autogen cimport pointerutils
+
+ctypedef void (*ModelFunction)(void*, int) nogil
+
+
+cdef class NetworkRunner(object):
+
+    cdef public bint nogil
+    cdef public int nmb_threads
+    cdef list _loads
+    cdef list _resets
+    cdef list _levelcalls
+    cdef list _calls
+    cdef list _saves
+    cdef bint _ready
+    cdef int nmb_loads
+    cdef int nmb_resets
+    cdef int nmb_levels
+    cdef int nmb_tasks
+    cdef int nmb_calls
+    cdef int nmb_saves
+    cdef double **load_values
+    cdef double **load_arrays
+    cdef double **reset_values
+    cdef size_t *level_starts
+    cdef size_t *task_starts
+    cdef ModelFunction *task_functions
+    cdef void **task_models
+    cdef ModelFunction *call_functions
+    cdef void **call_models
+    cdef double **save_values
+    cdef double **save_arrays
+
+    cdef void _allocate(self)
+    cdef void _deallocate(self)
+    cdef void _simulate(self, int idx_start, int idx_end) nogil
+    cdef void _load(self, int idx) nogil
+    cdef void _calltask(self, int tdx, int idx) nogil
+    cdef void _save(self, int idx) nogil
@@ -0,0 +1,260 @@
+#!python
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: initializedcheck=False
+"""This Cython module implements the time loop of method
+:func:`~hydpy.core.hydpytools.HydPy.doit` at C speed.
+
+Usually, :func:`~hydpy.core.hydpytools.HydPy.doit` calls each function
+of its :attr:`~hydpy.core.hydpytools.HydPy.funcorder` at each simulation
+step, which results in a Python level call for each node and each model
+method.  For large networks, the overhead of these calls can exceed the
+actual computation time of the (cythonized) models.  Instead, a
+:class:`NetworkRunner` object collects the memory addresses of all
+relevant node values and node series as well as the addresses of the
+C functions provided by each cythonized model module (see property
+:attr:`~hydpy.cythons.modelutils.PyxWriter.functionaddresses`) only
+once and then executes the complete simulation period within a single
+C loop.
+
+Optionally, a :class:`NetworkRunner` object calls the model functions
+of independent elements concurrently (see method
+:func:`~NetworkRunner.add_levelcall`).  All threads are started only
+once for the complete simulation period, and the synchronisation between
+the different dependency levels takes place in C via OpenMP barriers.
+Without OpenMP support (see the `setup.py` file), all calls are executed
+by a single thread.
+"""
+
+import cython
+from cython.parallel cimport parallel, prange
+cimport numpy
+from cpython.mem cimport PyMem_Malloc
+from cpython.mem cimport PyMem_Free
+from hydpy.cythons.autogen cimport pointerutils
+
+
+@cython.final
+cdef class NetworkRunner(object):
+    """Executes the time loop of a complete network at C speed.
+
+    The different `add` methods must be called in the same order as
+    the related functions are listed in
+    :attr:`~hydpy.core.hydpytools.HydPy.funcorder`.  Each simulation
+    step then consists of the following tasks, executed in the given
+    order: loading the values of all registered node series, resetting
+    all registered node values, calling all model functions registered
+    via method :func:`~NetworkRunner.add_levelcall` level by level,
+    calling all model functions registered via method
+    :func:`~NetworkRunner.add_call`, and saving all registered node
+    values to their series.
+
+    The level calls are distributed over `nmb_threads` threads, if
+    `nogil` is `True`.
+    """
+
+    def __init__(self, nogil=True, nmb_threads=1):
+        self.nogil = nogil
+        self.nmb_threads = nmb_threads
+        self._loads = []
+        self._resets = []
+        self._levelcalls = []
+        self._calls = []
+        self._saves = []
+        self._ready = False
+
+    def add_load(self, pointerutils.Double value, double[::1] array):
+        """Load the values of the given series `array` into the given
+        :class:`~hydpy.cythons.pointerutils.Double` object."""
+        self._loads.append((value, array))
+        self._ready = False
+
+    def add_reset(self, pointerutils.Double value):
+        """Set the value of the given
+        :class:`~hydpy.cythons.pointerutils.Double` object to zero."""
+        self._resets.append(value)
+        self._ready = False
+
+    def add_levelcall(self, int level, int task, size_t address, model):
+        """Call the C function with the given memory `address`, which
+        must take the given (cythonized) `model` as its first argument,
+        within the given task of the given dependency level.
+
+        All calls of the same task are executed one after another by the
+        same thread, following the order of their registration.  The
+        different tasks of the same level are executed concurrently.
+        Each level starts when all tasks of the previous level (with the
+        next smaller level number) are finished.
+        """
+        self._levelcalls.append((level, task, address, model))
+        self._ready = False
+
+    def add_call(self, size_t address, model):
+        """Call the C function with the given memory `address`, which
+        must take the given (cythonized) `model` as its first argument."""
+        self._calls.append((address, model))
+        self._ready = False
+
+    def add_save(self, pointerutils.Double value, double[::1] array):
+        """Save the values of the given
+        :class:`~hydpy.cythons.pointerutils.Double` object into the
+        given series `array`."""
+        self._saves.append((value, array))
+        self._ready = False
+
+    cdef void _allocate(self):
+        cdef pointerutils.Double value
+        cdef double[::1] array
+        cdef size_t address
+        cdef int jdx, ldx, tdx
+        self._deallocate()
+        self.nmb_loads = len(self._loads)
+        self.nmb_resets = len(self._resets)
+        self.nmb_calls = len(self._calls)
+        self.nmb_saves = len(self._saves)
+        self.load_values = <double**> PyMem_Malloc(
+            max(self.nmb_loads, 1) * sizeof(double*))
+        self.load_arrays = <double**> PyMem_Malloc(
+            max(self.nmb_loads, 1) * sizeof(double*))
+        for jdx in range(self.nmb_loads):
+            value, array = self._loads[jdx]
+            self.load_values[jdx] = &value.value
+            self.load_arrays[jdx] = &array[0]
+        self.reset_values = <double**> PyMem_Malloc(
+            max(self.nmb_resets, 1) * sizeof(double*))
+        for jdx in range(self.nmb_resets):
+            value = self._resets[jdx]
+            self.reset_values[jdx] = &value.value
+        levelcalls = sorted(
+            (call[0], call[1], position) + call[2:] for
+            (position, call) in enumerate(self._levelcalls))
+        levels = [call[0] for call in levelcalls]
+        tasks = [call[:2] for call in levelcalls]
+        self.nmb_levels = len(set(levels))
+        self.nmb_tasks = len(set(tasks))
+        self.level_starts = <size_t*> PyMem_Malloc(
+            (self.nmb_levels+1) * sizeof(self.level_starts[0]))
+        self.task_starts = <size_t*> PyMem_Malloc(
+            (self.nmb_tasks+1) * sizeof(self.task_starts[0]))
+        self.task_functions = <ModelFunction*> PyMem_Malloc(
+            max(len(levelcalls), 1) * sizeof(ModelFunction))
+        self.task_models = <void**> PyMem_Malloc(
+            max(len(levelcalls), 1) * sizeof(void*))
+        ldx, tdx = -1, -1
+        for jdx in range(len(levelcalls)):
+            if (jdx == 0) or (tasks[jdx] != tasks[jdx-1]):
+                tdx += 1
+                self.task_starts[tdx] = jdx
+                if (jdx == 0) or (levels[jdx] != levels[jdx-1]):
+                    ldx += 1
+                    self.level_starts[ldx] = tdx
+            address = levelcalls[jdx][3]
+            self.task_functions[jdx] = <ModelFunction> address
+            self.task_models[jdx] = <void*> levelcalls[jdx][4]
+        self.task_starts[self.nmb_tasks] = len(levelcalls)
+        self.level_starts[self.nmb_levels] = self.nmb_tasks
+        self.call_functions = <ModelFunction*> PyMem_Malloc(
+            max(self.nmb_calls, 1) * sizeof(ModelFunction))
+        self.call_models = <void**> PyMem_Malloc(
+            max(self.nmb_calls, 1) * sizeof(void*))
+        for jdx in range(self.nmb_calls):
+            address = self._calls[jdx][0]
+            self.call_functions[jdx] = <ModelFunction> address
+            self.call_models[jdx] = <void*> self._calls[jdx][1]
+        self.save_values = <double**> PyMem_Malloc(
+            max(self.nmb_saves, 1) * sizeof(double*))
+        self.save_arrays = <double**> PyMem_Malloc(
+            max(self.nmb_saves, 1) * sizeof(double*))
+        for jdx in range(self.nmb_saves):
+            value, array = self._saves[jdx]
+            self.save_values[jdx] = &value.value
+            self.save_arrays[jdx] = &array[0]
+        self._ready = True
+
+    cdef void _deallocate(self):
+        PyMem_Free(self.load_values)
+        PyMem_Free(self.load_arrays)
+        PyMem_Free(self.reset_values)
+        PyMem_Free(self.level_starts)
+        PyMem_Free(self.task_starts)
+        PyMem_Free(self.task_functions)
+        PyMem_Free(self.task_models)
+        PyMem_Free(self.call_functions)
+        PyMem_Free(self.call_models)
+        PyMem_Free(self.save_values)
+        PyMem_Free(self.save_arrays)
+        self.load_values = NULL
+        self.load_arrays = NULL
+        self.reset_values = NULL
+        self.level_starts = NULL
+        self.task_starts = NULL
+        self.task_functions = NULL
+        self.task_models = NULL
+        self.call_functions = NULL
+        self.call_models = NULL
+        self.save_values = NULL
+        self.save_arrays = NULL
+        self._ready = False
+
+    def __dealloc__(self):
+        self._deallocate()
+
+    cdef void _simulate(self, int idx_start, int idx_end) nogil:
+        cdef int idx, jdx, ldx, tdx
+        if self.nogil and (self.nmb_threads > 1) and (self.nmb_tasks > 1):
+            with parallel(num_threads=self.nmb_threads):
+                for idx in range(idx_start, idx_end):
+                    for jdx in prange(1, schedule='static'):
+                        self._load(idx)
+                    for ldx in range(self.nmb_levels):
+                        for tdx in prange(self.level_starts[ldx],
+                                          self.level_starts[ldx+1],
+                                          schedule='dynamic'):
+                            self._calltask(tdx, idx)
+                    for jdx in prange(1, schedule='static'):
+                        self._save(idx)
+        else:
+            for idx in range(idx_start, idx_end):
+                self._load(idx)
+                for tdx in range(self.nmb_tasks):
+                    self._calltask(tdx, idx)
+                self._save(idx)
+
+    cdef void _load(self, int idx) nogil:
+        """Load the values of all node series and reset all node values."""
+        cdef int jdx
+        for jdx in range(self.nmb_loads):
+            self.load_values[jdx][0] = self.load_arrays[jdx][idx]
+        for jdx in range(self.nmb_resets):
+            self.reset_values[jdx][0] = 0.
+
+    cdef void _calltask(self, int tdx, int idx) nogil:
+        """Perform all level calls of the given task."""
+        cdef int jdx
+        for jdx in range(self.task_starts[tdx], self.task_starts[tdx+1]):
+            self.task_functions[jdx](self.task_models[jdx], idx)
+
+    cdef void _save(self, int idx) nogil:
+        """Perform all other calls and save all node values to their
+        series."""
+        cdef int jdx
+        for jdx in range(self.nmb_calls):
+            self.call_functions[jdx](self.call_models[jdx], idx)
+        for jdx in range(self.nmb_saves):
+            self.save_arrays[jdx][idx] = self.save_values[jdx][0]
+
+    def simulate(self, int idx_start, int idx_end):
+        """Perform all simulation steps from index `idx_start` (included)
+        to index `idx_end` (excluded).
+
+        The global interpreter lock is released during the simulation
+        when `nogil` is `True` (the default).  Then, all threads required
+        for the level calls are started only once.
+        """
+        if not self._ready:
+            self._allocate()
+        if self.nogil:
+            with nogil:
+                self._simulate(idx_start, idx_end)
+        else:
+            self._simulate(idx_start, idx_end)
@@ -90,6 +90,35 @@ Integration examples:
     | 18:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
     | 19:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
 
+    Performing the complete time loop with a compiled network runner
+    instead (see option `usenetworkrunner` of module
+    :mod:`~hydpy.core.optiontools`) does not change the results:
+
+    >>> with pub.options.usenetworkrunner(True):
+    ...     test()
+    |  date |  qin | qpin | qpout | qout | output |
+    -----------------------------------------------
+    | 00:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
+    | 01:00 |  3.0 |  3.0 |   2.2 |  2.2 |    2.2 |
+    | 02:00 |  8.0 |  8.0 |   3.6 |  3.6 |    3.6 |
+    | 03:00 | 13.0 | 13.0 |   6.9 |  6.9 |    6.9 |
+    | 04:00 | 11.0 | 11.0 |  10.1 | 10.1 |   10.1 |
+    | 05:00 |  8.0 |  8.0 |  10.7 | 10.7 |   10.7 |
+    | 06:00 |  5.0 |  5.0 |   8.8 |  8.8 |    8.8 |
+    | 07:00 |  4.0 |  4.0 |   6.3 |  6.3 |    6.3 |
+    | 08:00 |  3.0 |  3.0 |   4.5 |  4.5 |    4.5 |
+    | 09:00 |  2.0 |  2.0 |   3.3 |  3.3 |    3.3 |
+    | 10:00 |  2.0 |  2.0 |   2.5 |  2.5 |    2.5 |
+    | 11:00 |  2.0 |  2.0 |   2.1 |  2.1 |    2.1 |
+    | 12:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
+    | 13:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
+    | 14:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
+    | 15:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
+    | 16:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
+    | 17:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
+    | 18:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
+    | 19:00 |  2.0 |  2.0 |   2.0 |  2.0 |    2.0 |
+
     In the second example, the mimimum order the MA process is defined,
     which is one.  The autoregression (AR) process is of order two.  Note
     that negative AR coefficients are allowed (also note the opposite signs
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""This module implements test fixtures shared by different unit test
+modules."""
+# import...
+# ...from standard library
+from __future__ import division, print_function
+import os
+import shutil
+import tempfile
+import unittest
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy import pub
+from hydpy.core.devicetools import Element, Elements, Node, Nodes
+from hydpy.core.hydpytools import HydPy
+from hydpy.core.selectiontools import Selection
+from hydpy.core.timetools import Timegrid, Timegrids
+from hydpy.core import magictools
+from hydpy.models import hstream_v1
+from hydpy.benchmarks import benchmarktools
+from hydpy.benchmarks import projecttools
+from hydpy.benchmarks import topologytools
+
+
+class StreamTestCase(unittest.TestCase):
+    """Base class for tests on the network `in1 -> e1 -> out1`.
+
+    Element `e1` handles a `hstream_v1` model (cythonized, unless
+    `usecython` is set to `False`) with a lag of two and a damping
+    coefficient of one half.  The inlet node `in1` passes the values of
+    its `sim` series to `e1`.  Method :func:`prepare_nodeseries` prepares
+    the node series in RAM, the series of the model are left untouched.
+    """
+
+    usecython = True
+
+    def setUp(self):
+        self.printprogress = pub.options.printprogress
+        pub.options.printprogress = False
+        pub.timegrids = Timegrids(Timegrid('01.01.2000 00:00',
+                                           '02.01.2000 00:00',
+                                           '1h'))
+        element = Element('e1', inlets='in1', outlets='out1',
+                          keywords='river')
+        with pub.options.usecython(self.usecython):
+            model = magictools.prepare_model(hstream_v1, '1h')
+        model.parameters.control.lag.value = 2.
+        model.parameters.control.damp.value = .5
+        element.connect(model)
+        model.parameters.update()
+        model.sequences.states.qjoints(0.)
+        self.hp = HydPy(_worker=True)
+        self.hp.updatedevices(Selection('test', Nodes('in1', 'out1'),
+                                        Elements(element)))
+        self.hp.nodes.in1.deploy_mode = 'oldsim'
+
+    def tearDown(self):
+        pub.options.printprogress = self.printprogress
+        pub.timegrids = None
+        Node.clear_registry()
+        Element.clear_registry()
+
+    @property
+    def model(self):
+        """The `hstream_v1` model of element `e1`."""
+        return self.hp.elements.e1.model
+
+    def prepare_nodeseries(self, names=('sim',), inflow=None):
+        """Handle the series of both nodes with the given names in RAM
+        and pass the given `inflow` (by default `0, 1, ..., 23`) to the
+        `sim` series of node `in1`."""
+        for node in self.hp.nodes:
+            for name in names:
+                seq = getattr(node.sequences, name)
+                seq.ramflag = True
+                seq.diskflag = False
+                seq._setarray(numpy.zeros(len(pub.timegrids.init)))
+        if inflow is None:
+            inflow = numpy.arange(24.)
+        self.hp.nodes.in1.sequences.sim.series = inflow
+
+
+class ProjectTestCase(unittest.TestCase):
+    """Base class for tests on complete HydPy projects.
+
+    Method :func:`setUpClass` writes a synthetic project covering a chain
+    of three subbasins and a period of 40 days into a temporary directory
+    (see function :func:`~hydpy.benchmarks.projecttools.write_project`).
+    The land elements handle `hland_v1` and `lland_v2` models alternately,
+    which read their input series from `npy` files, and the routing
+    elements handle `hstream_v1` models.  Method :func:`prepare` returns a
+    :class:`~hydpy.core.hydpytools.HydPy` object with initialized models
+    and conditions, method :func:`simulate` performs a complete
+    simulation run.
+    """
+
+    usecython = True
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dirpath = tempfile.mkdtemp()
+        network = topologytools.chain(
+            3, landmodels=('hland_v1', 'lland_v2'),
+            routingmodels=('hstream_v1',))
+        projecttools.write_project(
+            network, cls.dirpath, projectname=benchmarktools.PROJECTNAME,
+            firstdate='01.01.2000', lastdate='10.02.2000')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.dirpath)
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(self.dirpath)
+        self.printprogress = pub.options.printprogress
+        pub.options.printprogress = False
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        pub.options.printprogress = self.printprogress
+        pub.timegrids = None
+        Node.clear_registry()
+        Element.clear_registry()
+
+    def prepare(self):
+        """Return a :class:`~hydpy.core.hydpytools.HydPy` object handling
+        the complete project with initialized models and conditions."""
+        Node.clear_registry()
+        Element.clear_registry()
+        hp = HydPy(benchmarktools.PROJECTNAME, _worker=True)
+        hp.preparenetwork()
+        with pub.options.usecython(self.usecython):
+            hp.init_models()
+        hp.loadconditions()
+        pub.sequencemanager.outputoverwrite = True
+        return hp
+
+    def simulate(self, hp=None, inputs=None, fluxes=None, sims=None,
+                 mode='serial'):
+        """Prepare all series of the given (or a new)
+        :class:`~hydpy.core.hydpytools.HydPy` object, perform a simulation
+        run, and return the final node series and model flux series in a
+        dictionary.
+
+        The dictionaries `inputs`, `fluxes`, and `sims` contain keyword
+        arguments for the methods
+        :func:`~hydpy.core.hydpytools.HydPy.prepare_inputseries`,
+        :func:`~hydpy.core.hydpytools.HydPy.prepare_fluxseries`, and
+        :func:`~hydpy.core.hydpytools.HydPy.prepare_simseries`.  Flux
+        series written into their external data files during the
+        simulation run are read from these files.
+        """
+        if hp is None:
+            hp = self.prepare()
+        hp.prepare_inputseries(**(inputs or {}))
+        hp.prepare_fluxseries(**(fluxes or {}))
+        hp.prepare_simseries(**(sims or {}))
+        hp.doit(mode)
+        results = {}
+        for node in hp.nodes:
+            results[node.name] = node.sequences.sim.series.copy()
+        for element in hp.elements:
+            fluxes = getattr(element.model.sequences, 'fluxes', None)
+            if fluxes is None:
+                continue
+            for (name, seq) in fluxes:
+                key = '%s.%s' % (element.name, name)
+                if seq.stream:
+                    results[key] = seq.read_ext()[1]
+                else:
+                    results[key] = seq.series.copy()
+        return results
+
+    def assertResults(self, results, reference):
+        """Check that the given results equal the reference results
+        (some flux sequences are `nan` when not required)."""
+        self.assertEqual(sorted(results.keys()), sorted(reference.keys()))
+        for (key, values) in reference.items():
+            numpy.testing.assert_array_equal(
+                results[key], values, 'Results of `%s` differ.' % key)
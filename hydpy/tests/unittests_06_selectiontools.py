@@ -69,14 +69,12 @@ class Test02SelectionSelect(unittest.TestCase):
         Node.clear_registry()
         Element.clear_registry()
 
-    def test_01_nextelement(self):
-        nodes, elements = self.complete._nextelement(self.e1,
-                                                  Nodes(), Elements())
+    def test_01_getby_upstream_element(self):
+        nodes, elements = self.complete.getby_upstream(self.e1)
         self.assertEqual(nodes, Nodes())
         self.assertEqual(elements, Elements(self.e1))
-    def test_02_nextnode(self):
-        nodes, elements = self.complete._nextnode(self.n_Q1,
-                                                  Nodes(), Elements())
+    def test_02_getby_upstream_node(self):
+        nodes, elements = self.complete.getby_upstream(self.n_Q1)
         self.assertEqual(nodes, Nodes(self.n_Q1))
         self.assertEqual(elements, Elements(self.e1, self.e2))
     def test_03_select_upstream(self):
@@ -0,0 +1,1503 @@
+# import...
+# ...from standard library
+from __future__ import division, print_function
+import io
+import itertools
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+import warnings
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy import pub
+from hydpy.core.devicetools import *
+from hydpy.core.selectiontools import *
+from hydpy.core.hydpytools import *
+from hydpy.core.timetools import *
+from hydpy.core import magictools
+from hydpy.core import objecttools
+from hydpy.core import sequencetools
+from hydpy.core import seriestools
+from hydpy.models import arma_v1
+from hydpy.tests import fixturetools
+
+
+class Test01DoIt(unittest.TestCase):
+
+    def setUp(self):
+        # in0 -> e0 -> out0 (repeated for three independent networks)
+        self.printprogress = pub.options.printprogress
+        pub.options.printprogress = False
+        pub.timegrids = Timegrids(Timegrid('01.01.2000 00:00',
+                                           '02.01.2000 00:00',
+                                           '1h'))
+        nodes = Nodes()
+        elements = Elements()
+        for idx in range(3):
+            inlet = Node('in%d' % idx)
+            outlet = Node('out%d' % idx)
+            element = Element('e%d' % idx, inlets=inlet, outlets=outlet)
+            model = magictools.prepare_model(arma_v1, '1h')
+            model.parameters.control.responses(((1.1, -0.3), (0.2,)))
+            element.connect(model)
+            model.parameters.update()
+            nodes += (inlet, outlet)
+            elements += element
+        self.hp = HydPy(_worker=True)
+        self.hp.updatedevices(Selection('test', nodes, elements))
+        for node in self.hp.nodes:
+            if not node.entries:
+                node.deploy_mode = 'oldsim'
+            sim = node.sequences.sim
+            sim.ramflag = True
+            sim.diskflag = False
+            sim._setarray(numpy.zeros(len(pub.timegrids.init)))
+        for (idx, node) in enumerate(self.hp.nodes):
+            if not node.entries:
+                node.sequences.sim.series = numpy.arange(24.)*(idx+1)
+        for element in self.hp.elements:
+            element.prepare_fluxseries()
+
+    def tearDown(self):
+        pub.options.printprogress = self.printprogress
+        pub.timegrids = None
+        Node.clear_registry()
+        Element.clear_registry()
+
+    def simulate(self, **kwargs):
+        for element in self.hp.elements:
+            element.model.sequences.logs.login(2.)
+            element.model.sequences.logs.logout(2.)
+        self.hp.doit(**kwargs)
+        series = [node.sequences.sim.series.copy() for node in self.hp.nodes]
+        series.extend(element.model.sequences.fluxes.qout.series.copy()
+                      for element in self.hp.elements)
+        series.extend(element.model.sequences.logs.logout.values.copy()
+                      for element in self.hp.elements)
+        for element in self.hp.elements:
+            element.model.sequences.fluxes.qout.series = 0.
+        for node in self.hp.nodes:
+            if node.entries:
+                node.sequences.sim.series = 0.
+        return series
+
+    def assertEqualSeries(self, series1, series2):
+        self.assertEqual(len(series1), len(series2))
+        for (values1, values2) in zip(series1, series2):
+            self.assertTrue(numpy.all(values1 == values2))
+
+    def test_01_serial(self):
+        series = self.simulate()
+        self.assertTrue(numpy.all(series[3][1:] > 0.))
+        self.assertEqualSeries(series, self.simulate(mode='serial'))
+    def test_02_networkrunner(self):
+        series = self.simulate()
+        with pub.options.usenetworkrunner(True):
+            self.assertEqualSeries(series, self.simulate())
+    @unittest.skipIf(sys.platform.startswith('win'),
+                     'worker processes cannot inherit the models')
+    def test_03_processes(self):
+        series = self.simulate()
+        self.assertEqualSeries(
+            series, self.simulate(mode='processes', nmb_workers=2))
+    def test_04_wrongmode(self):
+        with self.assertRaises(ValueError):
+            self.hp.doit(mode='wrong')
+    def test_05_threads(self):
+        series = self.simulate()
+        self.assertEqualSeries(
+            series, self.simulate(mode='threads', nmb_workers=2))
+    def test_06_batched(self):
+        series = self.simulate()
+        self.assertEqualSeries(series, self.simulate(mode='batched'))
+    def test_07_checkpoint(self):
+        self.assertCheckpoint()
+    def test_08_checkpoint_aggregation(self):
+        for element in self.hp.elements:
+            element.model.sequences.fluxes.qout.activate_aggregation(
+                'mean', '8h')
+        self.assertCheckpoint()
+
+    def assertCheckpoint(self):
+        series = self.simulate()
+        dirpath = tempfile.mkdtemp()
+        try:
+            path = os.path.join(dirpath, 'checkpoint.npz')
+            self.assertEqualSeries(
+                series, self.simulate(checkpointpath=path, checkpointstep=10))
+            with self.assertRaises(ValueError):
+                self.hp.doit(mode='threads', checkpointpath=path)
+            for element in self.hp.elements:
+                element.model.sequences.logs.login(0.)
+                element.model.sequences.logs.logout(0.)
+                element.model.sequences.fluxes.qout.series = 0.
+            for node in self.hp.nodes:
+                if node.entries:
+                    node.sequences.sim.series = 0.
+            self.hp.resume(path)
+        finally:
+            shutil.rmtree(dirpath)
+        results = [node.sequences.sim.series for node in self.hp.nodes]
+        results.extend(element.model.sequences.fluxes.qout.series
+                       for element in self.hp.elements)
+        results.extend(element.model.sequences.logs.logout.values
+                       for element in self.hp.elements)
+        self.assertEqualSeries(series, results)
+
+
+class Test02DoItPython(Test01DoIt):
+
+    def setUp(self):
+        with pub.options.usecython(False):
+            Test01DoIt.setUp(self)
+
+
+class Test03ElementLevels(unittest.TestCase):
+
+    def setUp(self):
+        # in1 -> e1 + in2 -> e2 -> n1 -> e3 -> n2 -> e4 -> out1
+        # in3 -> e5 -> out2
+        self.printprogress = pub.options.printprogress
+        pub.options.printprogress = False
+        pub.timegrids = Timegrids(Timegrid('01.01.2000 00:00',
+                                           '02.01.2000 00:00',
+                                           '1h'))
+        connections = (('e1', 'in1', 'n1'), ('e2', 'in2', 'n1'),
+                       ('e3', 'n1', 'n2'), ('e4', 'n2', 'out1'),
+                       ('e5', 'in3', 'out2'))
+        nodes = Nodes()
+        elements = Elements()
+        for (name, inlet, outlet) in connections:
+            element = Element(name, inlets=inlet, outlets=outlet)
+            model = magictools.prepare_model(arma_v1, '1h')
+            model.parameters.control.responses(((), (0.2, 0.4, 0.3, 0.1)))
+            element.connect(model)
+            model.parameters.update()
+            model.sequences.logs.login(0.)
+            model.sequences.logs.logout(0.)
+            nodes += (inlet, outlet)
+            elements += element
+        self.hp = HydPy(_worker=True)
+        self.hp.updatedevices(Selection('test', nodes, elements))
+        for node in self.hp.nodes:
+            if not node.entries:
+                node.deploy_mode = 'oldsim'
+            sim = node.sequences.sim
+            sim.ramflag = True
+            sim.diskflag = False
+            sim._setarray(numpy.zeros(len(pub.timegrids.init)))
+            if not node.entries:
+                sim.series = 1.
+
+    def tearDown(self):
+        pub.options.printprogress = self.printprogress
+        pub.timegrids = None
+        Node.clear_registry()
+        Element.clear_registry()
+
+    def test_01_elementlevels(self):
+        levels = self.hp.elementlevels
+        self.assertEqual(len(levels), 3)
+        self.assertEqual(tuple(levels[0].names), ('e1', 'e2', 'e5'))
+        self.assertEqual(tuple(levels[1].names), ('e3',))
+        self.assertEqual(tuple(levels[2].names), ('e4',))
+    def test_02_threads(self):
+        self.hp.doit()
+        series1 = self.hp.nodes.out1.sequences.sim.series.copy()
+        series2 = self.hp.nodes.out2.sequences.sim.series.copy()
+        for element in self.hp.elements:
+            element.model.sequences.logs.login(0.)
+            element.model.sequences.logs.logout(0.)
+        self.hp.doit(mode='threads', nmb_workers=3)
+        self.assertAlmostEqual(series1[-1], 2.)
+        self.assertAlmostEqual(series2[-1], 1.)
+        self.assertTrue(numpy.all(
+            series1 == self.hp.nodes.out1.sequences.sim.series))
+        self.assertTrue(numpy.all(
+            series2 == self.hp.nodes.out2.sequences.sim.series))
+    def test_03_batched(self):
+        self.hp.doit()
+        series1 = self.hp.nodes.out1.sequences.sim.series.copy()
+        series2 = self.hp.nodes.n1.sequences.sim.series.copy()
+        for element in self.hp.elements:
+            element.model.sequences.logs.login(0.)
+            element.model.sequences.logs.logout(0.)
+        self.hp.doit(mode='batched')
+        self.assertTrue(numpy.all(
+            series1 == self.hp.nodes.out1.sequences.sim.series))
+        self.assertTrue(numpy.all(
+            series2 == self.hp.nodes.n1.sequences.sim.series))
+    def test_04_resimulate(self):
+        nodes = self.hp.nodes
+        self.hp.resimulate()
+        series1 = nodes.out1.sequences.sim.series.copy()
+        model = self.hp.elements.e3.model
+        model.parameters.control.responses(((), (0.1, 0.2, 0.3, 0.4)))
+        model.parameters.update()
+        nodes.out2.sequences.sim.series = -1.
+        self.hp.resimulate()
+        self.assertTrue(numpy.all(nodes.out2.sequences.sim.series == -1.))
+        self.assertEqual(nodes.n1.deploy_mode, 'newsim')
+        self.assertEqual(len(self.hp.elements), 5)
+        series2 = nodes.out1.sequences.sim.series.copy()
+        series3 = nodes.n2.sequences.sim.series.copy()
+        self.assertFalse(numpy.all(series1 == series2))
+        for element in self.hp.elements:
+            element.model.sequences.logs.login(0.)
+            element.model.sequences.logs.logout(0.)
+        self.hp.doit()
+        self.assertTrue(numpy.all(
+            series2 == nodes.out1.sequences.sim.series))
+        self.assertTrue(numpy.all(
+            series3 == nodes.n2.sequences.sim.series))
+    def test_05_threads_serial(self):
+        self.hp.doit()
+        series = self.hp.nodes.out1.sequences.sim.series.copy()
+        for (nmb_workers, fastcython) in ((1, True), (3, False)):
+            for element in self.hp.elements:
+                element.model.sequences.logs.login(0.)
+                element.model.sequences.logs.logout(0.)
+            with pub.options.fastcython(fastcython):
+                self.hp.doit(mode='threads', nmb_workers=nmb_workers)
+            self.assertTrue(numpy.all(
+                series == self.hp.nodes.out1.sequences.sim.series))
+
+
+class Test05Profiling(fixturetools.StreamTestCase):
+
+    usecython = False
+
+    def setUp(self):
+        fixturetools.StreamTestCase.setUp(self)
+        self.prepare_nodeseries()
+
+    def test_01_profile(self):
+        self.hp.doit()
+        series = self.hp.nodes.out1.sequences.sim.series.copy()
+        self.assertEqual(len(self.hp.profile), 0)
+        self.hp.elements.e1.model.sequences.states.qjoints(0.)
+        with pub.options.profiling(True):
+            self.hp.doit()
+        self.assertTrue(numpy.all(
+            self.hp.nodes.out1.sequences.sim.series == series))
+        report = self.hp.profile
+        self.assertEqual(
+            sorted(row[2] for row in report),
+            ['calc_qjoints_v1', 'loaddata', 'new2old',
+             'pass_q_v1', 'pick_q_v1', 'savedata'])
+        for row in report:
+            self.assertEqual(row[:2], ('e1', 'hstream_v1'))
+            self.assertEqual(row[4], 24)
+            self.assertGreaterEqual(row[3], 0.)
+        self.assertEqual(len(report.per_element()), 1)
+        self.hp.resetprofile()
+        self.assertEqual(len(self.hp.profile), 0)
+
+    def test_02_deactivate(self):
+        model = self.hp.elements.e1.model
+        with pub.options.profiling(True):
+            self.hp.doit()
+        self.assertIn('_RUN_METHODS', vars(model))
+        self.hp.doit()
+        self.assertNotIn('_RUN_METHODS', vars(model))
+        self.assertNotIn('loaddata', vars(model))
+        self.assertEqual(len(self.hp.profile), 0)
+
+
+class Test06LongChain(unittest.TestCase):
+
+    def setUp(self):
+        # e_2999 -> n_2999 -> e_2998 -> ... -> e_0 -> n_0
+        self.size = 3000
+        nodes = Nodes()
+        elements = Elements()
+        for idx in range(self.size):
+            inlet = 'n_%d' % (idx+1) if idx+1 < self.size else None
+            nodes += Node('n_%d' % idx)
+            elements += Element('e_%d' % idx,
+                                inlets=inlet, outlets='n_%d' % idx)
+        self.hp = HydPy(_worker=True)
+        self.hp.updatedevices(Selection('test', nodes, elements))
+
+    def tearDown(self):
+        Node.clear_registry()
+        Element.clear_registry()
+
+    def test_01_deviceorder(self):
+        positions = dict((device.name, idx) for (idx, device)
+                         in enumerate(self.hp.deviceorder))
+        self.assertEqual(len(positions), 2*self.size)
+        for element in self.hp.elements:
+            for node in element.inlets:
+                self.assertLess(positions[node.name], positions[element.name])
+            for node in element.outlets:
+                self.assertLess(positions[element.name], positions[node.name])
+
+    def test_02_endnodes(self):
+        self.assertEqual(self.hp.endnodes, Nodes('n_0'))
+
+    def test_03_select_upstream(self):
+        selection = Selection('test', self.hp.nodes, self.hp.elements)
+        selection.select_upstream(self.hp.nodes.n_10)
+        self.assertEqual(len(selection.nodes), self.size-10)
+        self.assertEqual(len(selection.elements), self.size-10)
+
+    def test_04_distinct_networks(self):
+        networks = self.hp.distinct_networks
+        self.assertEqual(networks.names, ('n_0',))
+        self.assertEqual(len(networks.n_0.elements), self.size)
+
+
+class Test07DistinctNetworks(unittest.TestCase):
+
+    def setUp(self):
+        # ea1 -> na1 -> ea2 -> na2 + na3
+        # eb1 -> nb1
+        # nc1 -> ec1 -> nc2 (ec1 receives from nb1)
+        # nd1
+        Element('ea1', outlets='na1')
+        Element('ea2', inlets='na1', outlets=('na2', 'na3'))
+        Element('eb1', outlets='nb1')
+        Element('ec1', inlets='nc1', outlets='nc2', receivers='nb1')
+        Node('nd1')
+        self.hp = HydPy(_worker=True)
+        self.hp.updatedevices(Selection('test',
+                                        Node.registered_nodes(),
+                                        Element.registered_elements()))
+
+    def tearDown(self):
+        Node.clear_registry()
+        Element.clear_registry()
+
+    def test_01_components(self):
+        networks = self.hp.distinct_networks
+        self.assertEqual(networks.names, ('na2', 'nb1'))
+        self.assertEqual(networks.na2.nodes, Nodes('na1', 'na2', 'na3'))
+        self.assertEqual(networks.na2.elements, Elements('ea1', 'ea2'))
+        self.assertEqual(networks.nb1.nodes, Nodes('nb1', 'nc1', 'nc2'))
+        self.assertEqual(networks.nb1.elements, Elements('eb1', 'ec1'))
+
+    def test_02_cache(self):
+        networks = self.hp.distinct_networks
+        self.assertIs(self.hp.distinct_networks, networks)
+        elements = self.hp.elements.copy()
+        del elements.ec1
+        self.hp.updatedevices(Selection('test', self.hp.nodes, elements))
+        networks = self.hp.distinct_networks
+        self.assertEqual(networks.names, ('na2', 'nb1'))
+        self.assertEqual(networks.nb1.nodes, Nodes('nb1'))
+        self.assertEqual(networks.nb1.elements, Elements('eb1'))
+
+
+class Test08DiskMode(fixturetools.StreamTestCase):
+
+    usecython = False
+    singleprecision = False
+
+    def setUp(self):
+        with pub.options.singleprecision(self.singleprecision):
+            fixturetools.StreamTestCase.setUp(self)
+        self.dirpath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        fixturetools.StreamTestCase.tearDown(self)
+        shutil.rmtree(self.dirpath)
+
+    def prepare(self, diskflag):
+        qjoints = self.hp.elements.e1.model.sequences.states.qjoints
+        qjoints(0.)
+        sequences = [node.sequences.sim for node in self.hp.nodes]
+        sequences.append(qjoints)
+        for seq in sequences:
+            seq.deactivate_disk()
+            seq.deactivate_ram()
+            seq.ramflag = not diskflag
+            seq.diskflag = diskflag
+            seq.filepath_int = os.path.join(
+                self.dirpath, '%s_%s.bin' % (objecttools.devicename(seq),
+                                             seq.name))
+            seq.zero_int()
+            seq.update_fastaccess()
+        self.hp.nodes.in1.sequences.sim.series = numpy.arange(24.)
+
+    def simulate(self, diskflag):
+        self.prepare(diskflag)
+        self.hp.doit()
+        return (self.hp.nodes.out1.sequences.sim.series.copy(),
+                self.hp.elements.e1.model.sequences.states.qjoints.series)
+
+    def test_01_blocksizes(self):
+        qjoints = self.model.sequences.states.qjoints
+        self.assertEqual(qjoints.singleflag, self.singleprecision)
+        dtype = numpy.float32 if self.singleprecision else numpy.float64
+        qjoints.singleflag = False
+        sim_double, qjoints_double = self.simulate(False)
+        qjoints.singleflag = self.singleprecision
+        sim_ram, qjoints_ram = self.simulate(False)
+        self.assertEqual(qjoints_ram.dtype, dtype)
+        self.assertTrue(numpy.all(sim_ram == sim_double))
+        self.assertTrue(numpy.all(
+            qjoints_ram == qjoints_double.astype(dtype)))
+        for blocksize in (0, 1, 5, 24, 100):
+            with pub.options.diskblocksize(blocksize):
+                sim_disk, qjoints_disk = self.simulate(True)
+            self.assertEqual(qjoints_disk.dtype, dtype)
+            self.assertTrue(numpy.all(sim_disk == sim_ram))
+            self.assertTrue(numpy.all(qjoints_disk == qjoints_ram))
+
+    def test_02_batched(self):
+        pub.timegrids.sim = Timegrid('01.01.2000 06:00',
+                                     '01.01.2000 18:00',
+                                     '1h')
+        outside = numpy.ones(24, dtype=bool)
+        outside[6:18] = False
+        results = {}
+        for mode in ('serial', 'batched'):
+            for diskflag in (False, True):
+                self.prepare(diskflag)
+                sim = self.hp.nodes.out1.sequences.sim
+                sim.series = -numpy.arange(24.)
+                self.hp.doit(mode=mode)
+                self.assertEqual(sim.diskflag, diskflag)
+                results[mode, diskflag] = sim.series.copy()
+                self.assertTrue(numpy.all(
+                    results[mode, diskflag][outside] ==
+                    -numpy.arange(24.)[outside]))
+        self.assertTrue(numpy.any(results['serial', False][6:18] > 0.))
+        for result in results.values():
+            self.assertTrue(numpy.all(result == results['serial', False]))
+
+    def test_03_openfiles(self):
+        self.prepare(True)
+        states = self.model.sequences.states
+        qjoints = states.qjoints
+        expected = -numpy.ones((24, 3))
+        expected[5:10] = numpy.arange(5., 10.)[:, None]
+        for blocksize in (0, 3, 100):
+            qjoints.series = -1.
+            dtype = qjoints.series.dtype
+            with pub.options.diskblocksize(blocksize):
+                states.openfiles(5)
+                for idx in range(5, 10):
+                    qjoints(idx)
+                    states.savedata(idx)
+                    if not blocksize:
+                        values = numpy.fromfile(qjoints.filepath_int, dtype)
+                        self.assertEqual(values[3*idx], idx)
+                states.closefiles()
+            self.assertTrue(numpy.all(qjoints.series == expected))
+            values = numpy.fromfile(qjoints.filepath_int, dtype)
+            self.assertTrue(numpy.all(values == expected.flatten()))
+
+    def test_04_networkrunner(self):
+        sim_ram, qjoints_ram = self.simulate(False)
+        for blocksize in (0, 5):
+            with pub.options.usenetworkrunner(True), \
+                    pub.options.diskblocksize(blocksize):
+                sim_disk, qjoints_disk = self.simulate(True)
+            self.assertTrue(self.hp.nodes.out1.sequences.sim.diskflag)
+            self.assertTrue(numpy.all(sim_disk == sim_ram))
+            self.assertTrue(numpy.all(qjoints_disk == qjoints_ram))
+
+
+class Test08DiskModeSingle(Test08DiskMode):
+
+    singleprecision = True
+
+
+class Test08DiskModeCython(Test08DiskMode):
+
+    usecython = True
+
+
+class Test08DiskModeCythonSingle(Test08DiskMode):
+
+    usecython = True
+    singleprecision = True
+
+
+class Test09Instances(unittest.TestCase):
+
+    def test_01_worker(self):
+        nmb_instances = HydPy.nmb_instances
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            HydPy(_worker=True)
+            HydPy(_worker=True)
+        self.assertEqual(HydPy.nmb_instances, nmb_instances)
+
+
+class Test10Helpers(fixturetools.StreamTestCase):
+
+    def test_01_seriesflags(self):
+        sim = self.hp.nodes.out1.sequences.sim
+        self.assertFalse(hasmemory(sim))
+        self.assertEqual(get_seriesflags(self.hp.nodes, self.hp.elements), {})
+        self.prepare_nodeseries()
+        self.assertTrue(hasmemory(sim))
+        self.assertIs(
+            get_sequence(self.hp.nodes, self.hp.elements,
+                         ('out1', 'nodes', 'sim')), sim)
+        qjoints = self.model.sequences.states.qjoints
+        self.assertIs(
+            get_sequence(self.hp.nodes, self.hp.elements,
+                         ('e1', 'states', 'qjoints')), qjoints)
+        dirpath = tempfile.mkdtemp()
+        try:
+            qjoints.dirpath_int = dirpath
+            qjoints.activate_disk()
+            self.assertEqual(
+                get_seriesflags(self.hp.nodes, self.hp.elements),
+                {('in1', 'nodes', 'sim'): True,
+                 ('out1', 'nodes', 'sim'): True,
+                 ('e1', 'states', 'qjoints'): False})
+            qjoints.deactivate_disk()
+        finally:
+            shutil.rmtree(dirpath)
+
+    def test_02_conditions(self):
+        qjoints = self.model.sequences.states.qjoints
+        qjoints(1., 2., 3.)
+        conditions = get_conditions(self.hp.elements)
+        self.assertEqual(sorted(conditions['e1'].keys()), ['qjoints'])
+        qjoints(0.)
+        self.assertEqual(list(conditions['e1']['qjoints']), [1., 2., 3.])
+        set_conditions(self.hp.elements, conditions)
+        self.assertEqual(list(qjoints.values), [1., 2., 3.])
+        self.assertEqual(list(qjoints.old), [1., 2., 3.])
+
+
+class Test11Aggregation(fixturetools.StreamTestCase):
+
+    def setUp(self):
+        fixturetools.StreamTestCase.setUp(self)
+        self.prepare_nodeseries()
+        self.dirpath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        fixturetools.StreamTestCase.tearDown(self)
+        shutil.rmtree(self.dirpath)
+
+    def simulate(self, mode=None, blocksize=None):
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.deactivate_ram()
+        qjoints.deactivate_disk()
+        qjoints.dirpath_int = self.dirpath
+        if blocksize is None:
+            qjoints.activate_ram()
+        else:
+            qjoints.activate_disk()
+        if mode is None:
+            qjoints.deactivate_aggregation()
+        else:
+            qjoints.activate_aggregation(mode, '4h')
+        qjoints(0.)
+        with pub.options.diskblocksize(blocksize or 0):
+            self.hp.doit()
+        return qjoints.series.copy()
+
+    def test_01_modes(self):
+        blocks = self.simulate().reshape(6, 4, -1)
+        self.assertTrue(numpy.all(numpy.diff(blocks, axis=1) != 0.))
+        expected = {'last': blocks[:, -1],
+                    'sum': numpy.sum(blocks, axis=1),
+                    'mean': numpy.mean(blocks, axis=1),
+                    'min': numpy.min(blocks, axis=1),
+                    'max': numpy.max(blocks, axis=1)}
+        for blocksize in (None, 0, 1, 5):
+            for (mode, values) in expected.items():
+                series = self.simulate(mode, blocksize)
+                self.assertEqual(series.shape, values.shape)
+                self.assertTrue(numpy.allclose(series, values),
+                                (mode, blocksize, series, values))
+        self.assertTrue(numpy.all(
+            self.simulate(blocksize=5) == blocks.reshape(24, -1)))
+
+    def test_02_zero_factor(self):
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.activate_ram()
+        qjoints.fastaccess._qjoints_aggfactor = 0
+        qjoints(1.)
+        self.hp.doit()
+        self.assertTrue(numpy.all(qjoints.series[-1] == qjoints.values))
+
+    def test_03_prepare(self):
+        full = self.simulate()
+        expected = numpy.mean(full.reshape(6, 4, -1), axis=1)
+        qjoints = self.model.sequences.states.qjoints
+        element = self.hp.elements.e1
+        for (prepare, ramflag) in ((self.hp.prepare_stateseries, True),
+                                   (self.hp.prepare_stateseries, False),
+                                   (element.prepare_stateseries, True)):
+            for aggregation in (('mean', '4h'), None, ('mean', '4h'), None):
+                qjoints.deactivate_ram()
+                qjoints.deactivate_disk()
+                prepare(ramflag, aggregation=aggregation)
+                self.assertEqual(qjoints.aggregation, aggregation)
+                self.assertEqual(qjoints.ramflag, ramflag)
+                qjoints(0.)
+                self.hp.doit()
+                if aggregation is None:
+                    self.assertTrue(numpy.all(qjoints.series == full))
+                else:
+                    self.assertTrue(numpy.allclose(qjoints.series, expected))
+
+
+class Test12AggregationPython(Test11Aggregation):
+
+    usecython = False
+
+
+class Test13Recording(fixturetools.StreamTestCase):
+
+    def setUp(self):
+        fixturetools.StreamTestCase.setUp(self)
+        self.prepare_nodeseries()
+        self.dirpath = tempfile.mkdtemp()
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.dirpath_int = self.dirpath
+        qjoints.filetype_ext = 'asc'
+        qjoints.filepath_ext = os.path.join(self.dirpath, 'qjoints.asc')
+        self.full = self.simulate()
+
+    def tearDown(self):
+        fixturetools.StreamTestCase.tearDown(self)
+        shutil.rmtree(self.dirpath)
+
+    def simulate(self, indices=None, weights=None, aggregation=None,
+                 blocksize=None, window=None):
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.deactivate_ram()
+        qjoints.deactivate_disk()
+        qjoints.deactivate_aggregation()
+        qjoints.deactivate_recording()
+        if blocksize is None:
+            qjoints.activate_ram()
+        else:
+            qjoints.activate_disk()
+        if (indices is not None) or (weights is not None):
+            qjoints.activate_recording(indices, weights)
+        if aggregation:
+            qjoints.activate_aggregation(aggregation, '4h')
+        if window:
+            qjoints.activate_stream(window)
+        qjoints(0.)
+        with pub.options.diskblocksize(blocksize or 0):
+            self.hp.doit()
+        if window:
+            return qjoints.read_ext()[1]
+        return qjoints.series.copy()
+
+    def assertAllClose(self, values1, values2):
+        self.assertEqual(values1.shape, values2.shape)
+        self.assertTrue(numpy.allclose(values1, values2), (values1, values2))
+
+    def test_01_indices(self):
+        self.assertEqual(self.full.shape, (24, 3))
+        self.assertTrue(numpy.all(self.full[1:, 1] > 0.))
+        self.assertAllClose(self.simulate(indices=[2, 0]),
+                            self.full[:, [2, 0]])
+        self.assertAllClose(self.simulate(indices=[1]), self.full[:, [1]])
+
+    def test_02_vector(self):
+        weights = numpy.array([.2, .3, .5])
+        series = self.simulate(weights=weights)
+        self.assertAllClose(series, numpy.dot(weights, self.full.T))
+        fastaccess = self.model.sequences.states.fastaccess
+        self.assertEqual(numpy.shape(fastaccess._qjoints_array), (24, 1))
+
+    def test_03_matrix(self):
+        weights = numpy.array([[.2, .3, .5], [1., 0., -1.]])
+        expected = numpy.dot(weights, self.full.T).T
+        self.assertAllClose(self.simulate(weights=weights), expected)
+        for blocksize in (0, 5):
+            self.assertAllClose(
+                self.simulate(weights=weights, blocksize=blocksize),
+                expected)
+
+    def test_04_aggregation(self):
+        weights = numpy.array([[.2, .3, .5], [1., 0., -1.]])
+        blocks = numpy.dot(weights, self.full.T).T.reshape(6, 4, 2)
+        self.assertAllClose(
+            self.simulate(weights=weights, aggregation='mean'),
+            numpy.mean(blocks, axis=1))
+        self.assertAllClose(
+            self.simulate(weights=weights[0], aggregation='max'),
+            numpy.max(blocks[:, :, 0], axis=1))
+        self.assertAllClose(
+            self.simulate(indices=[2], aggregation='sum', blocksize=5),
+            numpy.sum(self.full[:, [2]].reshape(6, 4, 1), axis=1))
+
+    def test_05_stream(self):
+        weights = numpy.array([[.2, .3, .5], [1., 0., -1.]])
+        self.assertAllClose(
+            self.simulate(weights=weights, window=5),
+            numpy.dot(weights, self.full.T).T)
+        self.assertAllClose(
+            self.simulate(weights=weights[1], window=7),
+            numpy.dot(weights[1], self.full.T))
+        self.assertAllClose(
+            self.simulate(indices=[0, 2], window=24), self.full[:, [0, 2]])
+
+    def test_06_stream_checkpoint(self):
+        qjoints = self.model.sequences.states.qjoints
+        path = os.path.join(self.dirpath, 'checkpoint.npz')
+        checkpoint = self.hp.checkpoint
+        contents = {}
+
+        def record(path_, idx):
+            with open(qjoints.filepath_ext, 'rb') as file_:
+                contents[idx] = file_.read()
+            checkpoint(path_, idx)
+
+        for (filetype, runner) in itertools.product(('asc', 'npy'),
+                                                    (False, True)):
+            qjoints.filetype_ext = filetype
+            qjoints.filepath_ext = os.path.join(self.dirpath,
+                                                'qjoints.' + filetype)
+            with pub.options.usenetworkrunner(runner):
+                self.simulate(window=7)
+                with open(qjoints.filepath_ext, 'rb') as file_:
+                    full = file_.read()
+                contents.clear()
+                self.hp.checkpoint = record
+                try:
+                    qjoints(0.)
+                    self.hp.doit(checkpointpath=path, checkpointstep=10)
+                finally:
+                    del self.hp.checkpoint
+                self.assertEqual(sorted(contents), [10, 20])
+                for (idx, content) in contents.items():
+                    if filetype == 'asc':
+                        self.assertEqual(
+                            content, b''.join(full.splitlines(True)[:3+idx]))
+                    else:
+                        numpy.testing.assert_array_equal(
+                            numpy.load(io.BytesIO(content))[:13+idx],
+                            numpy.load(io.BytesIO(full))[:13+idx])
+                with open(qjoints.filepath_ext, 'wb') as file_:
+                    file_.write(contents[20])
+                    if filetype == 'asc':
+                        file_.write(b'1.0\t1.0\t1.0\n')
+                qjoints(0.)
+                self.hp.resume(path)
+                with open(qjoints.filepath_ext, 'rb') as file_:
+                    self.assertEqual(file_.read(), full)
+
+
+class Test14RecordingPython(Test13Recording):
+
+    usecython = False
+
+
+class Test15Precision(fixturetools.StreamTestCase):
+
+    def setUp(self):
+        fixturetools.StreamTestCase.setUp(self)
+        self.prepare_nodeseries()
+        self.dirpath = tempfile.mkdtemp()
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.dirpath_int = self.dirpath
+        qjoints.filetype_ext = 'asc'
+        qjoints.filepath_ext = os.path.join(self.dirpath, 'qjoints.asc')
+        qjoints.activate_ram()
+        self.hp.doit()
+        self.full = qjoints.series.copy()
+        self.assertEqual(self.full.dtype, numpy.float64)
+
+    def tearDown(self):
+        fixturetools.StreamTestCase.tearDown(self)
+        shutil.rmtree(self.dirpath)
+
+    def simulate(self, **kwargs):
+        self.model.sequences.states.qjoints(0.)
+        self.hp.doit(**kwargs)
+        return self.model.sequences.states.qjoints.series.copy()
+
+    def test_01_toggle(self):
+        qjoints = self.model.sequences.states.qjoints
+        for blocksize in (None, 0, 5):
+            qjoints.deactivate_ram()
+            if blocksize is None:
+                qjoints.activate_ram()
+            else:
+                qjoints.activate_disk()
+            with pub.options.diskblocksize(blocksize or 0):
+                series = self.simulate()
+                self.assertTrue(numpy.all(series == self.full))
+                qjoints.singleflag = True
+                self.assertEqual(qjoints.series.dtype, numpy.float32)
+                self.assertTrue(numpy.all(
+                    qjoints.series == self.full.astype(numpy.float32)))
+                self.assertTrue(numpy.allclose(
+                    qjoints.series, self.full, rtol=1e-6, atol=0.))
+                series = self.simulate()
+                self.assertTrue(numpy.all(
+                    series == self.full.astype(numpy.float32)))
+                qjoints.singleflag = False
+                self.assertEqual(qjoints.series.dtype, numpy.float64)
+                self.assertTrue(numpy.all(qjoints.series == series))
+            qjoints.deactivate_disk()
+
+    def test_02_checkpoint(self):
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.singleflag = True
+        path = os.path.join(self.dirpath, 'checkpoint.npz')
+        series = self.simulate(checkpointpath=path, checkpointstep=10)
+        qjoints.series = 0.
+        qjoints(0.)
+        self.hp.resume(path)
+        self.assertEqual(qjoints.series.dtype, numpy.float32)
+        self.assertTrue(numpy.all(qjoints.series == series))
+        self.assertTrue(numpy.all(
+            series == self.full.astype(numpy.float32)))
+
+    def test_03_stream(self):
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.singleflag = True
+        qjoints.activate_stream(5)
+        self.assertEqual(qjoints.series.dtype, numpy.float32)
+        qjoints(0.)
+        self.hp.doit()
+        series = qjoints.read_ext()[1]
+        self.assertTrue(numpy.all(
+            series == self.full.astype(numpy.float32)))
+
+
+class Test16PrecisionPython(Test15Precision):
+
+    usecython = False
+
+
+class _SubSequences(object):
+
+    def __init__(self):
+        self.fastaccess = sequencetools.FastAccess()
+
+
+class _Input0D(sequencetools.InputSequence):
+    NDIM, NUMERIC = 0, False
+
+
+class _Input1D(sequencetools.InputSequence):
+    NDIM, NUMERIC = 1, False
+
+
+class Test17Sharing(fixturetools.ProjectTestCase):
+
+    def setUp(self):
+        fixturetools.ProjectTestCase.setUp(self)
+        self.hp = self.prepare()
+        self.t0 = self.hp.elements.land_0.model.sequences.inputs.t
+        self.t2 = self.hp.elements.land_2.model.sequences.inputs.t
+        self.t2.filepath_ext = self.t0.filepath_ext
+        self.values = numpy.load(self.t0.filepath_ext)[13:]
+
+    @staticmethod
+    def address(seq):
+        """Memory address of the internal data of the given sequence
+        (Cython memoryviews are newly created on each access)."""
+        array = numpy.asarray(getattr(seq.fastaccess, seq._arrayname))
+        return array.__array_interface__['data'][0]
+
+    def test_01_shared(self):
+        filepath = os.path.join(self.dirpath, 'copy_t.npy')
+        shutil.copy(self.t0.filepath_ext, filepath)
+        hp = self.prepare()
+        hp.elements.land_2.model.sequences.inputs.t.filepath_ext = filepath
+        reference = self.simulate(hp)
+        os.remove(filepath)
+        for nmb_workers in (1, 4):
+            hp = self.prepare()
+            t0 = hp.elements.land_0.model.sequences.inputs.t
+            t2 = hp.elements.land_2.model.sequences.inputs.t
+            t2.filepath_ext = t0.filepath_ext
+            results = self.simulate(hp, inputs={'nmb_workers': nmb_workers})
+            self.assertResults(results, reference)
+            self.assertTrue(t0.shared)
+            self.assertTrue(t2.shared)
+            self.assertEqual(self.address(t0), self.address(t2))
+            self.assertTrue(numpy.all(t2.series == self.values))
+            p0 = hp.elements.land_0.model.sequences.inputs.p
+            p2 = hp.elements.land_2.model.sequences.inputs.p
+            self.assertNotEqual(self.address(p0), self.address(p2))
+
+    def test_02_readonly(self):
+        self.hp.prepare_inputseries()
+        with self.assertRaises(ValueError):
+            self.t2.series[0] = 1.
+        self.assertTrue(numpy.all(self.t0.series == self.values))
+        address = self.address(self.t0)
+        self.t2.series = 1.
+        self.assertFalse(self.t2.shared)
+        self.assertTrue(numpy.all(self.t2.series == 1.))
+        self.assertTrue(self.t0.shared)
+        self.assertEqual(self.address(self.t0), address)
+        self.assertTrue(numpy.all(self.t0.series == self.values))
+        self.t2.series[0] = 2.
+        self.assertEqual(self.t2.series[0], 2.)
+
+    def test_03_cache(self):
+        self.hp.elements.land_0.prepare_inputseries()
+        self.hp.elements.land_2.prepare_inputseries()
+        self.assertFalse(self.t0.shared)
+        self.assertFalse(self.t2.shared)
+        self.assertNotEqual(self.address(self.t0), self.address(self.t2))
+        with seriestools.Cache():
+            self.hp.elements.land_0.prepare_inputseries()
+            with seriestools.Cache():
+                self.hp.elements.land_2.prepare_inputseries()
+        self.assertEqual(self.address(self.t0), self.address(self.t2))
+        self.assertIsNone(seriestools.getshared(self.t0.sharekey))
+
+    def test_04_timegrids(self):
+        with seriestools.Cache():
+            self.hp.elements.land_0.prepare_inputseries()
+            pub.timegrids = Timegrids(Timegrid('01.01.2000',
+                                               '01.02.2000',
+                                               '1d'))
+            self.hp.elements.land_2.prepare_inputseries()
+        self.assertTrue(self.t2.shared)
+        self.assertNotEqual(self.address(self.t0), self.address(self.t2))
+        self.assertEqual(len(self.t0.series), 40)
+        self.assertEqual(len(self.t2.series), 31)
+        self.assertTrue(numpy.all(self.t2.series == self.values[:31]))
+
+    def test_05_dtypes(self):
+        self.t2.singleflag = True
+        self.hp.prepare_inputseries()
+        self.assertNotEqual(self.address(self.t0), self.address(self.t2))
+        self.assertEqual(self.t0.series.dtype, numpy.float64)
+        self.assertEqual(self.t2.series.dtype, numpy.float32)
+        self.assertTrue(numpy.all(
+            self.t2.series == self.values.astype(numpy.float32)))
+
+    def test_06_shapes(self):
+        filepath = os.path.join(self.dirpath, 'input_1d.npy')
+        numpy.save(filepath, pub.timegrids.init.array2series(
+            numpy.ones((40, 2))))
+        seqs = []
+        for shape in (2, 2, 3):
+            seq = _Input1D()
+            seq.connect(_SubSequences())
+            seq.shape = shape
+            seq.filetype_ext = 'npy'
+            seq.filepath_ext = filepath
+            seq.ramflag = True
+            seqs.append(seq)
+        with seriestools.Cache():
+            seqs[0].load_ext()
+            seqs[1].load_ext()
+            self.assertEqual(self.address(seqs[0]), self.address(seqs[1]))
+            with self.assertRaises(RuntimeError):
+                seqs[2].load_ext()
+        os.remove(filepath)
+
+
+class Test18SharingPython(Test17Sharing):
+
+    usecython = False
+
+
+class Test19Loading(unittest.TestCase):
+
+    def setUp(self):
+        pub.timegrids = Timegrids(Timegrid('01.01.2000',
+                                           '11.01.2000',
+                                           '1d'))
+        self.dirpath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        pub.timegrids = None
+        Node.clear_registry()
+        shutil.rmtree(self.dirpath)
+
+    def write(self, name, values):
+        """Write the given values into the external data file with the
+        given name and return its path."""
+        filepath = os.path.join(self.dirpath, name)
+        series = pub.timegrids.init.array2series(values)
+        if name.endswith('.npy'):
+            numpy.save(filepath, series)
+        else:
+            with open(filepath, 'w') as file_:
+                file_.write(repr(pub.timegrids.init) + '\n')
+                numpy.savetxt(file_, series[13:], delimiter='\t')
+        return filepath
+
+    def sequence(self, filepath, shape=None):
+        """Return an input sequence reading the given file."""
+        if shape is None:
+            seq = _Input0D()
+            seq.connect(_SubSequences())
+        else:
+            seq = _Input1D()
+            seq.connect(_SubSequences())
+            seq.shape = shape
+        seq.filetype_ext = filepath.rsplit('.', 1)[-1]
+        seq.filepath_ext = filepath
+        seq.filepath_int = filepath + '.bin'
+        return seq
+
+    def test_01_load(self):
+        values = {'a.npy': numpy.arange(10.),
+                  'b.asc': -numpy.arange(10.),
+                  'c.npy': numpy.arange(20.).reshape(10, 2)}
+        filepaths = dict((name, self.write(name, value))
+                         for (name, value) in values.items())
+        for (nmb_workers, ramflag) in ((1, True), (2, True), (None, True),
+                                       (8, True), (2, False)):
+            seqs = [self.sequence(filepaths['a.npy']),
+                    self.sequence(filepaths['b.asc']),
+                    self.sequence(filepaths['a.npy']),
+                    self.sequence(filepaths['c.npy'], 2)]
+            seriestools.load(seqs, ramflag, nmb_workers)
+            for (seq, name) in zip(seqs, ('a.npy', 'b.asc', 'a.npy', 'c.npy')):
+                self.assertEqual(seq.ramflag, ramflag)
+                self.assertEqual(seq.diskflag, not ramflag)
+                self.assertTrue(numpy.all(seq.series == values[name]))
+            self.assertEqual(seqs[2].shared, ramflag)
+            self.assertEqual(
+                numpy.shares_memory(seqs[0].series, seqs[2].series), ramflag)
+            self.assertIsNone(seriestools.getloaded(seqs[0]))
+
+    def test_02_missing_input(self):
+        filepath = self.write('a.npy', numpy.ones(10))
+        for nmb_workers in (1, 2):
+            seqs = [self.sequence(filepath),
+                    self.sequence(os.path.join(self.dirpath, 'missing.npy'))]
+            with self.assertRaises(IOError):
+                seqs[1].activate_ram()
+            with self.assertRaises(IOError):
+                seriestools.load(seqs, True, nmb_workers)
+            self.assertIsNone(seriestools.getloaded(seqs[0]))
+            self.assertIsNone(seriestools.getloaded(seqs[1]))
+
+    def test_03_missing_obs(self):
+        filepath = self.write('a.npy', numpy.ones(10))
+        nodes = Nodes('n1', 'n2')
+        for node in nodes:
+            obs = node.sequences.obs
+            obs.filetype_ext = 'npy'
+        nodes.n1.sequences.obs.filepath_ext = filepath
+        nodes.n2.sequences.obs.filepath_ext = os.path.join(
+            self.dirpath, 'missing.npy')
+        seqs = [node.sequences.obs for node in nodes]
+        with pub.options.warnmissingobsfile(True):
+            with warnings.catch_warnings(record=True) as records:
+                warnings.simplefilter('always')
+                seriestools.load(seqs, True, 2)
+        self.assertEqual(len(records), 1)
+        self.assertIn('n2', str(records[0].message))
+        self.assertTrue(nodes.n1.sequences.obs.ramflag)
+        self.assertTrue(numpy.all(nodes.n1.sequences.obs.series == 1.))
+        self.assertFalse(nodes.n2.sequences.obs.ramflag)
+        with pub.options.warnmissingobsfile(False):
+            with warnings.catch_warnings(record=True) as records:
+                warnings.simplefilter('always')
+                seriestools.load(seqs, True, 2)
+        self.assertEqual(len(records), 0)
+
+    def test_04_memory(self):
+        filepath = self.write('a.npy', numpy.ones(10))
+        counts = {'alive': 0, 'max': 0}
+
+        class Sequence(_Input0D):
+
+            def read_ext(self, timegrid=None):
+                counts['alive'] += 1
+                counts['max'] = max(counts['max'], counts['alive'])
+                return _Input0D.read_ext(self, timegrid)
+
+            def activate_ram(self):
+                _Input0D.activate_ram(self)
+                counts['alive'] -= 1
+
+        seqs = []
+        for idx in range(20):
+            seq = Sequence()
+            seq.connect(_SubSequences())
+            seq.filetype_ext = 'npy'
+            seq.filepath_ext = os.path.join(self.dirpath, '%d.npy' % idx)
+            shutil.copy(filepath, seq.filepath_ext)
+            seqs.append(seq)
+        seriestools.load(seqs, True, 2)
+        self.assertEqual(counts['alive'], 0)
+        self.assertLessEqual(counts['max'], 3)
+        for seq in seqs:
+            self.assertTrue(numpy.all(seq.series == 1.))
+
+
+class Test20Windows(unittest.TestCase):
+
+    def setUp(self):
+        pub.timegrids = Timegrids(Timegrid('01.01.2000',
+                                           '21.01.2000',
+                                           '1d'))
+        pub.timegrids.sim = Timegrid('04.01.2000', '18.01.2000', '1d')
+        self.dirpath = tempfile.mkdtemp()
+        self.values = numpy.arange(20.)**2
+
+    def tearDown(self):
+        pub.timegrids = None
+        shutil.rmtree(self.dirpath)
+
+    def sequence(self, filetype):
+        """Return an input sequence reading the values from a file of
+        the given type."""
+        seq = _Input0D()
+        seq.connect(_SubSequences())
+        seq.filetype_ext = filetype
+        seq.filepath_ext = os.path.join(self.dirpath, 'test.' + filetype)
+        seq.ramflag = True
+        seq._setarray(self.values)
+        seq.save_ext()
+        seq.deactivate_ram()
+        return seq
+
+    def iterate(self, seq, loader):
+        """Return the values of the given sequence for all time steps
+        of the given loader."""
+        values = []
+        for idx in loader:
+            self.assertLessEqual(len(seq.series), seq.window)
+            values.append(seq.fastaccess.loadvalues(seq.name, idx))
+        return values
+
+    def test_01_windows(self):
+        self.assertEqual(HydPy._windowsize('3d'), 3)
+        for filetype in ('npy', 'asc'):
+            seq = self.sequence(filetype)
+            for window in (1, 3, 4, 6, 13, 14, 15, 100):
+                seq.activate_lazy(window)
+                self.assertEqual(seq.window, window)
+                self.assertEqual(len(seq.series), min(window, 17))
+                loader = seriestools.WindowLoader([seq], 3, 17)
+                bounds = loader.bounds
+                self.assertEqual(bounds[0][0], 3)
+                self.assertEqual(bounds[-1][1], 17)
+                for ((idx0, idx1), (jdx0, jdx1)) in zip(bounds[:-1],
+                                                        bounds[1:]):
+                    self.assertEqual(idx1, jdx0)
+                    self.assertEqual(idx1-idx0, window)
+                self.assertLessEqual(bounds[-1][1]-bounds[-1][0], window)
+                self.assertEqual(self.iterate(seq, loader),
+                                 list(self.values[3:17]))
+
+    def test_02_step(self):
+        seq = self.sequence('npy')
+        seq.activate_lazy(4)
+        loader = seriestools.WindowLoader([seq], 3, 17, step=5)
+        self.assertEqual(loader.bounds, [(3, 7), (7, 8), (8, 11), (11, 13),
+                                         (13, 15), (15, 17)])
+        self.assertEqual(self.iterate(seq, loader), list(self.values[3:17]))
+
+    def test_03_missing(self):
+        nmb_threads = threading.active_count()
+        seq = self.sequence('npy')
+        seq.activate_lazy(5)
+        os.remove(seq.filepath_ext)
+        values = []
+        with self.assertRaises(IOError):
+            for idx in seriestools.WindowLoader([seq], 3, 17):
+                values.append(seq.fastaccess.loadvalues(seq.name, idx))
+        self.assertEqual(values, list(self.values[3:8]))
+        self.assertEqual(threading.active_count(), nmb_threads)
+
+    def test_04_wrong(self):
+        seq = self.sequence('npy')
+        with self.assertRaises(ValueError):
+            seq.activate_lazy(0)
+
+
+class Test21Streaming(fixturetools.StreamTestCase):
+
+    def setUp(self):
+        fixturetools.StreamTestCase.setUp(self)
+        pub.timegrids.sim = Timegrid('01.01.2000 03:00',
+                                     '01.01.2000 20:00',
+                                     '1h')
+        self.prepare_nodeseries()
+        self.dirpath = tempfile.mkdtemp()
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.dirpath_int = self.dirpath
+        self.files = {}
+        for filetype in ('npy', 'asc'):
+            self.setfiletype(filetype)
+            qjoints.activate_ram()
+            qjoints(0.)
+            self.hp.doit()
+            qjoints.save_ext()
+            self.files[filetype] = self.read()
+            qjoints.deactivate_ram()
+
+    def tearDown(self):
+        fixturetools.StreamTestCase.tearDown(self)
+        shutil.rmtree(self.dirpath)
+
+    def setfiletype(self, filetype):
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.filetype_ext = filetype
+        qjoints.filepath_ext = os.path.join(self.dirpath,
+                                            'qjoints.' + filetype)
+
+    def read(self):
+        """Return the content of the external data file of `qjoints`,
+        which is removed afterwards."""
+        filepath = self.model.sequences.states.qjoints.filepath_ext
+        with open(filepath, 'rb') as file_:
+            content = file_.read()
+        os.remove(filepath)
+        return content
+
+    def simulate(self, window, **kwargs):
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.activate_stream(window)
+        qjoints(0.)
+        self.hp.doit(**kwargs)
+        self.assertTrue(qjoints.stream)
+        return self.read()
+
+    def test_01_files(self):
+        for filetype in ('npy', 'asc'):
+            self.setfiletype(filetype)
+            for window in (1, 5, 16, 17, 100):
+                self.assertEqual(self.simulate(window), self.files[filetype])
+            for mode in ('threads', 'batched'):
+                self.assertEqual(self.simulate(5, mode=mode),
+                                 self.files[filetype])
+
+    def test_02_bounded(self):
+        pendings = []
+        write = seriestools.SeriesWriter.write
+
+        def record(writer, idx0, arrays):
+            pendings.append(len(writer._pending))
+            write(writer, idx0, arrays)
+
+        seriestools.SeriesWriter.write = record
+        try:
+            self.setfiletype('asc')
+            self.assertEqual(self.simulate(2), self.files['asc'])
+        finally:
+            seriestools.SeriesWriter.write = write
+        self.assertEqual(len(pendings), 9)
+        self.assertLessEqual(max(pendings), 2)
+
+    def test_03_writer_error(self):
+        nmb_threads = threading.active_count()
+        write = seriestools.SeriesWriter._write
+        calls = []
+
+        def fail(writer, idx0, arrays):
+            calls.append(idx0)
+            if len(calls) == 2:
+                raise IOError('disk full')
+            write(writer, idx0, arrays)
+
+        for filetype in ('npy', 'asc'):
+            self.setfiletype(filetype)
+            del calls[:]
+            seriestools.SeriesWriter._write = fail
+            try:
+                with self.assertRaises(IOError):
+                    self.simulate(5)
+            finally:
+                seriestools.SeriesWriter._write = write
+            self.assertEqual(calls[:2], [3, 8])
+            self.assertEqual(threading.active_count(), nmb_threads)
+            self.assertEqual(self.simulate(5), self.files[filetype])
+
+    def test_04_wrong(self):
+        qjoints = self.model.sequences.states.qjoints
+        with self.assertRaises(ValueError):
+            self.hp.prepare_stateseries(window=5, aggregation=('mean', '4h'))
+        qjoints.activate_aggregation('mean', '4h')
+        with self.assertRaises(RuntimeError):
+            qjoints.activate_stream(5)
+        qjoints.deactivate_aggregation()
+        qjoints.filetype_ext = 'store'
+        with self.assertRaises(RuntimeError):
+            qjoints.activate_stream(5)
+
+
+class Test22StreamingPython(Test21Streaming):
+
+    usecython = False
+
+
+
+class Test23Ensemble(fixturetools.StreamTestCase):
+
+    members = ({'e1': {'damp': 0.}}, {}, {'e1': {'damp': 1.}})
+
+    def setUp(self):
+        fixturetools.StreamTestCase.setUp(self)
+        self.prepare_nodeseries()
+        self.model.sequences.states.qjoints.activate_ram()
+
+    def simulate(self, damp=.5, inflow=None):
+        """Return the `sim` series of node `out1` and the `qjoints` series
+        of a single simulation run."""
+        if inflow is not None:
+            self.hp.nodes.in1.sequences.sim.series = inflow
+        control = self.model.parameters.control
+        control.damp.value = damp
+        self.model.parameters.update()
+        self.model.sequences.states.qjoints(0.)
+        self.hp.doit()
+        control.damp.value = .5
+        self.model.parameters.update()
+        self.model.sequences.states.qjoints(0.)
+        return (self.hp.nodes.out1.sequences.sim.series.copy(),
+                self.model.sequences.states.qjoints.series.copy())
+
+    def references(self):
+        return [self.simulate(damp) for damp in (0., .5, 1.)]
+
+    def assertMembers(self, references):
+        sim = self.hp.nodes.out1.sequences.sim
+        qjoints = self.model.sequences.states.qjoints
+        self.assertEqual(sim.ensemble, len(references))
+        self.assertEqual(qjoints.ensemble, len(references))
+        self.assertEqual(sim.series.shape, (len(references), 24))
+        for (idx, (simseries, qjointsseries)) in enumerate(references):
+            numpy.testing.assert_array_equal(sim.series[idx], simseries)
+            numpy.testing.assert_array_equal(qjoints.series[idx],
+                                             qjointsseries)
+
+    def test_01_members(self):
+        references = self.references()
+        self.assertFalse(numpy.array_equal(references[0][0],
+                                           references[1][0]))
+        c1 = self.model.parameters.derived.c1.value
+        self.hp.doit_ensemble(self.members)
+        self.assertMembers(references)
+        self.assertIsNone(self.hp.nodes.in1.sequences.sim.ensemble)
+        self.assertEqual(self.model.parameters.control.damp.value, .5)
+        self.assertEqual(self.model.parameters.derived.c1.value, c1)
+        self.assertTrue(numpy.all(
+            self.model.sequences.states.qjoints.values == 0.))
+        self.assertEqual(self.model.sequences.states.fastaccess._member, 0)
+        self.assertEqual(self.hp.nodes.out1.sequences.fastaccess._member, 0)
+
+    def test_02_modes(self):
+        references = self.references()
+        sim = self.hp.nodes.out1.sequences.sim
+        qjoints = self.model.sequences.states.qjoints
+        for (mode, runner) in (('serial', False), ('serial', True),
+                               ('threads', False), ('batched', False),
+                               ('processes', False)):
+            sim.activate_ensemble(3)
+            qjoints.activate_ensemble(3)
+            sim.series = 0.
+            qjoints.series = 0.
+            with pub.options.usenetworkrunner(runner):
+                self.hp.doit_ensemble(self.members, mode=mode)
+            self.assertMembers(references)
+
+    def test_03_recording(self):
+        qjoints = self.model.sequences.states.qjoints
+        qjoints.activate_recording(weights=[.2, .3, .5])
+        qjoints.activate_aggregation('mean', '4h')
+        references = self.references()
+        self.hp.doit_ensemble(self.members)
+        self.assertEqual(qjoints.series.shape, (3, 6))
+        self.assertMembers(references)
+        qjoints.deactivate_aggregation()
+        self.assertEqual(qjoints.series.shape, (3, 24))
+        self.assertTrue(numpy.all(qjoints.series == 0.))
+
+    def test_04_inflow(self):
+        inflows = numpy.array([numpy.arange(24.),
+                               numpy.ones(24),
+                               numpy.arange(24.)**.5])
+        references = [self.simulate(inflow=inflow) for inflow in inflows]
+        in1 = self.hp.nodes.in1.sequences.sim
+        in1.activate_ensemble(3)
+        numpy.testing.assert_array_equal(in1.series[0], inflows[2])
+        in1.series = inflows
+        for runner in (False, True):
+            with pub.options.usenetworkrunner(runner):
+                self.hp.doit_ensemble([{}, {}, {}])
+            self.assertMembers(references)
+            numpy.testing.assert_array_equal(in1.series, inflows)
+        in1.deactivate_ensemble()
+        self.assertIsNone(in1.ensemble)
+        numpy.testing.assert_array_equal(in1.series, inflows[0])
+
+    def test_05_wrong(self):
+        qjoints = self.model.sequences.states.qjoints
+        with self.assertRaises(ValueError):
+            qjoints.activate_ensemble(0)
+        qjoints.activate_ensemble(2)
+        qjoints.series = [numpy.zeros((24, 3)), numpy.ones((24, 3))]
+        with self.assertRaises(RuntimeError):
+            qjoints.save_ext()
+        with self.assertRaises(RuntimeError):
+            self.hp.checkpoint(os.path.join(tempfile.gettempdir(),
+                                            'ensemble.npz'))
+        with self.assertRaises(RuntimeError):
+            self.hp.doit(checkpointpath='ensemble.npz', checkpointstep=5)
+        qjoints.deactivate_ensemble()
+        self.assertIsNone(qjoints.ensemble)
+        self.assertTrue(numpy.all(qjoints.series == numpy.zeros((24, 3))))
+        qjoints.activate_ensemble(2)
+        qjoints.deactivate_ram()
+        self.assertIsNone(qjoints.ensemble)
+        dirpath = tempfile.mkdtemp()
+        try:
+            qjoints.dirpath_int = dirpath
+            qjoints.activate_disk()
+            with self.assertRaises(RuntimeError):
+                qjoints.activate_ensemble(2)
+            with self.assertRaises(RuntimeError):
+                self.hp.doit_ensemble(self.members)
+            qjoints.deactivate_disk()
+        finally:
+            shutil.rmtree(dirpath)
+
+
+class Test24EnsemblePython(Test23Ensemble):
+
+    usecython = False
+
+
+class Test25EnsembleProject(fixturetools.ProjectTestCase):
+
+    def test_01_inputs(self):
+        hp = self.prepare()
+        hp.prepare_inputseries()
+        hp.prepare_fluxseries()
+        hp.prepare_simseries()
+        p = hp.elements.land_0.model.sequences.inputs.p
+        values = p.series.copy()
+        conditions = get_conditions(hp.elements)
+        references = []
+        for factor in (1., 2.):
+            p.series = factor*values
+            set_conditions(hp.elements, conditions)
+            hp.doit()
+            references.append(dict(
+                (node.name, node.sequences.sim.series.copy())
+                for node in hp.nodes))
+        p.activate_ensemble(2)
+        p.series = [values, 2.*values]
+        set_conditions(hp.elements, conditions)
+        hp.doit_ensemble([{}, {}])
+        for (idx, reference) in enumerate(references):
+            for node in hp.nodes:
+                numpy.testing.assert_array_equal(
+                    node.sequences.sim.series[idx], reference[node.name])
+        self.assertTrue(any(
+            not numpy.array_equal(references[0][name], references[1][name])
+            for name in references[0]))
+
+
+class Test26EnsembleProjectPython(Test25EnsembleProject):
+
+    usecython = False
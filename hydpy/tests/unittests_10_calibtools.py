@@ -0,0 +1,82 @@
+# import...
+# ...from standard library
+from __future__ import division, print_function
+import os
+import unittest
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy.auxs import calibtools
+from hydpy.auxs import statstools
+from hydpy.tests import fixturetools
+
+
+class Test01Calibration(fixturetools.StreamTestCase):
+
+    def setUp(self):
+        fixturetools.StreamTestCase.setUp(self)
+        self.prepare_nodeseries(('sim', 'obs'),
+                                numpy.sin(numpy.arange(24.))+1.)
+        self.hp.doit()
+        outlet = self.hp.nodes.out1
+        outlet.sequences.obs.series = outlet.sequences.sim.series
+        self.model.parameters.control.damp.value = .2
+        self.model.parameters.update()
+        self.model.sequences.states.qjoints(0.)
+
+    def get_calibration(self, **kwargs):
+        parameter = calibtools.CalibParameter(
+            'damp', self.hp.elements.river, 'damp', 0., 1.)
+        return calibtools.Calibration(
+            self.hp, [parameter], nodes=self.hp.nodes.out1, **kwargs)
+
+    def test_01_parameter(self):
+        control = self.hp.elements.e1.model.parameters.control
+        parameter = calibtools.CalibParameter(
+            'damp', self.hp.elements.river, 'damp', 0., 1., relative=True)
+        parameter.apply(2.)
+        self.assertEqual(control.damp.value, .4)
+        parameter.reset()
+        self.assertEqual(control.damp.value, .2)
+        with self.assertRaises(AttributeError):
+            calibtools.CalibParameter(
+                'wrong', self.hp.elements.river, 'wrong', 0., 1.)
+        with self.assertRaises(ValueError):
+            calibtools.CalibParameter(
+                'damp', self.hp.elements.river, 'damp', 1., 0.)
+
+    def test_02_evaluate(self):
+        calibration = self.get_calibration()
+        self.assertEqual(calibration.evaluate([.5]), 1.)
+        self.assertLess(calibration.evaluate([.2]), 1.)
+        calibration.reset()
+        calibration = self.get_calibration(criterion=statstools.rmse,
+                                           maximize=False)
+        self.assertEqual(calibration.evaluate([.5]), 0.)
+        results = calibration.evaluate_many([[.5], [.2]])
+        self.assertEqual(results[0], 0.)
+        self.assertGreater(results[1], 0.)
+        self.assertEqual(len(calibration.history), 2)
+
+    def test_03_optimize(self):
+        for (method, kwargs) in (('dds', {'seed': 0}),
+                                 ('nelder_mead', {}),
+                                 ('sce_ua', {'seed': 0})):
+            calibration = self.get_calibration()
+            values, result = calibration.optimize(
+                method, maxevals=200, **kwargs)
+            self.assertAlmostEqual(values[0], .5, places=2)
+            self.assertAlmostEqual(result, 1., places=4)
+            calibration.reset()
+        with self.assertRaises(ValueError):
+            self.get_calibration().optimize('wrong')
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires `fork`')
+    def test_04_optimize_processes(self):
+        calibration = self.get_calibration()
+        values, result = calibration.optimize(
+            'dds', nmb_workers=2, maxevals=200, batchsize=2, seed=0)
+        self.assertAlmostEqual(values[0], .5, places=2)
+        self.assertEqual(len(calibration.history), 200)
+        control = self.hp.elements.e1.model.parameters.control
+        self.assertEqual(control.damp.value, values[0])
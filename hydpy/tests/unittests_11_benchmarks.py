@@ -0,0 +1,84 @@
+# import...
+# ...from standard library
+from __future__ import division, print_function
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+# ...from site-packages
+import numpy
+# ...from HydPy
+from hydpy.benchmarks import benchmarktools
+from hydpy.benchmarks import topologytools
+
+
+class Test01Run(unittest.TestCase):
+
+    def setUp(self):
+        self.dirpath = tempfile.mkdtemp(prefix='hydpy_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath, ignore_errors=True)
+
+    def run_benchmarks(self, topologies=('chain',), **kwargs):
+        return benchmarktools.run(
+            topologies=topologies, sizes=(3,), lastdate='11.01.2000',
+            dirpath=self.dirpath, **kwargs)
+
+    def simseries(self, network):
+        filepaths = glob.glob(os.path.join(
+            self.dirpath, network, 'sequences', benchmarktools.PROJECTNAME,
+            'node', '*_sim_q.npy'))
+        return dict((os.path.basename(filepath),
+                     numpy.load(filepath)[13:])
+                    for filepath in filepaths)
+
+    def test_01_topologies(self):
+        results = self.run_benchmarks(
+            topologies=sorted(topologytools.TOPOLOGIES), modes=('python',))
+        self.assertEqual(len(results['benchmarks']),
+                         len(topologytools.TOPOLOGIES))
+        for benchmark in results['benchmarks']:
+            self.assertEqual(sorted(benchmark['times']),
+                             sorted(benchmarktools.PHASES))
+            self.assertEqual(benchmark['nmb_steps'], 10)
+            series = self.simseries(benchmark['network'])
+            self.assertEqual(len(series), benchmark['nmb_nodes'])
+            for values in series.values():
+                self.assertEqual(values.shape, (10,))
+                self.assertTrue(numpy.all(numpy.isfinite(values)))
+            self.assertTrue(any(numpy.all(values > 0.)
+                                for values in series.values()))
+
+    def test_02_modes(self):
+        results = {}
+        for mode in benchmarktools.MODES:
+            self.run_benchmarks(modes=(mode,))
+            results[mode] = self.simseries('chain_3')
+        python, cython = (results[mode] for mode in benchmarktools.MODES)
+        self.assertEqual(sorted(python), sorted(cython))
+        for name in python:
+            numpy.testing.assert_allclose(python[name], cython[name],
+                                          rtol=1e-10)
+
+    def test_03_disk(self):
+        self.run_benchmarks(modes=('python',))
+        ram = self.simseries('chain_3')
+        self.run_benchmarks(modes=('python',), ramflag=False)
+        disk = self.simseries('chain_3')
+        for name in ram:
+            numpy.testing.assert_array_equal(ram[name], disk[name])
+
+    def test_04_main(self):
+        filepath = os.path.join(self.dirpath, 'results.json')
+        args = ['--topologies', 'star', '--sizes', '2', '--modes', 'python',
+                '--lastdate', '06.01.2000', '--dirpath', self.dirpath,
+                '--output', filepath]
+        self.assertEqual(benchmarktools.main(args), 0)
+        results = benchmarktools.load_results(filepath)
+        self.assertEqual(len(results['benchmarks']), 1)
+        self.assertEqual(results['benchmarks'][0]['network'], 'star_2')
+        self.assertEqual(
+            benchmarktools.main(args + ['--reference', filepath,
+                                        '--threshold', '1e6']), 0)
@@ -64,8 +64,19 @@ for ext_name in ext_names:
                           '%s.%s' % (ext_name, suffix)), 'w').write(text)
     ext_sources = os.path.join('hydpy', 'cythons', 'autogen',
                                '%s.pyx' % ext_name)
+    compile_args, link_args = ['-O2'], []
+    # The network runner calls independent models concurrently via OpenMP
+    # (not supported by the default compiler under Mac OS).
+    if ext_name == 'networkutils':
+        if sys.platform.startswith('win'):
+            compile_args.append('/openmp')
+        elif sys.platform != 'darwin':
+            compile_args.append('-fopenmp')
+            link_args.append('-fopenmp')
     ext_modules.append(Extension('hydpy.cythons.autogen.%s' % ext_name,
-                                 [ext_sources], extra_compile_args=['-O2']))
+                                 [ext_sources],
+                                 extra_compile_args=compile_args,
+                                 extra_link_args=link_args))
 # There seem to be different places where the `build_ext` module can be found:
 try:
     build_ext = Cython.Build.build_ext